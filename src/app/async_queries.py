@@ -0,0 +1,44 @@
+"""
+Concurrent execution of independent ORM queries from async views.
+
+Django's async ORM methods (aget, async for, ...) run every query on the one thread shared by
+the request, so gathering them does not overlap their round trips. gather_queries runs each
+blocking query function in a worker thread with its own database connection instead, so their
+database time overlaps.
+"""
+
+import asyncio
+from asgiref.sync import sync_to_async
+from django.db import close_old_connections, connection
+
+
+def run_in_worker(function):
+    """
+    Description:
+        Runs a query function in a worker thread, afterwards releasing the threads database
+        connection when it has outlived CONN_MAX_AGE or errored (as request_finished would).
+    """
+
+    try:
+        return function()
+    finally:
+        close_old_connections()
+
+
+async def gather_queries(*functions):
+    """
+    Description:
+        Runs independent, blocking query functions concurrently.
+        Inside a transaction (eg: tests or ATOMIC_REQUESTS) other connections can not see its
+        uncommitted rows, so the functions run one after another on the request's connection.
+
+    Returns:
+        list: The result of every function, in order.
+    """
+
+    if await sync_to_async(lambda: connection.in_atomic_block)():
+        return [await sync_to_async(function)() for function in functions]
+
+    return await asyncio.gather(*(
+        sync_to_async(run_in_worker, thread_sensitive=False)(function) for function in functions
+    ))
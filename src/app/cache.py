@@ -0,0 +1,380 @@
+"""
+Two-tier cache backend, a bounded in-process LRU in front of Redis.
+
+Reads are answered by the local tier while an entry is fresh, otherwise by Redis (and then kept
+in the local tier). Writes and deletes go to Redis, drop the key from the local tier and are
+published on a Redis pub/sub channel, the subscriber thread of every other process (uWSGI
+workers, the mh-worker and its job horses) then drops the key from its own local tier. Writes
+to keys no local tier keeps (see LOCAL_KEYS) are not published.
+
+Local entries expire after LOCAL_TIMEOUT seconds at most, which bounds how stale a process can
+be when an invalidation is missed, eg: while its subscriber reconnects, or under uWSGI without
+enable-threads (no background thread runs, so only LOCAL_TIMEOUT applies).
+
+Only keys matching one of the LOCAL_KEYS regular expressions (matched at the start of the key
+passed to the cache) are kept in the local tier, every other key is always read from Redis.
+Keys that must never be stale, eg: counters other entries are validated by, are left out.
+
+    CACHES = {'default': {
+        'BACKEND': 'app.cache.TwoTierCache',
+        'LOCATION': 'redis://localhost:6379/1',
+        'OPTIONS': {'LOCAL_MAX_ENTRIES': 1000, 'LOCAL_TIMEOUT': 30, 'LOCAL_KEYS': [r'studio:[^:]+$']},
+    }}
+
+Hit and miss counters of both tiers are kept per process (see TwoTierCache.get_stats) and
+published to Redis every STATS_INTERVAL seconds, the cache_stats command sums them up.
+"""
+
+import json
+import logging
+import os
+import re
+import socket
+import threading
+import time
+from collections import Counter, OrderedDict
+from django.conf import settings
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+from django.core.cache.backends.redis import RedisCache
+
+logger = logging.getLogger(settings.LOGGER_NAME)
+
+LOCAL_MAX_ENTRIES = 1000  # Entries kept per process before the least recently used are evicted.
+LOCAL_TIMEOUT = 30  # Seconds a local entry is served without checking Redis.
+STATS_INTERVAL = 10  # Seconds between publishing the counters of a process.
+RECONNECT_DELAY = 1  # Seconds between subscriber reconnection attempts.
+COUNTERS = ('local_hits', 'local_misses', 'redis_hits', 'redis_misses')
+
+
+
+class LocalTier:
+    """
+    Description:
+        Thread-safe LRU of serialized cache values with a per entry expiry.
+        Values are kept serialized, so callers never share (and mutate) the same object.
+
+    Collects:
+        max_entries: Entries kept before the least recently used are evicted
+        timeout: Maximum seconds an entry is kept
+        generation: Incremented by every invalidation, see set_if_current
+    """
+
+    def __init__(self, max_entries: int, timeout: float):
+        self.max_entries = max_entries
+        self.timeout = timeout
+        self.generation = 0
+        self.entries = OrderedDict()  # key: (expiry, serialized value)
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        """
+        Description:
+            Returns the serialized value of a fresh entry, None when the key is missing or expired.
+        """
+
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+
+            if entry[0] <= time.monotonic():
+                del self.entries[key]
+                return None
+
+            self.entries.move_to_end(key)
+            return entry[1]
+
+    def set_if_current(self, generation: int, values: dict):
+        """
+        Description:
+            Keeps serialized values read from Redis, unless an invalidation arrived since the
+            generation was read, in which case the values may already be stale.
+        """
+
+        with self.lock:
+            if generation != self.generation:
+                return
+
+            for key, value in values.items():
+                self._set(key, value)
+
+    def _set(self, key, value):
+        self.entries[key] = (time.monotonic() + self.timeout, value)
+        self.entries.move_to_end(key)
+
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def invalidate(self, keys=None):
+        """
+        Description:
+            Drops keys from the tier, every key when keys is None.
+        """
+
+        with self.lock:
+            self.generation += 1
+
+            if keys is None:
+                self.entries.clear()
+            else:
+                for key in keys:
+                    self.entries.pop(key, None)
+
+
+
+class TwoTierCache(RedisCache):
+    """
+    Description:
+        RedisCache with an in-process LocalTier, kept consistent across processes with pub/sub invalidations.
+
+    Collects:
+        local: LocalTier of this process
+        local_keys: Pattern of the keys kept in the local tier, every key when None
+        channel: Pub/sub channel the invalidated keys are published on
+    """
+
+    def __init__(self, server, params):
+        options = dict(params.get('OPTIONS', {}))
+        local_max_entries = options.pop('LOCAL_MAX_ENTRIES', LOCAL_MAX_ENTRIES)
+        local_timeout = options.pop('LOCAL_TIMEOUT', LOCAL_TIMEOUT)
+        local_keys = options.pop('LOCAL_KEYS', None)
+        super().__init__(server, {**params, 'OPTIONS': options})
+
+        self.local = LocalTier(local_max_entries, local_timeout)
+        self.local_keys = None if local_keys is None else re.compile('|'.join(f'(?:{pattern})' for pattern in local_keys))
+        self.channel = self.make_key('two-tier-cache:invalidations')
+        self.counters = Counter()
+        self.counters_lock = threading.Lock()
+        self.subscriber_lock = threading.Lock()
+        self.subscriber_pid = None
+
+    def is_local(self, key):
+        """
+        Description:
+            Whether a key (as passed to the cache) is kept in the local tier, see LOCAL_KEYS.
+        """
+        return self.local_keys is None or self.local_keys.match(key) is not None
+
+    def count(self, **counts):
+        with self.counters_lock:
+            self.counters.update(counts)
+
+    def get_stats(self):
+        """
+        Description:
+            Hit and miss counters of both tiers in this process.
+
+        Returns:
+            dict: The COUNTERS and their values.
+        """
+
+        with self.counters_lock:
+            return {name: self.counters[name] for name in COUNTERS}
+
+    def get_stats_key(self):
+        return f'{self.channel}:stats:{socket.gethostname()}:{os.getpid()}'
+
+    def get_published_stats(self):
+        """
+        Description:
+            Counters last published by every running process, see subscribe.
+
+        Returns:
+            dict: 'hostname:pid' to the COUNTERS of that process.
+        """
+
+        client = self._cache.get_client()
+        prefix = f'{self.channel}:stats:'
+        stats = {}
+
+        for stats_key in client.scan_iter(match=f'{prefix}*'):
+            counters = client.hgetall(stats_key)
+            stats[stats_key.decode()[len(prefix):]] = {name: int(counters.get(name.encode(), 0)) for name in COUNTERS}
+
+        return stats
+
+    def ensure_subscriber(self):
+        """
+        Description:
+            Starts the invalidation subscriber of this process. Forked processes (uWSGI workers,
+            rq job horses) inherit the local tier but not the thread, so they start afresh.
+        """
+
+        pid = os.getpid()
+        if self.subscriber_pid == pid:
+            return
+
+        with self.subscriber_lock:
+            if self.subscriber_pid == pid:
+                return
+
+            self.local.invalidate()
+            with self.counters_lock:
+                self.counters.clear()
+            self.subscriber_pid = pid
+            threading.Thread(target=self.subscribe, args=(pid,), name='two-tier-cache-subscriber', daemon=True).start()
+
+    def subscribe(self, pid):
+        """
+        Description:
+            Drops the keys of every invalidation message from the local tier, and publishes the
+            counters every STATS_INTERVAL seconds. Reconnects after connection errors.
+        """
+
+        stats_published = 0
+
+        while self.subscriber_pid == pid:
+            pubsub = None
+            try:
+                client = self._cache.get_client(write=True)
+                pubsub = client.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(self.channel)
+                # Invalidations published while unsubscribed were missed.
+                self.local.invalidate()
+
+                while self.subscriber_pid == pid:
+                    message = pubsub.get_message(timeout=1.0)
+                    if message is not None:
+                        self.local.invalidate(json.loads(message['data']))
+
+                    if time.monotonic() - stats_published >= STATS_INTERVAL:
+                        stats_key = self.get_stats_key()
+                        client.hset(stats_key, mapping=self.get_stats())
+                        client.expire(stats_key, STATS_INTERVAL * 3)
+                        stats_published = time.monotonic()
+            except self._cache._lib.RedisError:
+                logger.warning('Cache invalidation subscriber disconnected, reconnecting', exc_info=True)
+                time.sleep(RECONNECT_DELAY)
+            finally:
+                if pubsub is not None:
+                    pubsub.close()
+
+    def invalidate(self, keys=None):
+        """
+        Description:
+            Drops keys from the local tier of this and every other process, every key when keys is None.
+        """
+
+        self.local.invalidate(keys)
+        self._cache.get_client(write=True).publish(self.channel, json.dumps(keys))
+
+    def invalidate_local_keys(self, keys, version=None):
+        """
+        Description:
+            Invalidates the written keys (as passed to the cache) that can be kept in the local tier,
+            see LOCAL_KEYS. Writes to other keys publish nothing.
+        """
+
+        local_keys = [self.make_and_validate_key(key, version=version) for key in keys if self.is_local(key)]
+        if local_keys:
+            self.invalidate(local_keys)
+
+    def get_from_redis(self, keys, local_keys=()):
+        """
+        Description:
+            Reads serialized values from Redis and keeps those of local_keys in the local tier.
+
+        Returns:
+            dict: The serialized value of every key found in Redis.
+        """
+
+        generation = self.local.generation
+        values = {
+            key: value
+            for key, value in zip(keys, self._cache.get_client().mget(keys))
+            if value is not None
+        }
+        self.local.set_if_current(generation, {key: value for key, value in values.items() if key in local_keys})
+        self.count(redis_hits=len(values), redis_misses=len(keys) - len(values))
+
+        return values
+
+    def get(self, key, default=None, version=None):
+        self.ensure_subscriber()
+        local = self.is_local(key)
+        key = self.make_and_validate_key(key, version=version)
+
+        value = self.local.get(key) if local else None
+        if value is not None:
+            self.count(local_hits=1)
+        else:
+            if local:
+                self.count(local_misses=1)
+            value = self.get_from_redis([key], {key} if local else ()).get(key)
+
+        return default if value is None else self._cache._serializer.loads(value)
+
+    def get_many(self, keys, version=None):
+        self.ensure_subscriber()
+        key_map = {self.make_and_validate_key(key, version=version): key for key in keys}
+        local_keys = {key for key, original_key in key_map.items() if self.is_local(original_key)}
+
+        values = {}
+        for key in local_keys:
+            value = self.local.get(key)
+            if value is not None:
+                values[key] = value
+
+        missing = [key for key in key_map if key not in values]
+        self.count(local_hits=len(values), local_misses=len(local_keys) - len(values))
+        if missing:
+            values.update(self.get_from_redis(missing, local_keys))
+
+        return {key_map[key]: self._cache._serializer.loads(value) for key, value in values.items()}
+
+    def has_key(self, key, version=None):
+        self.ensure_subscriber()
+        if not self.is_local(key):
+            return super().has_key(key, version=version)
+
+        if self.local.get(self.make_and_validate_key(key, version=version)) is not None:
+            self.count(local_hits=1)
+            return True
+
+        self.count(local_misses=1)
+        return super().has_key(key, version=version)
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        super().set(key, value, timeout, version=version)
+        self.invalidate_local_keys([key], version=version)
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        added = super().add(key, value, timeout, version=version)
+        if added:
+            self.invalidate_local_keys([key], version=version)
+
+        return added
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        touched = super().touch(key, timeout, version=version)
+        self.invalidate_local_keys([key], version=version)
+
+        return touched
+
+    def delete(self, key, version=None):
+        deleted = super().delete(key, version=version)
+        self.invalidate_local_keys([key], version=version)
+
+        return deleted
+
+    def incr(self, key, delta=1, version=None):
+        value = super().incr(key, delta, version=version)
+        self.invalidate_local_keys([key], version=version)
+
+        return value
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        failed = super().set_many(data, timeout, version=version)
+        self.invalidate_local_keys(data, version=version)
+
+        return failed
+
+    def delete_many(self, keys, version=None):
+        super().delete_many(keys, version=version)
+        self.invalidate_local_keys(keys, version=version)
+
+    def clear(self):
+        cleared = super().clear()
+        self.invalidate()
+
+        return cleared
@@ -3,10 +3,17 @@ Decorators related to basic route authorization and route protection.
 """
 
 from functools import wraps
-from django.http import HttpResponseForbidden
-from django.shortcuts import get_object_or_404
-from studio_suite.models import MemberStudioRelationship, StudioInfo
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.contrib.auth import SESSION_KEY
+from django.contrib.messages import get_messages
 from django.http import Http404
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.crypto import salted_hmac
+from studio_suite.versioning import get_studio_version
+from .studio_access import get_studio, resolve_studio_access
+
+STUDIO_ETAG_SALT = 'app.decorators.studio_version_etag'
 
 def member_group_required(func):
     """
@@ -23,11 +30,10 @@ def member_group_required(func):
         if len(args) > 1 and hasattr(args[1], 'user'):
             self, request = args[:2]
             studio_url_extension = kwargs.get('studio_url_extension')
-            studio = get_object_or_404(StudioInfo, url_extension=studio_url_extension)
-            user = request.user
+            studio_access = resolve_studio_access(request, studio_url_extension)
 
             # Check if the user is associated with the specified studio
-            if not MemberStudioRelationship.objects.filter(member=user, studio=studio).exists() and studio.linked_account != request.user:
+            if not studio_access.is_member:
                 # Technically raising a 404 is not proper, however, they will only get this 404 if they're attempting
                 # 1 of 2 possibly malicious techniques.Therefor, we should pretend as if the page doesn't exists.
                 raise Http404()
@@ -48,13 +54,114 @@ def studio_ownership_required(func):
         Description:
             Wraps routes in the studio_suite to make sure tje accessing use is the studio owner.
         """
-        studio = get_object_or_404(StudioInfo, url_extension=kwargs.get('studio_url_extension'))
+        studio_access = resolve_studio_access(request, kwargs.get('studio_url_extension'))
 
-        if studio.linked_account != request.user:
+        if not studio_access.is_owner:
             # Technically raising a 404 is not proper, however, they will only get this 404 if they're attempting
             # 1 of 2 possibly malicious techniques. Therefor, we should pretend as if the page doesn't exists.
             raise Http404()
 
         return func(self, request, *args, **kwargs)
 
-    return wrapper
\ No newline at end of file
+    return wrapper
+
+
+def get_studio_etag(request, studio_url_extension):
+    """
+    Description:
+        ETag of a studio page for the requesting session, read from the cache only: the studio
+        version (see studio_suite.versioning) and a digest of the session key and the day.
+
+    Returns:
+        tuple: (version, etag) with the quoted ETag, None when the page must be rendered
+        (anonymous session or pending messages, which are shown once).
+    """
+
+    if request.session.get(SESSION_KEY) is None or len(get_messages(request)):
+        return None
+
+    version, _ = get_studio_version(get_studio(studio_url_extension).pk)
+
+    return version, format_studio_etag(request, version)
+
+
+def format_studio_etag(request, version):
+    """
+    Description:
+        Quoted ETag of a studio page at a studio version for the requesting session, see get_studio_etag.
+    """
+    digest = salted_hmac(STUDIO_ETAG_SALT, f'{request.session.session_key}:{timezone.localdate()}').hexdigest()[:16]
+    return f'"{version}-{digest}"'
+
+
+def mark_served_studio_version(request, version):
+    """
+    Description:
+        Records the studio version of cached data a page is rendered from, which may be older than
+        the current version while it is rebuilt (see CachedComputation). studio_version_etag tags
+        the page with the oldest version it was rendered from, so it is not validated as current.
+    """
+    request.served_studio_version = min(version, getattr(request, 'served_studio_version', version))
+
+
+def studio_version_etag(func):
+    """
+    Description:
+        Decorator answering GET requests of studio pages with 304 Not Modified while the studio
+        version is unchanged, before the access checks and without touching the database.
+        Must wrap the access decorators of a dispatch method. Pages rendered from outdated
+        cached data are tagged with its version, see mark_served_studio_version.
+
+    Security:
+        An ETag is only handed out after the access checks passed, is bound to the session,
+        and every change to who can access a studio bumps its version. Views whose pages depend
+        on more than the studio (eg: background jobs or other studios) set studio_etag = False.
+    """
+
+    def get_etag(self, request, kwargs):
+        if not getattr(self, 'studio_etag', True) or request.method not in ('GET', 'HEAD'):
+            return None
+        return get_studio_etag(request, kwargs.get('studio_url_extension'))
+
+    def set_etag(request, response, version, etag):
+        if response.status_code not in (200, 304) or response.has_header('ETag'):
+            return response
+
+        served_version = getattr(request, 'served_studio_version', version)
+        if served_version < version:
+            etag = format_studio_etag(request, served_version)
+
+        response.headers['ETag'] = etag
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
+
+    if iscoroutinefunction(func):
+        @wraps(func)
+        async def async_wrapper(self, request, *args, **kwargs):
+            version_etag = await sync_to_async(get_etag)(self, request, kwargs)
+            if version_etag is None:
+                return await func(self, request, *args, **kwargs)
+
+            version, etag = version_etag
+            response = get_conditional_response(request, etag=etag)
+            if response is None:
+                response = await func(self, request, *args, **kwargs)
+
+            return set_etag(request, response, version, etag)
+
+        return async_wrapper
+
+    @wraps(func)
+    def wrapper(self, request, *args, **kwargs):
+        version_etag = get_etag(self, request, kwargs)
+        if version_etag is None:
+            return func(self, request, *args, **kwargs)
+
+        version, etag = version_etag
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = func(self, request, *args, **kwargs)
+
+        return set_etag(request, response, version, etag)
+
+    return wrapper
@@ -35,6 +35,8 @@ STRIPE_WEBHOOK_SECRET = os.environ.get('STRIPE_WEBHOOK_SECRET')
 DEPLOY_CONTEXT = os.environ.get('DEPLOY_CONTEXT', 'app')
 LOGGER_NAME = DEPLOY_CONTEXT
 BACKEND_DOMAIN = os.environ.get('BACKEND_DOMAIN', 'http://127.0.0.1:8091')
+# Route member_suite pages to their async views, for deployments served by app.asgi.
+ASYNC_MEMBER_VIEWS = os.environ.get('ASYNC_MEMBER_VIEWS', '0') == '1'
 PAYMENT_SUCCESS_URL = f'{BACKEND_DOMAIN}/store/success/'
 PAYMENT_CANCEL_URL = f'{BACKEND_DOMAIN}/store/cancel/'
 
@@ -244,6 +246,17 @@ STATICFILES_DIRS = [
 
 STATIC_URL = 'static/'
 STATIC_ROOT = os.path.join(BASE_DIR, 'static')
+
+# Production collectstatic writes hashed and precompressed files, served by app.static_files.StaticFilesApplication.
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    'staticfiles': {
+        'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage' if DEBUG
+        else 'app.static_files.CompressedManifestStaticFilesStorage',
+    },
+}
 # Default primary key field type
 # https://docs.djangoproject.com/en/4.2/ref/settings/#default-auto-field
 
@@ -251,14 +264,30 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 CACHES = {
     'default': {
-        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'BACKEND': 'app.cache.TwoTierCache',  # In-process LRU in front of Redis, see app.cache.
         #'LOCATION': 'redis://redis:6379'
         'LOCATION': 'redis://localhost:6379/1',  # Localhosting Redis Server
-    }
+        'OPTIONS': {
+            'LOCAL_MAX_ENTRIES': 1000,
+            'LOCAL_TIMEOUT': 30,
+            # Keys kept in the local tier. Studio versions and member roles are read from Redis.
+            'LOCAL_KEYS': [
+                r'studio:[^:]+$',  # Studios by url_extension
+                r'studio:[^:]+:availability:',  # Validated by the studio version
+                r'studio:[^:]+:conflicts:[^:]+$',  # Validated by the studio version
+                r'store:catalog$',
+            ],
+        },
+    },
+    'sessions': {
+        # Sessions are read from Redis directly, a logout must not linger in another process.
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': 'redis://localhost:6379/1',
+    },
 }
 
 SESSION_ENGINE = 'django.contrib.sessions.backends.cache'
-SESSION_CACHE_ALIAS = 'default'
+SESSION_CACHE_ALIAS = 'sessions'
 
 RQ_QUEUES = {
     # 'default': {
@@ -301,6 +330,10 @@ RQ_QUEUES = {
     # }
 }
 
+# Days past today that timeslot rules are materialized into TimeslotOccurrence rows for.
+# Rolled forward daily by `manage.py roll_timeslot_occurrences --enqueue`.
+TIMESLOT_OCCURRENCE_HORIZON_DAYS = 120
+
 # RQ_EXCEPTION_HANDLERS = ['path.to.my.handler'] # If you need custom exception handlers
 from django.utils.log import DEFAULT_LOGGING
 
@@ -0,0 +1,149 @@
+"""
+Single-flight recomputation of expensive cached values (cache stampede protection).
+
+An entry holds the value with the version it was computed at, how long computing it took and
+when it expires. When an entry is missing, outdated or expiring, the first caller takes a lock
+(cache.add, a SET NX on Redis) and recomputes it while concurrent callers keep getting the
+previous value, or wait briefly for the new one when there is none.
+
+Entries are refreshed before they expire with probabilistic early expiration (XFetch): every
+read recomputes early with a probability that grows as the expiry approaches and with how long
+the last computation took, so a popular entry is usually refreshed by a single caller before
+it expires at all.
+"""
+
+import math
+import random
+import time
+from django.core.cache import cache
+
+XFETCH_BETA = 1.0  # Above 1 favours earlier refreshes, below 1 later ones.
+LOCK_TIMEOUT = 30  # Seconds before the lock of a crashed computation is released.
+WAIT_TIMEOUT = 2  # Seconds a caller without a previous value waits for the lock holder.
+WAIT_INTERVAL = 0.05  # Seconds between checks for the lock holders value.
+
+
+
+class CachedComputation:
+    """
+    Description:
+        A cached value recomputed by a single caller at a time, see the module docstring.
+
+    Collects:
+        key: Cache key of the entry
+        timeout: Seconds an entry is fresh
+        version: Entries computed at another version are outdated (eg: a studio version)
+        lock_timeout: Seconds before an unreleased lock expires
+        stale_timeout: Seconds an expired entry is kept, to be served while it is recomputed
+    """
+
+    def __init__(self, key: str, timeout: int, version=None, lock_timeout=LOCK_TIMEOUT, stale_timeout=None):
+        self.key = key
+        self.lock_key = f'{key}:lock'
+        self.timeout = timeout
+        self.version = version
+        self.lock_timeout = lock_timeout
+        self.stale_timeout = timeout if stale_timeout is None else stale_timeout
+
+    def get_entry(self):
+        """
+        Description:
+            The cached entry, a dict of the value, version, delta (seconds computing took)
+            and expires (unix timestamp). None when nothing is cached.
+        """
+        return cache.get(self.key)
+
+    def is_fresh(self, entry):
+        """
+        Description:
+            An entry is fresh when it is current and not (probabilistically) expiring, see XFetch.
+        """
+
+        if entry is None or entry['version'] != self.version:
+            return False
+
+        remaining = entry['expires'] - time.time()
+        return entry['delta'] * XFETCH_BETA * -math.log(1 - random.random()) < remaining
+
+    def acquire(self):
+        """
+        Description:
+            Takes the lock to recompute the entry, False when another caller holds it.
+        """
+        return cache.add(self.lock_key, True, self.lock_timeout)
+
+    def release(self):
+        cache.delete(self.lock_key)
+
+    def compute(self, function):
+        """
+        Description:
+            Computes and caches the value, timing the computation for XFetch.
+
+        Returns:
+            dict: The cached entry, see get_entry.
+        """
+
+        start = time.perf_counter()
+        value = function()
+        entry = {
+            'value': value,
+            'version': self.version,
+            'delta': time.perf_counter() - start,
+            'expires': time.time() + self.timeout,
+        }
+        cache.set(self.key, entry, self.timeout + self.stale_timeout)
+
+        return entry
+
+    def wait_for_entry(self):
+        """
+        Description:
+            Waits up to WAIT_TIMEOUT seconds for the lock holder to cache a current entry.
+
+        Returns:
+            The entry, None if it did not arrive in time.
+        """
+
+        deadline = time.monotonic() + WAIT_TIMEOUT
+
+        while time.monotonic() < deadline:
+            time.sleep(WAIT_INTERVAL)
+            entry = self.get_entry()
+            if entry is not None and entry['version'] == self.version:
+                return entry
+
+        return None
+
+    def get_or_compute(self, function):
+        """
+        Description:
+            Returns the cached value, recomputing it with function when it is not fresh, see get_or_compute_entry.
+        """
+        return self.get_or_compute_entry(function)['value']
+
+    def get_or_compute_entry(self, function):
+        """
+        Description:
+            Returns the cached entry, recomputing it with function when it is not fresh.
+            Without the lock, callers get the previous entry, or wait for the lock holder when
+            there is none and compute it themselves if it takes longer than WAIT_TIMEOUT.
+        """
+
+        entry = self.get_entry()
+        if self.is_fresh(entry):
+            return entry
+
+        if self.acquire():
+            try:
+                return self.compute(function)
+            finally:
+                self.release()
+
+        if entry is None:
+            entry = self.wait_for_entry()
+
+        if entry is not None:
+            return entry
+
+        return {'value': function(), 'version': self.version}
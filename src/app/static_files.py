@@ -0,0 +1,215 @@
+"""
+Production static file pipeline.
+
+CompressedManifestStaticFilesStorage writes content-hashed copies of every collected file
+(see ManifestStaticFilesStorage) plus gzip and, when the optional brotli package is installed,
+brotli variants of the compressible ones during collectstatic.
+
+StaticFilesApplication wraps the Django WSGI application and answers requests under STATIC_URL
+straight from STATIC_ROOT, before the middleware stack and URL resolver run. Hashed files, those
+of the staticfiles manifest and the vite build output (see VITE_HASHED_DIRS), are served with
+far-future immutable cache headers.
+"""
+
+import gzip
+import json
+import mimetypes
+import os
+from email.utils import formatdate
+from django.conf import settings
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE_EXTENSIONS = ('.css', '.js', '.mjs', '.map', '.json', '.svg', '.html', '.txt', '.xml', '.ico')
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'  # 1 year, the name changes with the content.
+MUTABLE_CACHE_CONTROL = 'public, max-age=60'
+
+# Compressed variant extensions by Content-Encoding, in order of preference.
+ENCODINGS = {'br': '.br', 'gzip': '.gz'}
+
+# Vite names the chunks and assets it builds by their content hash (see vite.config.js), chunks
+# import each other by those names, so they are immutable under their vite name as well.
+VITE_HASHED_DIRS = ('dist/assets/',)
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """
+    Description:
+        ManifestStaticFilesStorage which also writes a .gz (and .br) variant next to every
+        compressible collected file, both the original and the hashed name.
+    """
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run=dry_run, **options)
+
+        if dry_run:
+            return
+
+        for name in [*paths, *self.hashed_files.values()]:
+            if name.endswith(COMPRESSIBLE_EXTENSIONS) and self.exists(name):
+                self.compress(name)
+
+    def compress(self, name):
+        """
+        Description:
+            Writes the compressed variants of a file, skipping variants that are not smaller.
+        """
+
+        path = self.path(name)
+        with open(path, 'rb') as static_file:
+            content = static_file.read()
+
+        variants = {'.gz': gzip.compress(content, compresslevel=9, mtime=0)}
+        if brotli is not None:
+            variants['.br'] = brotli.compress(content)
+
+        for extension, compressed in variants.items():
+            if len(compressed) < len(content):
+                with open(path + extension, 'wb') as compressed_file:
+                    compressed_file.write(compressed)
+
+
+
+class StaticFile:
+    """
+    Description:
+        A file under STATIC_ROOT and its precompressed variants.
+
+    Collects:
+        variants: Content-Encoding (None for the uncompressed file) to a (path, size) tuple
+        headers: Response headers shared by every variant
+    """
+
+    def __init__(self, path, immutable):
+        content_type, _ = mimetypes.guess_type(path)
+        stat = os.stat(path)
+
+        self.variants = {None: (path, stat.st_size)}
+        for encoding, extension in ENCODINGS.items():
+            if os.path.exists(path + extension):
+                self.variants[encoding] = (path + extension, os.path.getsize(path + extension))
+
+        self.headers = [
+            ('Content-Type', content_type or 'application/octet-stream'),
+            ('Cache-Control', IMMUTABLE_CACHE_CONTROL if immutable else MUTABLE_CACHE_CONTROL),
+            ('Last-Modified', formatdate(stat.st_mtime, usegmt=True)),
+        ]
+        if len(self.variants) > 1:
+            self.headers.append(('Vary', 'Accept-Encoding'))
+
+    def get_variant(self, accept_encoding):
+        """
+        Description:
+            Picks the preferred variant the client accepts.
+
+        Returns:
+            tuple: (encoding, path, size), encoding is None for the uncompressed file.
+        """
+
+        accepted = set()
+        for accepted_encoding in accept_encoding.split(','):
+            encoding, _, quality = accepted_encoding.partition(';q=')
+            try:
+                if float(quality or 1) > 0:
+                    accepted.add(encoding.strip())
+            except ValueError:
+                continue
+
+        for encoding in ENCODINGS:
+            if encoding in accepted and encoding in self.variants:
+                return (encoding, *self.variants[encoding])
+
+        return (None, *self.variants[None])
+
+
+
+class StaticFilesApplication:
+    """
+    Description:
+        WSGI middleware serving STATIC_ROOT under STATIC_URL, every other request goes to the wrapped application.
+        STATIC_ROOT is indexed once on startup (collectstatic runs before the server starts), so a request
+        is a dictionary lookup and a file read.
+    """
+
+    block_size = 64 * 1024
+
+    def __init__(self, application, static_root=None, static_url=None):
+        self.application = application
+        self.static_root = static_root or settings.STATIC_ROOT
+        self.static_url = static_url or settings.STATIC_URL
+        self.files = self.index_files()
+
+    def get_immutable_names(self):
+        """
+        Description:
+            Hashed file names from the staticfiles.json manifest written by collectstatic,
+            see is_immutable for the names hashed by the vite build.
+        """
+
+        manifest_path = os.path.join(self.static_root, ManifestStaticFilesStorage.manifest_name)
+
+        try:
+            with open(manifest_path) as manifest_file:
+                return set(json.load(manifest_file).get('paths', {}).values())
+        except (OSError, ValueError):
+            return set()
+
+    def is_immutable(self, name, immutable_names):
+        """
+        Description:
+            Whether a file name under STATIC_ROOT changes with its content.
+        """
+        return name in immutable_names or name.startswith(VITE_HASHED_DIRS)
+
+    def index_files(self):
+        """
+        Description:
+            Maps the url of every file under STATIC_ROOT to its StaticFile.
+        """
+
+        immutable_names = self.get_immutable_names()
+        compressed_extensions = tuple(ENCODINGS.values())
+        files = {}
+
+        for directory, _, file_names in os.walk(self.static_root):
+            for file_name in file_names:
+                if file_name.endswith(compressed_extensions):
+                    continue
+
+                path = os.path.join(directory, file_name)
+                name = os.path.relpath(path, self.static_root).replace(os.sep, '/')
+                files[self.static_url + name] = StaticFile(path, self.is_immutable(name, immutable_names))
+
+        return files
+
+    def __call__(self, environ, start_response):
+        static_file = self.files.get(environ.get('PATH_INFO', ''))
+
+        if static_file is None or environ['REQUEST_METHOD'] not in ('GET', 'HEAD'):
+            return self.application(environ, start_response)
+
+        encoding, path, size = static_file.get_variant(environ.get('HTTP_ACCEPT_ENCODING', ''))
+        headers = [*static_file.headers, ('Content-Length', str(size))]
+        if encoding:
+            headers.append(('Content-Encoding', encoding))
+
+        start_response('200 OK', headers)
+
+        if environ['REQUEST_METHOD'] == 'HEAD':
+            return []
+
+        file = open(path, 'rb')
+        file_wrapper = environ.get('wsgi.file_wrapper')
+        if file_wrapper:
+            return file_wrapper(file, self.block_size)
+
+        return self.iter_file(file)
+
+    def iter_file(self, file):
+        with file:
+            while block := file.read(self.block_size):
+                yield block
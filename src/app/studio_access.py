@@ -0,0 +1,141 @@
+"""
+Request-scoped resolution of the studio, ownership and member role behind a studio_url_extension.
+
+Studios are cached by url_extension and member roles by (studio, member) so that the route
+decorators and the studio_suite/member_suite base views share a single lookup per request.
+The cached entries are invalidated by the signals in studio_suite.signals.
+"""
+
+from django.core.cache import cache
+from django.http import Http404
+from studio_suite.models import MemberStudioRelationship, StudioInfo
+
+STUDIO_CACHE_TIMEOUT = 60 * 60  # 1 hour in seconds
+NOT_A_MEMBER = ''  # Cached member role of users without a studio relationship.
+
+
+def get_studio_cache_key(url_extension: str):
+    """
+    Description:
+        Cache key of a studio looked up by its url_extension.
+    """
+    return f'studio:{url_extension}'
+
+
+def get_member_role_cache_key(studio_id, member_id):
+    """
+    Description:
+        Cache key of a members role within a studio.
+    """
+    return f'studio:{studio_id}:member:{member_id}'
+
+
+def get_studio(url_extension: str):
+    """
+    Description:
+        Returns the StudioInfo of a url_extension, from the cache when possible.
+
+    Raises:
+        Http404: No studio has that url_extension.
+    """
+
+    cache_key = get_studio_cache_key(url_extension)
+    studio = cache.get(cache_key)
+
+    if studio is None:
+        try:
+            studio = StudioInfo.objects.get(url_extension=url_extension)
+        except StudioInfo.DoesNotExist:
+            raise Http404()
+        cache.set(cache_key, studio, STUDIO_CACHE_TIMEOUT)
+
+    return studio
+
+
+def get_member_role(studio: StudioInfo, user):
+    """
+    Description:
+        Returns the users member_role within a studio, from the cache when possible.
+
+    Returns:
+        str: The member role, or NOT_A_MEMBER when the user has no studio relationship.
+    """
+
+    if not user.is_authenticated:
+        return NOT_A_MEMBER
+
+    return get_member_role_by_id(studio, user.pk)
+
+
+def get_member_role_queryset(studio: StudioInfo, member_id: int):
+    """
+    Description:
+        The member_role of a user id within a studio, empty when the user has no studio relationship.
+    """
+    return MemberStudioRelationship.objects.filter(member_id=member_id, studio=studio).values_list('member_role', flat=True)
+
+
+def get_member_role_by_id(studio: StudioInfo, member_id: int):
+    """
+    Description:
+        Returns the member_role of a user id within a studio, from the cache when possible.
+        Used where there is no authenticated user, eg: calendar feeds authorized by a signed token.
+
+    Returns:
+        str: The member role, or NOT_A_MEMBER when the user has no studio relationship.
+    """
+
+    cache_key = get_member_role_cache_key(studio.pk, member_id)
+    member_role = cache.get(cache_key)
+
+    if member_role is None:
+        member_role = get_member_role_queryset(studio, member_id).first() or NOT_A_MEMBER
+        cache.set(cache_key, member_role, STUDIO_CACHE_TIMEOUT)
+
+    return member_role
+
+
+class StudioAccess:
+    """
+    Description:
+        What the requesting user can access within a studio.
+
+    Collects:
+        studio: StudioInfo object of the requested url_extension
+        is_owner: The user is the studio owner (has access to the studio_suite)
+        member_role: The users member_role, NOT_A_MEMBER when they have no studio relationship
+    """
+
+    def __init__(self, studio: StudioInfo, is_owner: bool, member_role: str):
+        self.studio = studio
+        self.is_owner = is_owner
+        self.member_role = member_role
+
+    @property
+    def is_member(self):
+        """
+        Description:
+            The user has a studio relationship or owns the studio.
+        """
+        return self.is_owner or self.member_role != NOT_A_MEMBER
+
+
+def resolve_studio_access(request, url_extension: str):
+    """
+    Description:
+        Resolves the studio, ownership and member role of a request once, later calls
+        within the same request reuse the result.
+
+    Raises:
+        Http404: No studio has that url_extension.
+    """
+
+    resolved = request.__dict__.setdefault('_studio_access', {})
+
+    if url_extension not in resolved:
+        studio = get_studio(url_extension)
+        is_owner = request.user.is_authenticated and studio.linked_account_id == request.user.pk
+        member_role = NOT_A_MEMBER if is_owner else get_member_role(studio, request.user)
+        resolved[url_extension] = StudioAccess(studio, is_owner, member_role)
+
+    return resolved[url_extension]
@@ -2,14 +2,115 @@
 # Add it to one of your django apps (/appdir/templatetags/render_vite_bundle.py, for example)
 
 import json
+import os
+import threading
 
 from django import template
 from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
 from django.utils.safestring import mark_safe
 
 register = template.Library()
 
 
+class ViteManifestRegistry:
+    """
+    Description:
+        Process level cache of the tags rendered from the vite manifest. The manifest is parsed
+        on the first render only, a new vite build is deployed with a restart of the app.
+
+    Collects:
+        tags: Precomputed script, stylesheet and modulepreload tags of the index.html entry,
+        None until the first render
+    """
+
+    entry = 'index.html'
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.tags = None
+
+    def get_manifest_path(self):
+        return os.path.join(settings.VITE_APP_DIR, 'dist', 'manifest.json')
+
+    def get_tags(self):
+        """
+        Description:
+            Returns the tags of the entry, built from the manifest on the first call.
+
+        Raises:
+            ImproperlyConfigured: The manifest is missing or invalid.
+        """
+
+        if self.tags is None:
+            with self.lock:
+                if self.tags is None:
+                    self.tags = self.build_tags(self.load_manifest(self.get_manifest_path()))
+
+        return self.tags
+
+    def load_manifest(self, manifest_path):
+        try:
+            with open(manifest_path, 'r') as manifest_file:
+                return json.load(manifest_file)
+        except FileNotFoundError:
+            raise ImproperlyConfigured(f'Vite manifest file not found at {manifest_path}, run the vite build first.')
+        except (OSError, ValueError) as error:
+            raise ImproperlyConfigured(f'Vite manifest file {manifest_path} is invalid: {error}')
+
+    def get_imported_chunks(self, manifest, chunk):
+        """
+        Description:
+            Every chunk statically imported by a chunk (recursively), in import order without duplicates.
+        """
+
+        imported = {}
+        pending = list(reversed(chunk.get('imports', [])))
+
+        while pending:
+            name = pending.pop()
+            if name not in imported:
+                imported[name] = manifest[name]
+                pending.extend(reversed(manifest[name].get('imports', [])))
+
+        return list(imported.values())
+
+    def get_url(self, file):
+        """
+        Description:
+            Url of a file of the vite build under its own (content hashed) name. The chunks import each
+            other by that name, so the staticfiles storage's second hash would only make the browser
+            download them twice, see app.static_files.VITE_HASHED_DIRS.
+        """
+        return f'{settings.STATIC_URL}dist/{file}'
+
+    def build_tags(self, manifest):
+        """
+        Description:
+            Builds the entry script, the stylesheets of the entry and its imports and a modulepreload
+            hint per imported chunk, so the browser fetches the chunks in parallel with the entry.
+        """
+
+        try:
+            entry = manifest[self.entry]
+            imported_chunks = self.get_imported_chunks(manifest, entry)
+        except KeyError as error:
+            raise ImproperlyConfigured(f'Vite manifest is missing the {error} chunk.')
+
+        stylesheets = dict.fromkeys(
+            css for chunk in [entry, *imported_chunks] for css in chunk.get('css', [])
+        )
+
+        tags = [f'<script type="module" src="{self.get_url(entry["file"])}"></script>']
+        tags += [f'<link rel="stylesheet" type="text/css" href="{self.get_url(css)}" />' for css in stylesheets]
+        tags += [f'<link rel="modulepreload" href="{self.get_url(chunk["file"])}" />' for chunk in imported_chunks]
+
+        return mark_safe('\n'.join(tags))
+
+
+manifest_registry = ViteManifestRegistry()
+
+
 @register.simple_tag
 def render_vite_bundle():
     """
@@ -18,23 +119,4 @@ def render_vite_bundle():
     For development, see other files.
     """
 
-    try:
-        fd = open(f"{settings.VITE_APP_DIR}/dist/manifest.json", "r")
-        manifest = json.load(fd)
-    except:
-        raise Exception(
-            f"Vite manifest file not found or invalid. Maybe your {settings.VITE_APP_DIR}/dist/manifest.json file is empty?"
-        )
-
-    imports_files = "".join(
-        [
-            f'<script type="module" src="/static/{manifest[file]["file"]}"></script>'
-            for file in manifest["index.html"]["imports"]
-        ]
-    )
-
-    return mark_safe(
-        f"""<script type="module" src="/static/{manifest['index.html']['file']}"></script>
-        <link rel="stylesheet" type="text/css" href="/static/{manifest['index.html']['css'][0]}" />
-        {imports_files}"""
-    )
+    return manifest_registry.get_tags()
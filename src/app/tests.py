@@ -0,0 +1,463 @@
+"""
+This module contains unit and integration tests for the app (project)
+module. Tests are designed to verify the functionality, correctness,
+and reliability of the entry point and authentication views.
+"""
+
+import json
+import os
+import tempfile
+from unittest import mock
+from allauth.account.models import EmailAddress
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import call_command
+from django.http import Http404
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from studio_suite.models import MemberStudioRelationship, StudioInfo
+from studio_suite.seed import SEED_PASSWORD
+from studio_suite.testing import TEST_CACHES, ViewBudgetTestCase
+from .cache import LocalTier, TwoTierCache
+from .single_flight import CachedComputation
+from .studio_access import NOT_A_MEMBER, get_member_role_by_id, get_studio, resolve_studio_access
+from .static_files import IMMUTABLE_CACHE_CONTROL, MUTABLE_CACHE_CONTROL, StaticFilesApplication
+from .templatetags.render_vite_bundle import ViteManifestRegistry
+
+
+def get_login_portal_url(seeded):
+    return reverse('login_portal', kwargs={'studio_url_extension': seeded['studio'].url_extension})
+
+
+
+class AppViewBudgetTests(ViewBudgetTestCase):
+    """
+    Description:
+        Query-count and latency budgets of the index and login-portal views, see ViewBudgetTestCase.
+    """
+
+    def test_index_view(self):
+        self.assertViewBudgetAtEachScale(lambda seeded: reverse('index'), 1, 0.25)
+
+    def test_login_portal_view(self):
+        self.assertViewBudgetAtEachScale(get_login_portal_url, 1, 0.25)
+
+    def test_login_portal_redirects_member(self):
+        self.assertViewBudgetAtEachScale(
+            get_login_portal_url, 3, 0.25, lambda seeded: seeded['member'], status_code=302,
+        )
+
+    def test_login_portal_redirects_owner(self):
+        self.assertViewBudgetAtEachScale(
+            get_login_portal_url, 2, 0.25, lambda seeded: seeded['owner'], status_code=302,
+        )
+
+    def test_login_portal_joins_new_member(self):
+        for scale, seeded in self.scales.items():
+            with self.subTest(scale=scale):
+                user = User.objects.create_user(username=f'{scale}-new-member', email=f'{scale}-new-member@example.com')
+
+                # Owner check, member check, studio lookup and the relationship get_or_create (in a savepoint).
+                # The version bump and availability reset run once the request commits.
+                self.assertViewBudget(get_login_portal_url(seeded), 8, 0.25, user=user, status_code=302, warm=False)
+                self.assertTrue(MemberStudioRelationship.objects.filter(member=user, studio=seeded['studio']).exists())
+
+    def test_login_portal_login(self):
+        for scale, seeded in self.scales.items():
+            with self.subTest(scale=scale):
+                self.client.logout()
+                member = User.objects.filter(memberstudiorelationship__studio=seeded['studio']).first()
+                EmailAddress.objects.create(user=member, email=member.email, verified=True, primary=True)
+
+                response = self.assertViewBudget(
+                    get_login_portal_url(seeded),
+                    5,
+                    0.5,
+                    method='post',
+                    data={'login': member.username, 'password': SEED_PASSWORD},
+                    status_code=302,
+                    warm=False,
+                )
+                self.assertRedirects(
+                    response,
+                    reverse('member_home', kwargs={'studio_url_extension': seeded['studio'].url_extension}),
+                    fetch_redirect_response=False,
+                )
+
+
+
+class ViteManifestRegistryTests(SimpleTestCase):
+    """
+    Description:
+        Tests the vite manifest is parsed once and its tags point at the vite build names.
+    """
+
+    manifest = {
+        'index.html': {'file': 'assets/index.js', 'css': ['assets/index.css'], 'imports': ['_vendor.js']},
+        '_vendor.js': {'file': 'assets/vendor.js', 'css': ['assets/vendor.css'], 'imports': ['_shared.js']},
+        '_shared.js': {'file': 'assets/shared.js'},
+    }
+
+    def setUp(self):
+        self.vite_app_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.vite_app_dir.cleanup)
+        os.mkdir(os.path.join(self.vite_app_dir.name, 'dist'))
+        self.manifest_path = os.path.join(self.vite_app_dir.name, 'dist', 'manifest.json')
+
+        settings_override = override_settings(
+            VITE_APP_DIR=self.vite_app_dir.name,
+            STATIC_URL='/static/',
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.registry = ViteManifestRegistry()
+
+    def write_manifest(self, manifest):
+        with open(self.manifest_path, 'w') as manifest_file:
+            json.dump(manifest, manifest_file)
+
+    def test_renders_entry_stylesheets_and_preloads(self):
+        self.write_manifest(self.manifest)
+
+        self.assertEqual(self.registry.get_tags().split('\n'), [
+            '<script type="module" src="/static/dist/assets/index.js"></script>',
+            '<link rel="stylesheet" type="text/css" href="/static/dist/assets/index.css" />',
+            '<link rel="stylesheet" type="text/css" href="/static/dist/assets/vendor.css" />',
+            '<link rel="modulepreload" href="/static/dist/assets/vendor.js" />',
+            '<link rel="modulepreload" href="/static/dist/assets/shared.js" />',
+        ])
+
+    def test_parses_manifest_once(self):
+        self.write_manifest(self.manifest)
+
+        with mock.patch.object(self.registry, 'load_manifest', wraps=self.registry.load_manifest) as load_manifest:
+            tags = [self.registry.get_tags() for _ in range(3)]
+
+        self.assertEqual(load_manifest.call_count, 1)
+        self.assertEqual(len(set(tags)), 1)
+
+    def test_missing_manifest(self):
+        with self.assertRaises(ImproperlyConfigured):
+            self.registry.get_tags()
+
+
+
+class StaticFilesTests(SimpleTestCase):
+    """
+    Description:
+        Tests collectstatic writes hashed and compressed files and StaticFilesApplication serves them.
+    """
+
+    def setUp(self):
+        source_dir = tempfile.TemporaryDirectory()
+        static_root = tempfile.TemporaryDirectory()
+        self.addCleanup(source_dir.cleanup)
+        self.addCleanup(static_root.cleanup)
+        self.static_root = static_root.name
+
+        with open(os.path.join(source_dir.name, 'app.css'), 'w') as css_file:
+            css_file.write('body { color: black; }\n' * 100)
+
+        # A vite build, its chunks are named by their content hash.
+        os.makedirs(os.path.join(source_dir.name, 'dist', 'assets'))
+        with open(os.path.join(source_dir.name, 'dist', 'assets', 'index-4f2a9c.js'), 'w') as js_file:
+            js_file.write('console.log("kilns");\n')
+        with open(os.path.join(source_dir.name, 'dist', 'manifest.json'), 'w') as manifest_file:
+            json.dump({'index.html': {'file': 'assets/index-4f2a9c.js'}}, manifest_file)
+
+        settings_override = override_settings(
+            VITE_APP_DIR=source_dir.name,
+            STATICFILES_DIRS=[source_dir.name],
+            STATIC_ROOT=self.static_root,
+            STATIC_URL='/static/',
+            INSTALLED_APPS=['django.contrib.staticfiles'],
+            STORAGES={'staticfiles': {'BACKEND': 'app.static_files.CompressedManifestStaticFilesStorage'}},
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        call_command('collectstatic', interactive=False, verbosity=0)
+
+        with open(os.path.join(self.static_root, 'staticfiles.json')) as manifest_file:
+            self.hashed_name = json.load(manifest_file)['paths']['app.css']
+
+        self.application = StaticFilesApplication(self.django_application)
+
+    def django_application(self, environ, start_response):
+        start_response('404 Not Found', [])
+        return [b'django']
+
+    def request(self, path, method='GET', accept_encoding=''):
+        response = {}
+
+        def start_response(status, headers):
+            response['status'] = status
+            response['headers'] = dict(headers)
+
+        environ = {'PATH_INFO': path, 'REQUEST_METHOD': method, 'HTTP_ACCEPT_ENCODING': accept_encoding}
+        response['body'] = b''.join(self.application(environ, start_response))
+
+        return response
+
+    def test_writes_compressed_variants(self):
+        self.assertTrue(os.path.exists(os.path.join(self.static_root, self.hashed_name + '.gz')))
+        self.assertTrue(os.path.exists(os.path.join(self.static_root, 'app.css.gz')))
+
+    def test_serves_hashed_file_compressed_and_immutable(self):
+        response = self.request(f'/static/{self.hashed_name}', accept_encoding='deflate, gzip')
+
+        self.assertEqual(response['status'], '200 OK')
+        self.assertEqual(response['headers']['Content-Encoding'], 'gzip')
+        self.assertEqual(response['headers']['Cache-Control'], IMMUTABLE_CACHE_CONTROL)
+        self.assertEqual(response['headers']['Vary'], 'Accept-Encoding')
+        self.assertEqual(int(response['headers']['Content-Length']), len(response['body']))
+
+    def test_serves_unhashed_file_uncompressed(self):
+        response = self.request('/static/app.css', accept_encoding='gzip;q=0')
+
+        self.assertNotIn('Content-Encoding', response['headers'])
+        self.assertEqual(response['headers']['Cache-Control'], MUTABLE_CACHE_CONTROL)
+        self.assertEqual(response['body'], b'body { color: black; }\n' * 100)
+
+    def test_serves_vite_chunks_immutable(self):
+        response = self.request('/static/dist/assets/index-4f2a9c.js')
+
+        self.assertEqual(response['status'], '200 OK')
+        self.assertEqual(response['headers']['Cache-Control'], IMMUTABLE_CACHE_CONTROL)
+
+    def test_vite_bundle_uses_vite_names(self):
+        # The chunks import each other by their vite name, the bundle must not point at a second copy.
+        self.assertEqual(ViteManifestRegistry().get_tags(), '<script type="module" src="/static/dist/assets/index-4f2a9c.js"></script>')
+
+    def test_head_request(self):
+        response = self.request(f'/static/{self.hashed_name}', method='HEAD')
+
+        self.assertEqual(response['status'], '200 OK')
+        self.assertEqual(response['body'], b'')
+
+    def test_passes_other_requests_to_django(self):
+        self.assertEqual(self.request('/static/missing.css')['body'], b'django')
+        self.assertEqual(self.request('/')['body'], b'django')
+        self.assertEqual(self.request(f'/static/{self.hashed_name}', method='POST')['body'], b'django')
+
+
+
+class LocalTierTests(SimpleTestCase):
+    """
+    Description:
+        Tests the in-process LRU tier of the two-tier cache.
+    """
+
+    def setUp(self):
+        self.local = LocalTier(max_entries=2, timeout=30)
+
+    def test_evicts_least_recently_used(self):
+        self.local.set_if_current(0, {'a': b'1', 'b': b'2'})
+        self.local.get('a')
+        self.local.set_if_current(0, {'c': b'3'})
+
+        self.assertEqual(self.local.get('a'), b'1')
+        self.assertIsNone(self.local.get('b'))
+        self.assertEqual(self.local.get('c'), b'3')
+
+    def test_expires_entries(self):
+        with mock.patch('app.cache.time.monotonic', return_value=100):
+            self.local.set_if_current(0, {'a': b'1'})
+        with mock.patch('app.cache.time.monotonic', return_value=129):
+            self.assertEqual(self.local.get('a'), b'1')
+        with mock.patch('app.cache.time.monotonic', return_value=130):
+            self.assertIsNone(self.local.get('a'))
+
+    def test_invalidate(self):
+        self.local.set_if_current(0, {'a': b'1', 'b': b'2'})
+
+        self.local.invalidate(['a'])
+        self.assertIsNone(self.local.get('a'))
+        self.assertEqual(self.local.get('b'), b'2')
+
+        self.local.invalidate()
+        self.assertIsNone(self.local.get('b'))
+
+    def test_skips_values_read_before_an_invalidation(self):
+        generation = self.local.generation
+        self.local.invalidate(['a'])  # Published while the value was being read from Redis.
+        self.local.set_if_current(generation, {'a': b'stale'})
+
+        self.assertIsNone(self.local.get('a'))
+
+    def test_cache_options(self):
+        cache = TwoTierCache('redis://localhost:6379/1', {'OPTIONS': {'LOCAL_MAX_ENTRIES': 5, 'LOCAL_TIMEOUT': 2, 'db': 1}})
+
+        self.assertEqual((cache.local.max_entries, cache.local.timeout), (5, 2))
+        self.assertEqual(cache._options, {'db': 1})
+
+    def test_local_keys(self):
+        cache = TwoTierCache('redis://localhost:6379/1', {'OPTIONS': {'LOCAL_KEYS': [r'studio:[^:]+$']}})
+        client = mock.Mock()
+        client.mget.side_effect = lambda keys: [cache._cache._serializer.dumps(1) for _ in keys]
+
+        with mock.patch.object(cache, 'ensure_subscriber'), mock.patch.object(cache._cache, 'get_client', return_value=client):
+            for _ in range(2):
+                self.assertEqual(cache.get_many(['studio:pottery', 'studio:1:version']), {'studio:pottery': 1, 'studio:1:version': 1})
+                self.assertEqual(cache.get('studio:1:member:2'), 1)
+
+        # Only the studio is answered by the local tier the second time.
+        self.assertEqual(client.mget.call_args_list[2:], [mock.call([cache.make_key('studio:1:version')]), mock.call([cache.make_key('studio:1:member:2')])])
+        self.assertEqual(cache.get_stats(), {'local_hits': 1, 'local_misses': 1, 'redis_hits': 5, 'redis_misses': 0})
+
+    def test_publishes_local_keys_only(self):
+        cache = TwoTierCache('redis://localhost:6379/1', {'OPTIONS': {'LOCAL_KEYS': [r'studio:[^:]+$']}})
+        client = mock.Mock()
+
+        with mock.patch.object(cache._cache, 'get_client', return_value=client):
+            cache.set('studio:pottery', 1)
+            cache.set('studio:1:version', 1)
+            cache.incr('studio:1:version')
+            cache.add('studio:1:lock', 1)
+            cache.delete('studio:1:member:2')
+            cache.set_many({'studio:pottery': 1, 'studio:1:member:2': 1})
+            cache.delete_many(['studio:1:version', 'studio:1:modified'])
+
+        # Keys no local tier keeps are not published.
+        self.assertEqual(client.publish.call_args_list, [
+            mock.call(cache.channel, json.dumps([cache.make_key('studio:pottery')])),
+            mock.call(cache.channel, json.dumps([cache.make_key('studio:pottery')])),
+        ])
+
+
+
+@override_settings(CACHES=TEST_CACHES)
+class CachedComputationTests(SimpleTestCase):
+    """
+    Description:
+        Tests cached computations are recomputed by a single caller.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.calls = 0
+
+    def compute(self):
+        self.calls += 1
+        return self.calls
+
+    def test_computes_once(self):
+        computation = CachedComputation('computation', 60, version=1)
+
+        self.assertEqual(computation.get_or_compute(self.compute), 1)
+        self.assertEqual(computation.get_or_compute(self.compute), 1)
+        self.assertEqual(self.calls, 1)
+
+    def test_recomputes_outdated_version(self):
+        CachedComputation('computation', 60, version=1).get_or_compute(self.compute)
+
+        self.assertEqual(CachedComputation('computation', 60, version=2).get_or_compute(self.compute), 2)
+
+    def test_serves_previous_value_while_locked(self):
+        CachedComputation('computation', 60, version=1).get_or_compute(self.compute)
+        computation = CachedComputation('computation', 60, version=2)
+        computation.acquire()  # Another caller is recomputing.
+
+        self.assertEqual(computation.get_or_compute(self.compute), 1)
+        self.assertEqual(self.calls, 1)
+
+    def test_waits_for_lock_holder(self):
+        computation = CachedComputation('computation', 60, version=1)
+        computation.acquire()
+
+        # The lock holder finishes while this caller waits.
+        with mock.patch('app.single_flight.time.sleep', side_effect=lambda _: computation.compute(lambda: 'computed')):
+            self.assertEqual(computation.get_or_compute(self.compute), 'computed')
+
+        self.assertEqual(self.calls, 0)
+
+    def test_computes_when_lock_holder_is_slow(self):
+        computation = CachedComputation('computation', 60, version=1)
+        computation.acquire()
+
+        with mock.patch('app.single_flight.WAIT_TIMEOUT', 0):
+            self.assertEqual(computation.get_or_compute(self.compute), 1)
+
+    def test_refreshes_early(self):
+        computation = CachedComputation('computation', 60, version=1)
+        cache.set('computation', {'value': 'cached', 'version': 1, 'delta': 5, 'expires': 1000})
+
+        with mock.patch('app.single_flight.time.time', return_value=990):
+            with mock.patch('app.single_flight.random.random', return_value=0.5):
+                self.assertTrue(computation.is_fresh(cache.get('computation')))  # 5 * ln(2) < 10 seconds left.
+            with mock.patch('app.single_flight.random.random', return_value=0.9):
+                self.assertFalse(computation.is_fresh(cache.get('computation')))  # 5 * ln(10) > 10 seconds left.
+
+
+
+@override_settings(CACHES=TEST_CACHES)
+class StudioAccessTests(TestCase):
+    """
+    Description:
+        Tests the cached studio and member role lookups and their invalidation.
+    """
+
+    def setUp(self):
+        cache.clear()
+        owner = User.objects.create_user(username='owner', email='owner@example.com')
+        self.studio = StudioInfo.objects.create(
+            linked_account=owner, url_extension='test-studio', name='Test Studio', bio='', new_member_role='RM',
+        )
+        self.member = User.objects.create_user(username='member', email='member@example.com')
+        self.relationship = MemberStudioRelationship.objects.create(member=self.member, studio=self.studio, member_role='RM')
+
+    def test_get_studio_is_cached(self):
+        with self.assertNumQueries(1):
+            self.assertEqual(get_studio('test-studio'), self.studio)
+        with self.assertNumQueries(0):
+            self.assertEqual(get_studio('test-studio'), self.studio)
+
+        with self.assertRaises(Http404):
+            get_studio('missing-studio')
+
+    def test_renamed_studio_is_dropped(self):
+        studio = get_studio('test-studio')
+        studio = StudioInfo.objects.get(pk=studio.pk)
+
+        studio.url_extension = 'renamed-studio'
+        with self.captureOnCommitCallbacks(execute=True):
+            studio.save()
+
+        with self.assertRaises(Http404):
+            get_studio('test-studio')
+        self.assertEqual(get_studio('renamed-studio').url_extension, 'renamed-studio')
+
+    def test_member_role_is_cached_until_changed(self):
+        with self.assertNumQueries(1):
+            self.assertEqual(get_member_role_by_id(self.studio, self.member.pk), 'RM')
+        with self.assertNumQueries(0):
+            self.assertEqual(get_member_role_by_id(self.studio, self.member.pk), 'RM')
+
+        self.relationship.member_role = 'TECH'
+        with self.captureOnCommitCallbacks(execute=True):
+            self.relationship.save()
+        self.assertEqual(get_member_role_by_id(self.studio, self.member.pk), 'TECH')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.relationship.delete()
+        self.assertEqual(get_member_role_by_id(self.studio, self.member.pk), NOT_A_MEMBER)
+
+    def test_resolve_studio_access_once_per_request(self):
+        request = RequestFactory().get('/')
+        request.user = self.member
+
+        with self.assertNumQueries(2):
+            access = resolve_studio_access(request, 'test-studio')
+        self.assertEqual((access.studio, access.is_owner, access.member_role, access.is_member), (self.studio, False, 'RM', True))
+
+        # Later lookups within the request skip the cache as well.
+        cache.clear()
+        with self.assertNumQueries(0):
+            self.assertIs(resolve_studio_access(request, 'test-studio'), access)
+
+        request = RequestFactory().get('/')
+        request.user = self.studio.linked_account
+        access = resolve_studio_access(request, 'test-studio')
+        self.assertEqual((access.is_owner, access.member_role, access.is_member), (True, NOT_A_MEMBER, True))
@@ -85,13 +85,14 @@ if settings.DEBUG:
         path('^__debug__/', include(debug_toolbar.urls)),
     ]
 
-urlpatterns += [
-    re_path(
-        r'^static/(?P<path>.*)$',
-        serve,
-        {
-            'document_root': settings.STATIC_ROOT,
-            'show_indexes': True
-        },
-    )
-]
+    # In production static files are served by app.static_files.StaticFilesApplication (see app/wsgi.py).
+    urlpatterns += [
+        re_path(
+            r'^static/(?P<path>.*)$',
+            serve,
+            {
+                'document_root': settings.STATIC_ROOT,
+                'show_indexes': True
+            },
+        )
+    ]
@@ -82,7 +82,7 @@ class ExtendedLoginView(LoginView):
                     return redirect('member_home', studio_url_extension=studio_url_extension)
                 else:
                     studio = get_object_or_404(StudioInfo, url_extension=studio_url_extension)
-                    MemberStudioRelationship.objects.create(member=request.user, studio=studio, member_role=studio.new_member_role)
+                    MemberStudioRelationship.objects.get_or_create(member=request.user, studio=studio, defaults={'member_role': studio.new_member_role})
                     return redirect('member_home', studio_url_extension=studio_url_extension)
 
         return super().dispatch(request, *args, **kwargs)
@@ -132,7 +132,7 @@ class ExtendedLoginView(LoginView):
                 return redirect('member_home', studio_url_extension=studio_url_extension)
             else:
                 studio = get_object_or_404(StudioInfo, url_extension=studio_url_extension)
-                MemberStudioRelationship.objects.create(member=req_user, studio=studio, member_role=studio.new_member_role)
+                MemberStudioRelationship.objects.get_or_create(member=req_user, studio=studio, defaults={'member_role': studio.new_member_role})
                 return redirect('member_home', studio_url_extension=studio_url_extension)
 
 
@@ -184,7 +184,7 @@ class MemberSignupView(SignupView):
         studio_url_extension = self.kwargs['studio_url_extension']
         studio = get_object_or_404(StudioInfo, url_extension=studio_url_extension)
 
-        MemberStudioRelationship.objects.get_or_create(member=user, studio=studio, member_role=studio.new_member_role)
+        MemberStudioRelationship.objects.get_or_create(member=user, studio=studio, defaults={'member_role': studio.new_member_role})
 
         # Once operations are completed successfully, login the member
         login(self.request, user, backend='django.contrib.auth.backends.ModelBackend')
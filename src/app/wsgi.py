@@ -9,8 +9,15 @@ https://docs.djangoproject.com/en/4.2/howto/deployment/wsgi/
 
 import os
 
+from django.conf import settings
 from django.core.wsgi import get_wsgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'app.settings')
 
 application = get_wsgi_application()
+
+# In production static files are served from STATIC_ROOT before the request reaches Django.
+if not settings.DEBUG:
+    from app.static_files import StaticFilesApplication
+
+    application = StaticFilesApplication(application)
@@ -4,7 +4,7 @@ models and their data through the Django admin interface.
 """
 
 from django.contrib import admin
-from .models import BookingManagement
+from .models import AvailabilityChange, BookingManagement
 
 class BookingManagementAdmin(admin.ModelAdmin):
     """
@@ -16,3 +16,15 @@ class BookingManagementAdmin(admin.ModelAdmin):
     search_fields = ('studio__name', 'member__username', 'timeslot__name', 'booking_date')
 
 admin.site.register(BookingManagement, BookingManagementAdmin)
+
+
+class AvailabilityChangeAdmin(admin.ModelAdmin):
+    """
+    Description:
+        Read the availability change log of a studio, see member_suite.changes.
+    """
+    list_display = ('studio', 'version', 'kind', 'timeslot', 'occurrence_date', 'created')
+    list_filter = ('kind', 'created')
+    search_fields = ('studio__name',)
+
+admin.site.register(AvailabilityChange, AvailabilityChangeAdmin)
@@ -1,6 +1,6 @@
 """
 This module defines the configuration for the 'member_suite' Django application.
-It specifies the app's name and database field configuration.
+It specifies the app's name, database field configuration and connects its signals.
 """
 
 from django.apps import AppConfig
@@ -15,3 +15,11 @@ class MembersuiteConfig(AppConfig):
 
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'member_suite'
+
+    def ready(self):
+        """
+        Description:
+            Connects the member_suite signal receivers once the app registry is ready.
+        """
+
+        import member_suite.signals  # noqa
@@ -0,0 +1,304 @@
+"""
+Availability building for the member booking page.
+
+Relates a studios materialized timeslot occurrences to the days of a date range and marks
+which of them are already booked. Bookings are loaded once into a set keyed by
+(timeslot_id, date), so every is-booked check is a constant time lookup. Timeslots the
+member may not book are filtered out in the database (see TimeslotManagementQuerySet.bookable_by)
+and never loaded.
+
+Built availability is cached per studio version and member role (see get_availability), so
+members loading the booking page at once share a single build.
+
+Availability is built for one window of days at a time (see AvailabilityWindow), so the cost of
+a request follows the days it shows rather than how far ahead the studio opens bookings.
+
+Days hold compact Slot records sharing one TimeslotSummary per timeslot rather than dicts of
+model instances, which keeps builds small in memory and cheap to (un)pickle from the cache.
+The booking page renders their hidden booking inputs directly, see member_suite.templatetags.booking_inputs.
+"""
+
+from datetime import date, datetime, time, timedelta
+from django.utils import timezone
+from app.single_flight import CachedComputation
+from studio_suite.models import StudioInfo, TimeslotManagement, TimeslotOccurrence
+from studio_suite.occurrences import OCCURRENCE_HORIZON_DAYS, roll_forward_occurrences
+from studio_suite.versioning import get_studio_version
+from .models import BookingManagement
+
+AVAILABILITY_CACHE_TIMEOUT = 60 * 10  # 10 minutes in seconds, bookings and schedule changes replace it sooner.
+AVAILABILITY_CACHE_REVISION = 2  # Increment when the cached Slot or TimeslotSummary layout changes.
+
+
+def get_availability_cache_key(studio_id, member_role: str, date_list: list):
+    """
+    Description:
+        Cache key of the availability of a studio for a member role (None for the owner) and date range.
+    """
+    return (
+        f'studio:{studio_id}:availability:{AVAILABILITY_CACHE_REVISION}:'
+        f'{"owner" if member_role is None else member_role}:{date_list[0]}:{date_list[-1]}'
+    )
+
+
+def get_availability(studio: StudioInfo, date_list: list, member_role: str = None):
+    """
+    Description:
+        AvailabilityBuilder.build, cached at the current studio version, see get_availability_entry.
+
+    Returns:
+        dict: A dictionary where keys are dates and values are lists of bookable timeslots for each date.
+    """
+    return get_availability_entry(studio, date_list, member_role)['value']
+
+
+def get_availability_entry(studio: StudioInfo, date_list: list, member_role: str = None):
+    """
+    Description:
+        Cached availability and the studio version it was built at. When a booking or schedule
+        change outdates it, a single request rebuilds it while concurrent requests are served
+        the previous availability, see CachedComputation. Bookings are still refused by the
+        database when a slot shown as free was just booked.
+
+    Returns:
+        dict: The availability (value) and its studio version (version).
+    """
+
+    version, _ = get_studio_version(studio.pk)
+    computation = CachedComputation(
+        get_availability_cache_key(studio.pk, member_role, date_list),
+        AVAILABILITY_CACHE_TIMEOUT,
+        version,
+    )
+
+    return computation.get_or_compute_entry(AvailabilityBuilder(studio, date_list, member_role).build)
+
+
+class TimeslotSummary:
+    """
+    Description:
+        The fields of a timeslot the booking page displays, shared by all of its slots.
+
+    Collects:
+        id: TimeslotManagement id
+        kiln: Name of the timeslots kiln
+        load_after_time: Latest time the kiln will be loaded that day
+        min_role_required: Minimum member role required to book the timeslot
+        notes: Studio notes about the timeslot, empty when there are none
+    """
+
+    __slots__ = ('id', 'kiln', 'load_after_time', 'min_role_required', 'notes')
+
+    def __init__(self, id, kiln: str, load_after_time: time, min_role_required: str, notes: str):
+        self.id = id
+        self.kiln = kiln
+        self.load_after_time = load_after_time
+        self.min_role_required = min_role_required
+        self.notes = notes or ''
+
+    def __reduce__(self):
+        # Pickle as the constructor arguments, rather than a dict of every slot name, see Slot.__reduce__.
+        return TimeslotSummary, (self.id, self.kiln, self.load_after_time, self.min_role_required, self.notes)
+
+
+class Slot:
+    """
+    Description:
+        A timeslot on one day of the availability.
+
+    Collects:
+        timeslot: TimeslotSummary of the timeslot
+        day: Date of the occurrence
+        is_booked: Someone booked the timeslot on that day
+    """
+
+    __slots__ = ('timeslot', 'day', 'is_booked')
+
+    def __init__(self, timeslot: TimeslotSummary, day: date, is_booked: bool):
+        self.timeslot = timeslot
+        self.day = day
+        self.is_booked = is_booked
+
+    def __reduce__(self):
+        # Cached availability holds a Slot for every day of every timeslot, pickling each as its
+        # constructor arguments keeps them smaller than the dict of slot names pickle defaults to.
+        return Slot, (self.timeslot, self.day, self.is_booked)
+
+
+class AvailabilityWindow:
+    """
+    Description:
+        Consecutive days of availability shown at once, within the studios booking horizon.
+        Windows page forward and backward by their own length from today, so members paging
+        through the same studio request (and share the cached availability of) the same windows.
+
+    Collects:
+        start: First day of the window, moved into the booking horizon when outside it
+        days: Number of days, the studios availability_window by default
+        first_day: Today, the first bookable day
+        last_day: Last bookable day of the booking horizon
+    """
+
+    def __init__(self, studio: StudioInfo, start: date = None, days: int = None, today: date = None):
+        self.first_day = today or timezone.localdate()
+
+        # Occurrences are only materialized so far ahead, see studio_suite.occurrences.
+        horizon = min(studio.booking_horizon, OCCURRENCE_HORIZON_DAYS)
+        self.last_day = self.first_day + timedelta(days=horizon - 1)
+
+        self.days = min(days or studio.availability_window, horizon)
+        latest_start = self.last_day - timedelta(days=self.days - 1)
+        self.start = min(max(start or self.first_day, self.first_day), latest_start)
+
+    @property
+    def date_list(self):
+        return [self.start + timedelta(days=day) for day in range(self.days)]
+
+    @property
+    def previous_start(self):
+        """
+        Description:
+            Start of the previous window, None when this window starts today.
+        """
+
+        if self.start == self.first_day:
+            return None
+
+        return max(self.start - timedelta(days=self.days), self.first_day)
+
+    @property
+    def next_start(self):
+        """
+        Description:
+            Start of the next window, None when this window ends the booking horizon.
+        """
+
+        if self.date_list[-1] >= self.last_day:
+            return None
+
+        return self.start + timedelta(days=self.days)
+
+
+class AvailabilityBuilder:
+    """
+    Description:
+        Builds the bookable timeslots of a studio for a list of consecutive days.
+
+    Collects:
+        studio: StudioInfo object whose timeslots are being built
+        date_list: Consecutive dates to build availability for
+        member_role: Role of the requesting member, None when the studio owner is requesting
+    """
+
+    def __init__(self, studio: StudioInfo, date_list: list, member_role: str = None):
+        self.studio = studio
+        self.date_list = date_list
+        self.member_role = member_role
+
+    def get_booking_queryset(self):
+        """
+        Description:
+            (timeslot_id, booking_date) of every booking of the studio within the date range.
+        """
+
+        # Bookings are made at the load_after_time of a day in the current timezone, see book_timeslot.
+        return BookingManagement.objects.filter(
+            studio=self.studio,
+            booking_date__gte=timezone.make_aware(datetime.combine(self.date_list[0], time.min)),
+            booking_date__lt=timezone.make_aware(datetime.combine(self.date_list[-1] + timedelta(days=1), time.min)),
+        ).values_list('timeslot_id', 'booking_date')
+
+    def get_booked_slots(self):
+        """
+        Description:
+            Loads every booking of the studio within the date range in a single query.
+
+        Returns:
+            set: (timeslot_id, date) pairs that are already booked.
+        """
+
+        bookings = self.get_booking_queryset()
+
+        return {(timeslot_id, timezone.localtime(booking_date).date()) for timeslot_id, booking_date in bookings}
+
+    def get_timeslot_queryset(self):
+        """
+        Description:
+            TimeslotSummary fields of the timeslot rules occurring within the date range.
+        """
+
+        return TimeslotManagement.objects.filter(
+            studio=self.studio,
+            pk__in=self.get_occurrence_queryset().values('timeslot_id'),
+        ).values_list('id', 'kiln__kiln_name', 'load_after_time', 'min_role_required', 'notes')
+
+    def get_timeslots(self):
+        """
+        Description:
+            Loads the timeslot rules (with their kiln names) occurring within the date range once,
+            keyed by id, so every occurrence of a rule shares a single TimeslotSummary.
+        """
+
+        timeslots = self.get_timeslot_queryset()
+
+        return {fields[0]: TimeslotSummary(*fields) for fields in timeslots}
+
+    def get_occurrence_queryset(self):
+        """
+        Description:
+            Bookable occurrences of the studio within the date range.
+        """
+
+        occurrences = TimeslotOccurrence.objects.filter(
+            studio=self.studio,
+            occurrence_date__range=[self.date_list[0], self.date_list[-1]],
+        )
+
+        return self.filter_bookable(occurrences)
+
+    def get_occurrences(self):
+        """
+        Description:
+            Materialized (timeslot_id, date) occurrences of the studio within the date range.
+        """
+        return self.get_occurrence_queryset().order_by('occurrence_date', 'timeslot_id').values_list('timeslot_id', 'occurrence_date')
+
+    def filter_bookable(self, queryset):
+        """
+        Description:
+            Filters a timeslot (or occurrence) queryset to the timeslots the requesting member has the role for.
+            Studio owners can book every timeslot.
+        """
+
+        if self.member_role is None:
+            return queryset
+
+        return queryset.bookable_by(self.member_role)
+
+    def build(self):
+        """
+        Description:
+            Relates days to bookable timeslots for display. Occurrences the daily roll forward has not
+            materialized through the last day yet are generated first (see studio_suite.jobs.roll_timeslot_occurrences).
+
+        Returns:
+            dict: A dictionary where keys are dates and values are lists of the Slots of each date.
+        """
+
+        roll_forward_occurrences(until=self.date_list[-1], queryset=TimeslotManagement.objects.filter(studio=self.studio))
+
+        return self.assemble(self.get_booked_slots(), self.get_timeslots(), self.get_occurrences())
+
+    def assemble(self, booked_slots: set, timeslots: dict, occurrences):
+        """
+        Description:
+            Relates the loaded occurrences to the days of the date range, see build.
+        """
+
+        upcoming_timeslots = {key: [] for key in self.date_list}
+
+        for timeslot_id, day in occurrences:
+            upcoming_timeslots[day].append(Slot(timeslots[timeslot_id], day, (timeslot_id, day) in booked_slots))
+
+        return upcoming_timeslots
+
@@ -0,0 +1,104 @@
+"""
+Booking services for the member booking page.
+
+A timeslot can only be booked once per day, which is enforced by the unique_timeslot_booking
+constraint on BookingManagement. Bookings are inserted directly inside a savepoint and a
+constraint violation is reported as "already booked", so simultaneous requests for the same
+slot can't double book it and no separate exists() round trip is needed.
+
+Posted bookings are checked against what the booking page offers first, see get_bookable_timeslot.
+"""
+
+from datetime import date, datetime
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from studio_suite.models import StudioInfo, TimeslotManagement
+from .availability import AvailabilityWindow
+from .models import BookingManagement
+
+
+class BookingResult:
+    """
+    Description:
+        Outcome of a booking attempt.
+
+    Collects:
+        booking: The created BookingManagement object, None when the slot was already booked
+    """
+
+    def __init__(self, booking: BookingManagement = None):
+        self.booking = booking
+
+    @property
+    def already_booked(self):
+        """
+        Description:
+            The timeslot was booked by someone else on that day.
+        """
+        return self.booking is None
+
+
+def get_member_bookings(studio: StudioInfo, member):
+    """
+    Description:
+        Bookings of a member within the studio, with their timeslots and kilns.
+    """
+    return BookingManagement.objects.filter(member=member, studio=studio).select_related('timeslot__kiln')
+
+
+def get_bookable_timeslot_queryset(studio: StudioInfo, timeslot_id: int, day: date, member_role: str = None):
+    """
+    Description:
+        The timeslot of the studio if it occurs on day and the member role (None for the studio
+        owner) may book it, see get_bookable_timeslot.
+    """
+
+    timeslots = TimeslotManagement.objects.filter(studio=studio, pk=timeslot_id, occurrences__occurrence_date=day)
+    if member_role is not None:
+        timeslots = timeslots.bookable_by(member_role)
+
+    return timeslots
+
+
+def get_bookable_timeslot(studio: StudioInfo, timeslot_id: int, day: date, member_role: str = None):
+    """
+    Description:
+        A timeslot of the studio, if the booking page offers it on day: the day is within the booking
+        horizon (see AvailabilityWindow), the timeslot occurs on it (see TimeslotOccurrence) and the
+        member role (None for the studio owner) may book it.
+
+    Returns:
+        TimeslotManagement: The timeslot, None when it can't be booked on that day.
+    """
+
+    window = AvailabilityWindow(studio)
+    if not window.first_day <= day <= window.last_day:
+        return None
+
+    return get_bookable_timeslot_queryset(studio, timeslot_id, day, member_role).first()
+
+
+def book_timeslot(studio: StudioInfo, member, timeslot: TimeslotManagement, day: date):
+    """
+    Description:
+        Books a timeslot on a day for a member, the booking date is the day at the
+        load_after_time of the timeslot.
+
+    Returns:
+        BookingResult: The created booking, or an already booked result.
+    """
+
+    booking_date = timezone.make_aware(datetime.combine(day, timeslot.load_after_time))
+
+    try:
+        with transaction.atomic():
+            booking = BookingManagement.objects.create(
+                studio=studio,
+                member=member,
+                timeslot=timeslot,
+                booking_date=booking_date,
+            )
+    except IntegrityError:
+        return BookingResult()
+
+    return BookingResult(booking)
@@ -0,0 +1,195 @@
+"""
+iCalendar (.ics) feeds of kiln bookings.
+
+Calendar clients poll feeds without logging in, so a feed url carries a token signed with the
+SECRET_KEY naming the studio, the user and the kind of feed:
+    - Member feed: The bookings of the user within the studio
+    - Studio feed: Every booking of the studio, only valid for the studio owner
+
+Feeds are written as a stream of events, see CalendarFeed, and validated by the studio version
+(see studio_suite.versioning) so unchanged feeds are answered without a database query.
+"""
+
+from datetime import datetime, timedelta, timezone as dt_timezone
+from django.core import signing
+from django.urls import reverse
+from django.utils import timezone
+from studio_suite.models import StudioInfo
+from .models import BookingManagement
+
+FEED_TOKEN_SALT = 'member_suite.calendar'
+MEMBER_FEED = 'member'
+STUDIO_FEED = 'studio'
+FEED_PAST_DAYS = 30  # Past bookings kept in a feed.
+FEED_CHUNK_SIZE = 500  # Bookings fetched per database round trip while streaming.
+LINE_LENGTH = 75  # Octets per line before folding, see RFC 5545 section 3.1.
+
+
+def make_feed_token(studio: StudioInfo, user_id: int, feed: str):
+    """
+    Description:
+        Signs the studio, user and kind of a feed into a url safe token.
+    """
+    return signing.dumps({'studio': str(studio.pk), 'user': user_id, 'feed': feed}, salt=FEED_TOKEN_SALT)
+
+
+def read_feed_token(token: str):
+    """
+    Description:
+        Verifies a feed token.
+
+    Returns:
+        dict: The signed studio, user and feed, None if the token was not signed by this server.
+    """
+
+    try:
+        return signing.loads(token, salt=FEED_TOKEN_SALT)
+    except signing.BadSignature:
+        return None
+
+
+def get_feed_url(request, studio: StudioInfo, user_id: int, feed: str):
+    """
+    Description:
+        Absolute url of a users feed, to be added to their calendar app.
+    """
+
+    return request.build_absolute_uri(reverse('calendar_feed', kwargs={
+        'studio_url_extension': studio.url_extension,
+        'token': make_feed_token(studio, user_id, feed),
+    }))
+
+
+def format_datetime(value: datetime):
+    """
+    Description:
+        Formats a datetime as an iCalendar UTC date-time, eg: 20240131T170000Z.
+    """
+    return value.astimezone(dt_timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+
+
+def escape_text(value: str):
+    """
+    Description:
+        Escapes an iCalendar TEXT value.
+    """
+
+    return (
+        value.replace('\\', '\\\\')
+        .replace(';', '\\;')
+        .replace(',', '\\,')
+        .replace('\r\n', '\\n')
+        .replace('\n', '\\n')
+    )
+
+
+def fold_line(line: str):
+    """
+    Description:
+        Folds a content line into lines of at most LINE_LENGTH octets, continuation lines
+        start with a space. Never splits a multi-byte character.
+
+    Returns:
+        str: The folded line, terminated by CRLF.
+    """
+
+    lines = []
+    current = ''
+    current_length = 0
+
+    for character in line:
+        character_length = len(character.encode('utf-8'))
+        if current_length + character_length > LINE_LENGTH:
+            lines.append(current)
+            current = ' '
+            current_length = 1
+        current += character
+        current_length += character_length
+
+    lines.append(current)
+
+    return '\r\n'.join(lines) + '\r\n'
+
+
+
+class CalendarFeed:
+    """
+    Description:
+        Streams the VCALENDAR of a member or studio feed, one VEVENT per booking.
+
+    Collects:
+        studio: StudioInfo object of the feed
+        feed: MEMBER_FEED or STUDIO_FEED
+        member_id: User id of the token, the member feed only holds their bookings
+        modified: Unix timestamp of the studio version, used as the DTSTAMP of every event
+        host: Host name used to build globally unique event UIDs
+    """
+
+    def __init__(self, studio: StudioInfo, feed: str, member_id: int, modified: int, host: str):
+        self.studio = studio
+        self.feed = feed
+        self.member_id = member_id
+        self.dtstamp = format_datetime(datetime.fromtimestamp(modified, dt_timezone.utc))
+        self.host = host
+
+    def get_bookings(self):
+        """
+        Description:
+            Bookings of the feed from FEED_PAST_DAYS ago onwards, fetched in chunks while streaming.
+        """
+
+        bookings = BookingManagement.objects.filter(
+            studio=self.studio,
+            booking_date__gte=timezone.now() - timedelta(days=FEED_PAST_DAYS),
+        ).select_related('timeslot__kiln').order_by('booking_date')
+
+        if self.feed == MEMBER_FEED:
+            bookings = bookings.filter(member_id=self.member_id)
+        else:
+            bookings = bookings.select_related('member')
+
+        return bookings.iterator(chunk_size=FEED_CHUNK_SIZE)
+
+    def get_event_lines(self, booking: BookingManagement):
+        """
+        Description:
+            Content lines of a bookings VEVENT.
+        """
+
+        summary = f'{booking.timeslot.kiln} kiln load'
+        if self.feed == STUDIO_FEED:
+            summary += f': {booking.member.username}'
+
+        lines = [
+            'BEGIN:VEVENT',
+            f'UID:booking-{booking.id}@{self.host}',
+            f'DTSTAMP:{self.dtstamp}',
+            f'DTSTART:{format_datetime(booking.booking_date)}',
+            f'SUMMARY:{escape_text(summary)}',
+        ]
+        if booking.timeslot.notes:
+            lines.append(f'DESCRIPTION:{escape_text(booking.timeslot.notes)}')
+        lines.append('END:VEVENT')
+
+        return lines
+
+    def stream(self):
+        """
+        Description:
+            Yields the calendar an event at a time, so the feed is never built in memory.
+        """
+
+        calendar_name = f'{self.studio.name} kiln bookings'
+        yield ''.join(fold_line(line) for line in [
+            'BEGIN:VCALENDAR',
+            'VERSION:2.0',
+            'PRODID:-//Handle//Kiln Bookings//EN',
+            'CALSCALE:GREGORIAN',
+            'METHOD:PUBLISH',
+            f'X-WR-CALNAME:{escape_text(calendar_name)}',
+        ])
+
+        for booking in self.get_bookings():
+            yield ''.join(fold_line(line) for line in self.get_event_lines(booking))
+
+        yield fold_line('END:VCALENDAR')
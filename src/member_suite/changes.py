@@ -0,0 +1,166 @@
+"""
+Append-only log of availability changes, so clients can pull the few slots that changed since
+the studio version they last saw instead of reloading the whole availability.
+
+Every booking and cancellation is logged as a slot change at the studio version it bumped to,
+see member_suite.signals. Schedule and membership changes alter many slots at once and are
+logged as a reset, which tells clients to reload their availability window. Changes are logged
+once their transaction has committed, so rolled back bookings are never logged. Bookings deleted
+together (a timeslot or studio and the bookings cascading with it) are logged in one insert.
+
+Log rows are not written under a lock, so a row may commit shortly after one at a newer version.
+Clients are handed the newest version logged more than CHANGE_SETTLE_TIME ago as their cursor,
+rather than the current version, so a change whose row commits late is returned next time instead
+of being skipped. Newer changes are returned again then, they are states of slots and are applied
+in version order, so applying one twice is harmless.
+
+Changes older than CHANGE_LOG_RETENTION are pruned daily and replaced by a reset at the newest
+pruned version, so clients that were away for longer reload as well.
+"""
+
+from datetime import timedelta
+from django.db import transaction
+from django.db.models import Max, Q
+from django.utils import timezone
+from studio_suite.models import StudioInfo, TimeslotManagement
+from studio_suite.versioning import bump_studio_version
+from .models import AvailabilityChange, BookingManagement
+
+CHANGE_LOG_RETENTION = timedelta(days=7)
+CHANGE_SETTLE_TIME = timedelta(seconds=5)  # Longer than a log row takes to commit after its version bump.
+MAX_CHANGES = 500  # Clients further behind reload their availability window.
+
+
+def log_changes(changes: list):
+    """
+    Description:
+        Bumps the version of each studio once and logs its changes at it, in a single insert.
+
+    Collects:
+        changes: (studio_id, kind, timeslot_id, occurrence_date) tuples, in the order they were made
+
+    Returns:
+        dict: Studio id to the version its changes were logged at.
+    """
+
+    versions = {}
+    for studio_id, _, _, _ in changes:
+        if studio_id not in versions:
+            versions[studio_id], _ = bump_studio_version(studio_id)
+
+    AvailabilityChange.objects.bulk_create([
+        AvailabilityChange(
+            studio_id=studio_id,
+            version=versions[studio_id],
+            kind=kind,
+            timeslot_id=timeslot_id,
+            occurrence_date=occurrence_date,
+        )
+        for studio_id, kind, timeslot_id, occurrence_date in changes
+    ])
+
+    return versions
+
+
+def log_change(studio_id, kind: str, timeslot_id=None, occurrence_date=None):
+    """
+    Description:
+        Bumps the version of a studio and logs a change at it, see log_changes.
+
+    Returns:
+        int: Version the change was logged at.
+    """
+    return log_changes([(studio_id, kind, timeslot_id, occurrence_date)])[studio_id]
+
+
+def record_slot_change(booking: BookingManagement, kind: str, origin=None):
+    """
+    Description:
+        Logs a booking (BOOKED) or cancellation (UNBOOKED) of a slot once the current
+        transaction commits, nothing is logged when it rolls back. The cancellations of one
+        deletion (origin, the instance or queryset delete was called on) are logged together.
+    """
+
+    change = (booking.studio_id, kind, booking.timeslot_id, timezone.localtime(booking.booking_date).date())
+    connection = transaction.get_connection()
+
+    if origin is None or not connection.in_atomic_block:
+        transaction.on_commit(lambda: log_changes([change]), robust=True)
+        return
+
+    # A commit or rollback replaces the queue of on_commit callbacks, the pending changes of an
+    # origin are only added to while the callback logging them is still queued.
+    queue, pending = getattr(origin, '_pending_availability_changes', (None, None))
+    if queue is not connection.run_on_commit:
+        pending = []
+        transaction.on_commit(lambda: log_changes(pending), robust=True)
+        origin._pending_availability_changes = (connection.run_on_commit, pending)
+
+    pending.append(change)
+
+
+def record_reset(studio_id):
+    """
+    Description:
+        Logs a change to many slots of a studio once the current transaction commits, clients
+        reload their availability.
+    """
+    transaction.on_commit(lambda: log_change(studio_id, AvailabilityChange.RESET), robust=True)
+
+
+def get_changes(studio: StudioInfo, since: int, member_role: str = None):
+    """
+    Description:
+        Logged slot changes of a studio after the since version.
+        Changes to timeslots the member may not book are left out (member_role None for the owner).
+
+    Returns:
+        tuple: (changes, version)
+            changes: [day, timeslot id, is booked] of every changed slot in version order, later
+            changes of a slot replace earlier ones. None when the client must reload instead.
+            version: Newest version logged CHANGE_SETTLE_TIME ago, the client passes it as since next time.
+    """
+
+    # The cursor only moves past settled rows, a row committing late is not skipped.
+    changes = AvailabilityChange.objects.filter(studio=studio, version__gt=since)
+    settled = changes.filter(created__lte=timezone.now() - CHANGE_SETTLE_TIME)
+    version = settled.aggregate(version=Max('version'))['version'] or since
+
+    if member_role is not None:
+        bookable_timeslots = TimeslotManagement.objects.filter(studio=studio).bookable_by(member_role)
+        changes = changes.filter(Q(kind=AvailabilityChange.RESET) | Q(timeslot__in=bookable_timeslots))
+
+    changes = list(changes.order_by('version', 'id').values_list('kind', 'timeslot_id', 'occurrence_date')[:MAX_CHANGES + 1])
+
+    if len(changes) > MAX_CHANGES or any(kind == AvailabilityChange.RESET for kind, _, _ in changes):
+        return None, version
+
+    return [
+        [occurrence_date.isoformat(), timeslot_id, kind == AvailabilityChange.BOOKED]
+        for kind, timeslot_id, occurrence_date in changes
+    ], version
+
+
+def prune_changes(before=None):
+    """
+    Description:
+        Deletes changes logged before a datetime (CHANGE_LOG_RETENTION ago by default), replacing
+        those of each studio with a reset at the newest deleted version.
+
+    Returns:
+        int: Number of deleted changes.
+    """
+
+    if before is None:
+        before = timezone.now() - CHANGE_LOG_RETENTION
+
+    old_changes = AvailabilityChange.objects.filter(created__lt=before)
+    pruned_versions = dict(old_changes.values('studio_id').annotate(version=Max('version')).values_list('studio_id', 'version'))
+
+    deleted, _ = old_changes.delete()
+    AvailabilityChange.objects.bulk_create([
+        AvailabilityChange(studio_id=studio_id, version=version, kind=AvailabilityChange.RESET)
+        for studio_id, version in pruned_versions.items()
+    ])
+
+    return deleted
@@ -0,0 +1,214 @@
+"""
+Benchmarks building the book-a-kiln availability for a large studio, and compares the memory
+allocated by its Slot records against the dicts of model instances and bound booking forms the
+page used to build (see member_suite.availability).
+
+Seeds a studio inside a transaction that is rolled back afterwards, so it is safe to run
+against a development database:
+    python manage.py benchmark_availability
+    python manage.py benchmark_availability --kilns 50 --timeslots 2000 --bookings 20000
+    python manage.py benchmark_availability --days 90
+
+Every occurrence within the seeders booking days (90) is booked at most once, so the bookings
+need enough timeslots: 500 timeslots hold about 5000 bookings, 2000 hold the 20000 by default.
+The benchmark fails when the bookings do not fit.
+"""
+
+import pickle
+import statistics
+import time
+import tracemalloc
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from studio_suite.seed import StudioSeeder
+from member_suite.availability import AvailabilityBuilder, AvailabilityWindow, get_availability
+from member_suite.forms import BookKilnForm
+from member_suite.templatetags.booking_inputs import booking_inputs
+from studio_suite.models import TimeslotManagement
+
+
+class Command(BaseCommand):
+    help = 'Times the booking page availability build against a seeded (and rolled back) studio.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--kilns', type=int, default=50)
+        parser.add_argument('--timeslots', type=int, default=2000)
+        parser.add_argument('--members', type=int, default=200)
+        parser.add_argument('--bookings', type=int, default=20000)
+        parser.add_argument('--runs', type=int, default=5)
+        parser.add_argument('--seed', type=int, default=1)
+        parser.add_argument('--days', type=int, help='Days of availability, the studios availability_window by default')
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            studio = self.seed(options)
+            self.run_benchmark(studio, options['runs'], options['days'])
+            self.compare_allocations(studio, options['days'])
+            transaction.set_rollback(True)
+
+    def seed(self, options):
+        """
+        Description:
+            Seeds one large studio, see StudioSeeder.
+        """
+
+        seeder = StudioSeeder(
+            studios=1,
+            kilns=options['kilns'],
+            timeslots=options['timeslots'],
+            members=options['members'],
+            bookings=options['bookings'],
+            prefix='benchmark',
+            seed=options['seed'],
+        )
+        studio = seeder.seed()[0]
+
+        if seeder.unplaced_bookings:
+            raise CommandError(
+                f"Only {seeder.counts.get('BookingManagement', 0)} of {options['bookings']} bookings fit the occurrences "
+                f"of the next {seeder.booking_days} days, pass more --timeslots or fewer --bookings."
+            )
+
+        self.stdout.write('Seeded ' + ', '.join(f'{count} {name}' for name, count in seeder.counts.items()) + '.')
+
+        return studio
+
+    def run_benchmark(self, studio, runs, days):
+        """
+        Description:
+            Times the availability build (including booking inputs) of the first window the same way BookAKilnView.get does.
+        """
+
+        date_list = AvailabilityWindow(studio, days=days).date_list
+        build_timings = []
+        page_timings = []
+        cached_timings = []  # Served by get_availability after the first run.
+
+        for _ in range(runs):
+            start = time.perf_counter()
+            AvailabilityBuilder(studio, date_list).build()
+            build_timings.append(time.perf_counter() - start)
+
+            with CaptureQueriesContext(connection) as queries:
+                start = time.perf_counter()
+                upcoming_timeslots = AvailabilityBuilder(studio, date_list).build()
+                self.render_booking_inputs(upcoming_timeslots)
+                page_timings.append(time.perf_counter() - start)
+
+            start = time.perf_counter()
+            self.render_booking_inputs(get_availability(studio, date_list))
+            cached_timings.append(time.perf_counter() - start)
+
+        slots = sum(len(day_slots) for day_slots in upcoming_timeslots.values())
+        self.stdout.write(f'Built {slots} slots over {len(date_list)} days in {len(queries)} queries.')
+        self.report('Availability build', build_timings)
+        self.report('Availability build with booking inputs', page_timings)
+        self.report('Cached availability with booking inputs', cached_timings)
+
+    def render_booking_inputs(self, upcoming_timeslots):
+        """
+        Description:
+            Renders the booking inputs of every open slot, as the booking page template does.
+        """
+        return [booking_inputs(slot) for day_slots in upcoming_timeslots.values() for slot in day_slots if not slot.is_booked]
+
+    def build_previous(self, studio, date_list):
+        """
+        Description:
+            The availability as the booking page used to build it, dicts holding the timeslot model
+            instance (with its kiln) of every slot and a bound BookKilnForm for every open one.
+
+        Returns:
+            tuple: (the availability as it was cached, the rendered booking forms)
+        """
+
+        builder = AvailabilityBuilder(studio, date_list)
+        booked_slots = builder.get_booked_slots()
+        timeslots = {
+            timeslot.id: timeslot
+            for timeslot in TimeslotManagement.objects.filter(
+                studio=studio,
+                pk__in=builder.get_occurrence_queryset().values('timeslot_id'),
+            ).select_related('kiln')
+        }
+
+        upcoming_timeslots = {day: [] for day in date_list}
+        for timeslot_id, day in builder.get_occurrences():
+            upcoming_timeslots[day].append({
+                'timeslot': timeslots[timeslot_id],
+                'is_booked': (timeslot_id, day) in booked_slots,
+            })
+        cached = pickle.dumps(upcoming_timeslots, pickle.HIGHEST_PROTOCOL)
+
+        forms = []
+        for day, timeslots_info in upcoming_timeslots.items():
+            for timeslot_info in timeslots_info:
+                if not timeslot_info['is_booked']:
+                    timeslot_info['booking_form'] = BookKilnForm({
+                        'book_timeslot': timeslot_info['timeslot'].id,
+                        'day': day.strftime('%Y-%m-%d'),
+                    })
+                    forms.append(timeslot_info['booking_form'].as_p())
+
+        return cached, forms
+
+    def build_slots(self, studio, date_list):
+        """
+        Description:
+            The availability as the booking page builds it, see build_previous.
+        """
+
+        upcoming_timeslots = AvailabilityBuilder(studio, date_list).build()
+
+        return pickle.dumps(upcoming_timeslots, pickle.HIGHEST_PROTOCOL), self.render_booking_inputs(upcoming_timeslots)
+
+    def measure(self, function, *args):
+        """
+        Description:
+            Traces the memory allocated while calling function.
+
+        Returns:
+            tuple: (peak bytes allocated during the call, bytes of the pickled availability)
+        """
+
+        function(*args)  # Warm up query compilation and template loading.
+
+        tracemalloc.start()
+        try:
+            cached, _ = function(*args)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        return peak, len(cached)
+
+    def compare_allocations(self, studio, days):
+        """
+        Description:
+            Compares the allocations of building and rendering the first window as Slot records
+            with booking inputs against the previous dicts with bound booking forms.
+        """
+
+        date_list = AvailabilityWindow(studio, days=days).date_list
+        previous_peak, previous_size = self.measure(self.build_previous, studio, date_list)
+        peak, size = self.measure(self.build_slots, studio, date_list)
+
+        self.stdout.write(
+            f'Previous dicts with booking forms: peak {previous_peak / 1024:.0f} KiB allocated, {previous_size / 1024:.0f} KiB cached.'
+        )
+        self.stdout.write(
+            f'Slots with booking inputs: peak {peak / 1024:.0f} KiB allocated ({peak / previous_peak:.0%}), '
+            f'{size / 1024:.0f} KiB cached ({size / previous_size:.0%}).'
+        )
+
+    def report(self, label, timings):
+        """
+        Description:
+            Writes the median and minimum of a list of timings in milliseconds.
+        """
+
+        self.stdout.write(
+            f'{label}: median {statistics.median(timings) * 1000:.1f} ms, '
+            f'min {min(timings) * 1000:.1f} ms over {len(timings)} runs.'
+        )
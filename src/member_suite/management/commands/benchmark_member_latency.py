@@ -0,0 +1,152 @@
+"""
+Compares the latency of the book-a-kiln page across running deployments, eg: the uWSGI deployment
+(sync views) against a local ASGI server with ASYNC_MEMBER_VIEWS (async views, see AsyncMemberView):
+    uwsgi --http :8000 --module app.wsgi:application --processes 4
+    ASYNC_MEMBER_VIEWS=1 uvicorn app.asgi:application --port 8001 --workers 4
+    python manage.py benchmark_member_latency --target uwsgi=http://127.0.0.1:8000 --target asgi=http://127.0.0.1:8001
+
+The servers must share this commands database and cache (sessions are cache backed). A studio
+is seeded and committed for the servers to read, then deleted once the benchmark has finished.
+"""
+
+import statistics
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from importlib import import_module
+from django.conf import settings
+from django.contrib.auth import BACKEND_SESSION_KEY, HASH_SESSION_KEY, SESSION_KEY
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.urls import reverse
+from studio_suite.models import MemberStudioRelationship
+from studio_suite.seed import StudioSeeder
+
+PREFIX = 'latency-benchmark'
+
+
+class Command(BaseCommand):
+    help = 'Reports p50 and p99 latency of the book-a-kiln page on running servers (eg: uWSGI and ASGI).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--target', action='append', required=True, help='name=base url of a running server')
+        parser.add_argument('--page', default='book_a_kiln', choices=['book_a_kiln', 'member_home'])
+        parser.add_argument('--requests', type=int, default=500)
+        parser.add_argument('--concurrency', type=int, default=20)
+        parser.add_argument('--warmup', type=int, default=20)
+        parser.add_argument('--kilns', type=int, default=20)
+        parser.add_argument('--timeslots', type=int, default=200)
+        parser.add_argument('--members', type=int, default=200)
+        parser.add_argument('--bookings', type=int, default=2000)
+        parser.add_argument('--seed', type=int, default=1)
+
+    def handle(self, *args, **options):
+        targets = []
+        for target in options['target']:
+            name, separator, base_url = target.partition('=')
+            if not separator or not base_url:
+                raise CommandError(f'Expected --target name=url, got "{target}".')
+            targets.append((name, base_url.rstrip('/')))
+
+        if User.objects.filter(username__startswith=f'{PREFIX}-').exists():
+            raise CommandError(f'Users named {PREFIX}-* already exist, delete them or wait for the running benchmark.')
+
+        try:
+            studio, member = self.seed(options)
+            path = reverse(options['page'], kwargs={'studio_url_extension': studio.url_extension})
+            cookie = f'{settings.SESSION_COOKIE_NAME}={self.create_session(member)}'
+
+            for name, base_url in targets:
+                self.run_benchmark(name, base_url + path, cookie, options)
+        finally:
+            # Studios, memberships, timeslots and bookings cascade from the seeded users.
+            User.objects.filter(username__startswith=f'{PREFIX}-').delete()
+
+    def seed(self, options):
+        """
+        Description:
+            Seeds one studio and a member with the MANAGER role (who can book every timeslot), see StudioSeeder.
+        """
+
+        seeder = StudioSeeder(
+            studios=1,
+            kilns=options['kilns'],
+            timeslots=options['timeslots'],
+            members=options['members'],
+            bookings=options['bookings'],
+            prefix=PREFIX,
+            seed=options['seed'],
+        )
+        studio = seeder.seed()[0]
+        member = User.objects.create_user(username=f'{PREFIX}-manager', email=f'{PREFIX}-manager@example.com')
+        MemberStudioRelationship.objects.create(member=member, studio=studio, member_role='MANAGER')
+
+        self.stdout.write('Seeded ' + ', '.join(f'{count} {name}' for name, count in seeder.counts.items()) + '.')
+
+        return studio, member
+
+    def create_session(self, user):
+        """
+        Description:
+            Logs the user in on a new session, as django.test.Client.force_login does.
+
+        Returns:
+            str: The session key, sent as the session cookie.
+        """
+
+        session = import_module(settings.SESSION_ENGINE).SessionStore()
+        session[SESSION_KEY] = user._meta.pk.value_to_string(user)
+        session[BACKEND_SESSION_KEY] = settings.AUTHENTICATION_BACKENDS[0]
+        session[HASH_SESSION_KEY] = user.get_session_auth_hash()
+        session.save()
+
+        return session.session_key
+
+    def fetch(self, url, cookie):
+        """
+        Description:
+            Requests a page.
+
+        Returns:
+            tuple: (seconds until the body was read, status code)
+        """
+
+        request = urllib.request.Request(url, headers={'Cookie': cookie})
+        start = time.perf_counter()
+
+        try:
+            with urllib.request.urlopen(request, timeout=30) as response:
+                response.read()
+                status = response.status
+        except urllib.error.HTTPError as error:
+            status = error.code
+
+        return time.perf_counter() - start, status
+
+    def run_benchmark(self, name, url, cookie, options):
+        """
+        Description:
+            Requests the page from a pool of concurrent clients and reports the latency percentiles.
+        """
+
+        with ThreadPoolExecutor(max_workers=options['concurrency']) as executor:
+            list(executor.map(lambda _: self.fetch(url, cookie), range(options['warmup'])))
+
+            start = time.perf_counter()
+            results = list(executor.map(lambda _: self.fetch(url, cookie), range(options['requests'])))
+            elapsed = time.perf_counter() - start
+
+        timings = [timing for timing, status in results if status == 200]
+        errors = len(results) - len(timings)
+
+        if len(timings) < 2:
+            self.stderr.write(f'{name}: {errors} of {len(results)} requests to {url} failed.')
+            return
+
+        percentiles = statistics.quantiles(timings, n=100)
+        self.stdout.write(
+            f'{name}: p50 {percentiles[49] * 1000:.1f} ms, p99 {percentiles[98] * 1000:.1f} ms, '
+            f'mean {statistics.mean(timings) * 1000:.1f} ms, {len(results) / elapsed:.1f} requests/s '
+            f'over {len(results)} requests at concurrency {options["concurrency"]}, {errors} errors.'
+        )
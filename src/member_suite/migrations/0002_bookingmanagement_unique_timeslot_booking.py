@@ -0,0 +1,38 @@
+# Generated by Django 4.2 on 2026-10-17 02:16
+
+from django.db import migrations, models
+from django.db.models import Count, Min
+
+
+def remove_double_bookings(apps, schema_editor):
+    """
+    Keep only the earliest booking of each (timeslot, booking_date) so the unique constraint can be added.
+    """
+
+    BookingManagement = apps.get_model('member_suite', 'BookingManagement')
+
+    duplicates = BookingManagement.objects.values('timeslot', 'booking_date').annotate(
+        first_id=Min('id'),
+        bookings=Count('id'),
+    ).filter(bookings__gt=1)
+
+    for duplicate in duplicates:
+        BookingManagement.objects.filter(
+            timeslot=duplicate['timeslot'],
+            booking_date=duplicate['booking_date'],
+        ).exclude(id=duplicate['first_id']).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('member_suite', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_double_bookings, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='bookingmanagement',
+            constraint=models.UniqueConstraint(fields=('timeslot', 'booking_date'), name='unique_timeslot_booking'),
+        ),
+    ]
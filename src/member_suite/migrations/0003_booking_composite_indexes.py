@@ -0,0 +1,21 @@
+# Generated by Django 4.2 on 2026-10-17 02:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('member_suite', '0002_bookingmanagement_unique_timeslot_booking'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='bookingmanagement',
+            index=models.Index(fields=['studio', 'booking_date'], name='booking_studio_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='bookingmanagement',
+            index=models.Index(fields=['member', 'studio'], name='booking_member_studio_idx'),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 4.2 on 2026-10-17 02:49
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('studio_suite', '0032_composite_indexes_and_unique_constraints'),
+        ('member_suite', '0003_booking_composite_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AvailabilityChange',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('version', models.BigIntegerField()),
+                ('kind', models.CharField(choices=[('B', 'Booked'), ('U', 'Unbooked'), ('R', 'Reset')], max_length=1)),
+                ('occurrence_date', models.DateField(null=True)),
+                ('created', models.DateTimeField(auto_now_add=True)),
+                ('studio', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, to='studio_suite.studioinfo')),
+                ('timeslot', models.ForeignKey(db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, to='studio_suite.timeslotmanagement')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='availabilitychange',
+            index=models.Index(fields=['studio', 'version'], name='change_studio_version_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='availabilitychange',
+            index=models.Index(fields=['created'], name='change_created_idx'),
+        ),
+    ]
@@ -28,4 +28,57 @@ class BookingManagement(models.Model):
     studio = models.ForeignKey(StudioInfo, on_delete=models.CASCADE)
     member = models.ForeignKey(User, on_delete=models.CASCADE)
     timeslot = models.ForeignKey(TimeslotManagement, on_delete=models.CASCADE)
-    booking_date = models.DateTimeField()
\ No newline at end of file
+    booking_date = models.DateTimeField()
+
+    class Meta:
+        constraints = [
+            # A timeslot can only be booked once per day.
+            models.UniqueConstraint(fields=['timeslot', 'booking_date'], name='unique_timeslot_booking'),
+        ]
+        indexes = [
+            models.Index(fields=['studio', 'booking_date'], name='booking_studio_date_idx'),
+            models.Index(fields=['member', 'studio'], name='booking_member_studio_idx'),
+        ]
+
+
+
+class AvailabilityChange(models.Model):
+    """
+    Description:
+        Append-only log of the changes to the availability of a studio, read by clients pulling
+        the changes since the studio version they last saw (see member_suite.changes).
+
+    Collects:
+        studio: StudioInfo object
+        version: Studio version the change was made at, see studio_suite.versioning
+        kind: BOOKED or UNBOOKED for a single slot, RESET when the availability must be reloaded
+        timeslot: TimeslotManagement object of the slot
+        occurrence_date: Day of the slot
+        created: When the change was logged, old changes are pruned
+
+    Note:
+        The foreign keys have no database constraint, entries outlive their timeslots and are
+        written while a studio is being deleted.
+    """
+
+    BOOKED = 'B'
+    UNBOOKED = 'U'
+    RESET = 'R'
+    KIND_CHOICES = [
+        (BOOKED, 'Booked'),
+        (UNBOOKED, 'Unbooked'),
+        (RESET, 'Reset'),
+    ]
+
+    studio = models.ForeignKey(StudioInfo, on_delete=models.DO_NOTHING, db_constraint=False)
+    version = models.BigIntegerField()
+    kind = models.CharField(max_length=1, choices=KIND_CHOICES)
+    timeslot = models.ForeignKey(TimeslotManagement, on_delete=models.DO_NOTHING, db_constraint=False, null=True)
+    occurrence_date = models.DateField(null=True)
+    created = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['studio', 'version'], name='change_studio_version_idx'),
+            models.Index(fields=['created'], name='change_created_idx'),
+        ]
@@ -0,0 +1,30 @@
+"""
+Signal receivers for the member_suite, keeping cached studio data in sync with bookings.
+"""
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from .changes import record_reset, record_slot_change
+from .models import AvailabilityChange, BookingManagement
+
+
+@receiver([post_save, post_delete], sender=BookingManagement)
+def bump_version_on_booking_change(sender, instance, signal, created=False, origin=None, **kwargs):
+    """
+    Description:
+        Bumps the studio version once a booking is made or cancelled, and logs the
+        changed slot (see member_suite.changes). An edited booking may have moved, so it is
+        logged as a reset. Bookings deleted along with the same origin are logged together.
+    """
+
+    if signal is post_delete:
+        kind = AvailabilityChange.UNBOOKED
+    elif created:
+        kind = AvailabilityChange.BOOKED
+    else:
+        kind = AvailabilityChange.RESET
+
+    if kind == AvailabilityChange.RESET:
+        record_reset(instance.studio_id)
+    else:
+        record_slot_change(instance, kind, origin)
@@ -0,0 +1,27 @@
+"""
+Renders the hidden inputs of a booking form straight from an availability Slot.
+
+The booking page has a form for every open slot of its window. Binding a BookKilnForm to each
+and rendering it through the form renderer costs far more than the two inputs it produces, so
+they are formatted directly instead. The names match the fields of BookKilnForm, which still
+validates the submitted booking.
+"""
+
+from django import template
+from django.utils.html import format_html
+
+register = template.Library()
+
+BOOKING_INPUTS = (
+    '<input type="hidden" name="book_timeslot" value="{}" readonly="readonly">'
+    '<input type="hidden" name="day" value="{}" readonly="readonly">'
+)
+
+
+@register.simple_tag
+def booking_inputs(slot):
+    """
+    Description:
+        The book_timeslot and day inputs of a BookKilnForm for a member_suite.availability.Slot.
+    """
+    return format_html(BOOKING_INPUTS, slot.timeslot.id, slot.day.strftime('%Y-%m-%d'))
@@ -1,7 +1,7 @@
 """
-This module contains unit and integration tests for the member_suite 
-application. Tests are designed to verify the functionality, correctness, 
-and reliability of the application's components, including models, views, 
+This module contains unit and integration tests for the member_suite
+application. Tests are designed to verify the functionality, correctness,
+and reliability of the application's components, including models, views,
 forms, and other modules.
 
 Note:
@@ -9,6 +9,825 @@ Note:
     prior to application launch.
 """
 
-# from django.test import TestCase
+import pickle
+import re
+import threading
+from unittest import mock
+from datetime import datetime, time, timedelta
+from django.contrib.auth.models import User
+from django.db import connection, transaction
+from django.test import TestCase, TransactionTestCase, override_settings, skipUnlessDBFeature
+from django.test.utils import CaptureQueriesContext
+from django.urls import include, path, reverse
+from django.utils import timezone
+from studio_suite.models import StudioInfo, MemberStudioRelationship, KilnManagement, TimeslotManagement
+from studio_suite.seed import StudioSeeder
+from studio_suite.testing import TEST_CACHES, ViewBudgetTestCase
+from studio_suite.versioning import bump_studio_version, get_studio_version
+from studio_suite.occurrences import OCCURRENCE_HORIZON_DAYS, generate_occurrences
+from .availability import AvailabilityBuilder, AvailabilityWindow, get_availability
+from .bookings import book_timeslot
+from .changes import CHANGE_SETTLE_TIME, get_changes, prune_changes
+from .forms import BookKilnForm
+from .templatetags.booking_inputs import booking_inputs
+from .calendar import MEMBER_FEED, STUDIO_FEED, fold_line, make_feed_token
+from .models import AvailabilityChange, BookingManagement
+from .views import AsyncBookAKilnView, AsyncMemberHomeView
 
-# Create your tests here.
+
+def create_bookable_timeslot():
+    """
+    Description:
+        Creates a studio with a single non-recurring timeslot opening tomorrow.
+    """
+
+    owner = User.objects.create_user(username='owner', email='owner@example.com')
+    studio = StudioInfo.objects.create(
+        linked_account=owner,
+        url_extension='test-studio',
+        name='Test Studio',
+        bio='',
+        new_member_role='RM',
+    )
+    kiln = KilnManagement.objects.create(
+        studio=studio,
+        kiln_name='Kiln',
+        kiln_make='Make',
+        kiln_model='Model',
+        kiln_size='Large',
+        kiln_max_temp='Cone 10',
+    )
+    timeslot = TimeslotManagement.objects.create(
+        studio=studio,
+        kiln=kiln,
+        min_role_required='RM',
+        is_recurring=0,
+        start_date=timezone.localdate() + timedelta(days=1),
+        load_after_time=time(hour=10),
+    )
+
+    return studio, timeslot
+
+
+
+@override_settings(CACHES=TEST_CACHES)
+class BookTimeslotTests(TestCase):
+    """
+    Description:
+        Tests the atomic booking service.
+    """
+
+    def setUp(self):
+        self.studio, self.timeslot = create_bookable_timeslot()
+        self.member = User.objects.create_user(username='member', email='member@example.com')
+        self.other_member = User.objects.create_user(username='other-member', email='other-member@example.com')
+
+    def test_books_free_timeslot(self):
+        result = book_timeslot(self.studio, self.member, self.timeslot, self.timeslot.start_date)
+
+        self.assertFalse(result.already_booked)
+        self.assertEqual(result.booking.booking_date.time(), self.timeslot.load_after_time)
+        self.assertEqual(BookingManagement.objects.count(), 1)
+
+    def test_already_booked_timeslot(self):
+        book_timeslot(self.studio, self.member, self.timeslot, self.timeslot.start_date)
+        result = book_timeslot(self.studio, self.other_member, self.timeslot, self.timeslot.start_date)
+
+        self.assertTrue(result.already_booked)
+        self.assertEqual(BookingManagement.objects.get().member, self.member)
+
+    def test_slot_booked_meanwhile_is_already_booked(self):
+        # Another request books the slot right before this ones savepoint, the constraint refuses the insert.
+        atomic = transaction.atomic
+        booking_date = timezone.make_aware(datetime.combine(self.timeslot.start_date, self.timeslot.load_after_time))
+
+        def book_first(*args, **kwargs):
+            with mock.patch.object(transaction, 'atomic', atomic):
+                BookingManagement.objects.create(studio=self.studio, member=self.other_member, timeslot=self.timeslot, booking_date=booking_date)
+            return atomic(*args, **kwargs)
+
+        with mock.patch.object(transaction, 'atomic', side_effect=book_first):
+            result = book_timeslot(self.studio, self.member, self.timeslot, self.timeslot.start_date)
+
+        self.assertTrue(result.already_booked)
+        self.assertEqual(BookingManagement.objects.get().member, self.other_member)
+
+        # Only the refused insert was rolled back, the surrounding transaction is still usable.
+        self.assertFalse(book_timeslot(self.studio, self.member, self.timeslot, self.timeslot.start_date + timedelta(days=7)).already_booked)
+
+    def test_books_same_timeslot_on_another_day(self):
+        book_timeslot(self.studio, self.member, self.timeslot, self.timeslot.start_date)
+        result = book_timeslot(self.studio, self.other_member, self.timeslot, self.timeslot.start_date + timedelta(days=7))
+
+        self.assertFalse(result.already_booked)
+        self.assertEqual(BookingManagement.objects.count(), 2)
+
+
+
+@override_settings(CACHES=TEST_CACHES)
+class AvailabilityRoleTests(TestCase):
+    """
+    Description:
+        Tests timeslots are filtered by the members role in the database.
+    """
+
+    def setUp(self):
+        self.studio, self.timeslot = create_bookable_timeslot()
+        self.manager_timeslot = TimeslotManagement.objects.create(
+            studio=self.studio,
+            kiln=self.timeslot.kiln,
+            min_role_required='MANAGER',
+            is_recurring=0,
+            start_date=self.timeslot.start_date + timedelta(days=2),
+            load_after_time=time(hour=10),
+        )
+        generate_occurrences(self.timeslot)
+        generate_occurrences(self.manager_timeslot)
+        self.date_list = [self.timeslot.start_date + timedelta(days=day) for day in range(7)]
+
+    def get_bookable_ids(self, member_role):
+        builder = AvailabilityBuilder(self.studio, self.date_list, member_role)
+        loaded_ids = set(builder.get_timeslots()) | {timeslot_id for timeslot_id, _ in builder.get_occurrences()}
+        built_ids = {slot.timeslot.id for slots in builder.build().values() for slot in slots}
+
+        self.assertEqual(loaded_ids, built_ids)
+
+        return built_ids
+
+    def test_filters_by_role(self):
+        expected = {
+            None: {self.timeslot.id, self.manager_timeslot.id},  # Studio owner.
+            'MANAGER': {self.timeslot.id, self.manager_timeslot.id},
+            'TECH': {self.timeslot.id},
+            'RM': {self.timeslot.id},
+            'NA': set(),
+            '': set(),  # Not a member.
+        }
+
+        for member_role, timeslot_ids in expected.items():
+            with self.subTest(member_role=member_role):
+                self.assertEqual(self.get_bookable_ids(member_role), timeslot_ids)
+
+
+
+@override_settings(CACHES=TEST_CACHES)
+class SlotTests(TestCase):
+    """
+    Description:
+        Tests the compact availability records and the booking inputs rendered from them.
+    """
+
+    def setUp(self):
+        self.studio, self.timeslot = create_bookable_timeslot()
+        generate_occurrences(self.timeslot)
+        self.slot = AvailabilityBuilder(self.studio, [self.timeslot.start_date]).build()[self.timeslot.start_date][0]
+
+    def test_slot_records(self):
+        restored = pickle.loads(pickle.dumps(self.slot, pickle.HIGHEST_PROTOCOL))
+
+        for slot in [self.slot, restored]:
+            self.assertEqual(
+                (slot.timeslot.id, slot.timeslot.kiln, slot.timeslot.load_after_time, slot.timeslot.notes, slot.day, slot.is_booked),
+                (self.timeslot.id, 'Kiln', time(hour=10), '', self.timeslot.start_date, False),
+            )
+        self.assertFalse(hasattr(self.slot, '__dict__'))
+
+    def test_booking_inputs_submit_booking_form(self):
+        inputs = re.findall(r'name="(\w+)" value="([^"]*)"', booking_inputs(self.slot))
+        form = BookKilnForm(dict(inputs))
+
+        self.assertTrue(form.is_valid())
+        self.assertEqual(form.cleaned_data, {'book_timeslot': self.timeslot.id, 'day': self.timeslot.start_date.strftime('%Y-%m-%d')})
+
+
+
+@override_settings(CACHES=TEST_CACHES)
+class AvailabilityWindowTests(TestCase):
+    """
+    Description:
+        Tests windows page through the booking horizon.
+    """
+
+    def setUp(self):
+        self.studio = StudioInfo(availability_window=7, booking_horizon=20)
+        self.today = timezone.localdate()
+
+    def get_window(self, offset=None, days=None):
+        start = None if offset is None else self.today + timedelta(days=offset)
+        window = AvailabilityWindow(self.studio, start, days, today=self.today)
+        offsets = [None if day is None else (day - self.today).days for day in (window.start, window.previous_start, window.next_start)]
+
+        return offsets[0], window.days, offsets[1], offsets[2]
+
+    def test_pages_through_horizon(self):
+        self.assertEqual(self.get_window(), (0, 7, None, 7))
+        self.assertEqual(self.get_window(7), (7, 7, 0, 14))
+        self.assertEqual(self.get_window(14), (13, 7, 6, None))  # Ends on the last day of the horizon.
+        self.assertEqual(self.get_window(3), (3, 7, 0, 10))
+
+    def test_clamps_to_horizon(self):
+        self.assertEqual(self.get_window(-5), (0, 7, None, 7))
+        self.assertEqual(self.get_window(100), (13, 7, 6, None))
+        self.assertEqual(self.get_window(days=30), (0, 20, None, None))
+
+        # Occurrences are only materialized so far ahead.
+        self.studio.booking_horizon = 1000
+        self.assertEqual(self.get_window(1000)[0], OCCURRENCE_HORIZON_DAYS - 7)
+
+
+
+@override_settings(CACHES=TEST_CACHES)
+class AvailabilityApiTests(TestCase):
+    """
+    Description:
+        Tests the JSON availability and its changes since a studio version.
+    """
+
+    def setUp(self):
+        self.studio, self.timeslot = create_bookable_timeslot()
+        generate_occurrences(self.timeslot)
+        self.member = User.objects.create_user(username='member', email='member@example.com')
+        MemberStudioRelationship.objects.create(member=self.member, studio=self.studio, member_role='RM')
+        self.day = self.timeslot.start_date.isoformat()
+        self.client.force_login(self.member)
+
+        # Rows are settled as soon as they are logged, see test_changes_cursor_waits_for_rows_to_settle.
+        settle_time = mock.patch('member_suite.changes.CHANGE_SETTLE_TIME', timedelta(0))
+        settle_time.start()
+        self.addCleanup(settle_time.stop)
+
+    def get_json(self, name, **params):
+        response = self.client.get(reverse(name, kwargs={'studio_url_extension': self.studio.url_extension}), params)
+        return response.status_code, response.json()
+
+    def get_changes(self, since):
+        status_code, data = self.get_json('availability_changes', since=since)
+        self.assertEqual(status_code, 200)
+        return data
+
+    def test_availability_window(self):
+        status_code, data = self.get_json('availability', start=self.day, days=1)
+
+        self.assertEqual(status_code, 200)
+        self.assertEqual(data['slots'], [[self.day, self.timeslot.id, False]])
+        self.assertEqual(data['timeslots'], {str(self.timeslot.id): {'kiln': 'Kiln', 'load_after_time': '10:00', 'notes': ''}})
+
+        for params in [{'days': 0}, {'days': 'week'}, {'start': 'tomorrow'}]:
+            with self.subTest(params=params):
+                self.assertEqual(self.get_json('availability', **params)[0], 400)
+
+    def test_availability_window_paging(self):
+        today = timezone.localdate()
+        data = self.get_json('availability')[1]
+
+        self.assertEqual((data['start'], data['days']), (today.isoformat(), 7))
+        self.assertIsNone(data['previous_start'])
+        self.assertEqual(data['next_start'], (today + timedelta(days=7)).isoformat())
+
+        # Windows outside the booking horizon are moved into it.
+        self.assertEqual(self.get_json('availability', start='2000-01-01')[1]['start'], today.isoformat())
+        last_window = self.get_json('availability', start=(today + timedelta(days=365)).isoformat(), days=120)[1]
+        self.assertEqual((last_window['start'], last_window['days'], last_window['next_start']), (today.isoformat(), 90, None))
+
+    def test_changes_since_version(self):
+        version = self.get_json('availability', days=7)[1]['version']
+        with self.captureOnCommitCallbacks(execute=True):
+            booking = book_timeslot(self.studio, self.member, self.timeslot, self.timeslot.start_date).booking
+        booked = self.get_changes(version)
+
+        self.assertEqual(booked['changes'], [[self.day, self.timeslot.id, True]])
+        self.assertFalse(booked['reset'])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            booking.delete()
+
+        self.assertEqual(self.get_changes(booked['version'])['changes'], [[self.day, self.timeslot.id, False]])
+        self.assertEqual(self.get_changes(version)['changes'], [[self.day, self.timeslot.id, True], [self.day, self.timeslot.id, False]])
+        self.assertEqual(self.get_changes(self.get_changes(version)['version'])['changes'], [])
+        self.assertEqual(self.get_json('availability_changes', since='latest')[0], 400)
+
+    def test_changes_cursor_waits_for_rows_to_settle(self):
+        version = self.get_json('availability', days=7)[1]['version']
+        with self.captureOnCommitCallbacks(execute=True):
+            book_timeslot(self.studio, self.member, self.timeslot, self.timeslot.start_date)
+        logged = AvailabilityChange.objects.get()
+
+        # A row at an older version may still commit, the cursor stays put and the change is returned again.
+        with mock.patch('member_suite.changes.CHANGE_SETTLE_TIME', CHANGE_SETTLE_TIME):
+            self.assertEqual(get_changes(self.studio, version), ([[self.day, self.timeslot.id, True]], version))
+
+            with mock.patch('django.utils.timezone.now', return_value=logged.created + CHANGE_SETTLE_TIME):
+                self.assertEqual(get_changes(self.studio, version), ([[self.day, self.timeslot.id, True]], logged.version))
+
+    def test_changes_cursor_is_the_newest_logged_version(self):
+        version = self.get_json('availability', days=7)[1]['version']
+        with self.captureOnCommitCallbacks(execute=True):
+            book_timeslot(self.studio, self.member, self.timeslot, self.timeslot.start_date)
+        booked = self.get_changes(version)
+
+        self.assertEqual(booked['version'], AvailabilityChange.objects.get().version)
+
+        # A version handed out for a change that has not logged its row yet is not skipped past.
+        bump_studio_version(self.studio.pk)
+        self.assertEqual(self.get_changes(booked['version']), {'version': booked['version'], 'changes': [], 'reset': False})
+
+        with self.captureOnCommitCallbacks(execute=True):
+            BookingManagement.objects.get().delete()
+        self.assertEqual(self.get_changes(booked['version'])['changes'], [[self.day, self.timeslot.id, False]])
+
+    def test_cascaded_cancellations_are_logged_together(self):
+        members = [User.objects.create_user(username=f'member-{day}', email=f'member-{day}@example.com') for day in range(3)]
+        timeslot = TimeslotManagement.objects.create(
+            studio=self.studio, kiln=self.timeslot.kiln, min_role_required='RM', is_recurring=2,
+            start_date=self.timeslot.start_date, load_after_time=time(hour=14), recurrence_frequency='weekly',
+            recurring_weekday_mask=TimeslotManagement.get_weekday_mask(['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']),
+        )
+        generate_occurrences(timeslot)
+        with self.captureOnCommitCallbacks(execute=True):
+            for day, member in enumerate(members):
+                book_timeslot(self.studio, member, timeslot, timeslot.start_date + timedelta(days=day))
+        AvailabilityChange.objects.all().delete()
+
+        with CaptureQueriesContext(connection) as queries:
+            with self.captureOnCommitCallbacks(execute=True):
+                timeslot.delete()
+
+        inserts = [query for query in queries if query['sql'].startswith('INSERT INTO "member_suite_availabilitychange"')]
+        unbooked = AvailabilityChange.objects.filter(kind=AvailabilityChange.UNBOOKED)
+        # One insert for the cancellations, one for the reset of the deleted timeslot.
+        self.assertEqual(len(inserts), 2)
+        self.assertEqual(unbooked.count(), 3)
+        self.assertEqual(len({change.version for change in unbooked}), 1)
+
+    def test_schedule_change_resets(self):
+        version = self.get_json('availability', days=7)[1]['version']
+        self.timeslot.load_after_time = time(hour=12)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.timeslot.save()
+
+        self.assertEqual(self.get_changes(version), {'version': self.get_changes(version)['version'], 'changes': [], 'reset': True})
+
+    def test_changes_are_filtered_by_role(self):
+        manager_timeslot = TimeslotManagement.objects.create(
+            studio=self.studio,
+            kiln=self.timeslot.kiln,
+            min_role_required='MANAGER',
+            is_recurring=0,
+            start_date=self.timeslot.start_date,
+            load_after_time=time(hour=14),
+        )
+        generate_occurrences(manager_timeslot)
+        manager = User.objects.create_user(username='manager', email='manager@example.com')
+        version = self.get_json('availability', days=7)[1]['version']
+        with self.captureOnCommitCallbacks(execute=True):
+            book_timeslot(self.studio, manager, manager_timeslot, manager_timeslot.start_date)
+
+        self.assertEqual(self.get_changes(version)['changes'], [])
+
+    def test_pruned_changes_reset(self):
+        version = self.get_json('availability', days=7)[1]['version']
+        with self.captureOnCommitCallbacks(execute=True):
+            book_timeslot(self.studio, self.member, self.timeslot, self.timeslot.start_date)
+        latest = self.get_changes(version)['version']
+
+        logged = AvailabilityChange.objects.count()
+
+        self.assertEqual(prune_changes(before=timezone.now() + timedelta(seconds=1)), logged)
+        self.assertEqual(AvailabilityChange.objects.get().kind, AvailabilityChange.RESET)
+        self.assertTrue(self.get_changes(version)['reset'])
+        self.assertFalse(self.get_changes(latest)['reset'])
+
+    def test_booking_page_shows_one_window(self):
+        self.studio.availability_window = 3
+        self.studio.save()
+        url = reverse('book_a_kiln', kwargs={'studio_url_extension': self.studio.url_extension})
+
+        response = self.client.get(url)
+        self.assertEqual(list(response.context['upcoming_timeslots']), response.context['window'].date_list)
+        self.assertContains(response, f'name="book_timeslot" value="{self.timeslot.id}"')
+        self.assertEqual(len(response.context['upcoming_timeslots']), 3)
+
+        next_start = response.context['window'].next_start.isoformat()
+        response = self.client.get(url, {'start': next_start})
+        self.assertEqual(response.context['window'].previous_start, timezone.localdate())
+        self.assertEqual(self.client.get(url, {'start': 'next'}).status_code, 400)
+
+        # Booking returns to the window it was made from.
+        response = self.client.post(f'{url}?start={next_start}', {'book_timeslot': self.timeslot.id, 'day': self.day})
+        self.assertRedirects(response, f'{url}?start={next_start}')
+
+    def test_json_booking(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                reverse('book_a_kiln', kwargs={'studio_url_extension': self.studio.url_extension}),
+                {'book_timeslot': self.timeslot.id, 'day': self.day},
+                HTTP_ACCEPT='application/json',
+            )
+
+        self.assertEqual(response.json(), {'messages': [{'level': 'success', 'message': 'Booking successful!'}]})
+
+    def test_rejects_slots_the_page_does_not_offer(self):
+        manager_timeslot = TimeslotManagement.objects.create(
+            studio=self.studio,
+            kiln=self.timeslot.kiln,
+            min_role_required='MANAGER',
+            is_recurring=0,
+            start_date=self.timeslot.start_date,
+            load_after_time=time(hour=14),
+        )
+        generate_occurrences(manager_timeslot)
+        url = reverse('book_a_kiln', kwargs={'studio_url_extension': self.studio.url_extension})
+        today = timezone.localdate()
+
+        def post(timeslot_id, day):
+            response = self.client.post(url, {'book_timeslot': timeslot_id, 'day': day}, HTTP_ACCEPT='application/json')
+            return response.json()['messages']
+
+        rejected = [{'level': 'error', 'message': "This timeslot can't be booked on this day."}]
+        for timeslot_id, day in [
+            (self.timeslot.id, (self.timeslot.start_date + timedelta(days=1)).isoformat()),  # No occurrence
+            (self.timeslot.id, (today - timedelta(days=1)).isoformat()),  # In the past
+            (manager_timeslot.id, self.day),  # Above the members role
+            (0, self.day),  # Unknown timeslot
+        ]:
+            with self.subTest(timeslot_id=timeslot_id, day=day):
+                self.assertEqual(post(timeslot_id, day), rejected)
+
+        # Beyond the booking horizon, which ends today.
+        self.studio.booking_horizon = 1
+        self.studio.save()
+        self.assertEqual(post(self.timeslot.id, self.day), rejected)
+
+        self.assertFalse(BookingManagement.objects.exists())
+
+
+
+@override_settings(CACHES=TEST_CACHES)
+class CalendarFeedTests(TestCase):
+    """
+    Description:
+        Tests the member and studio iCalendar feeds and their ETag validation.
+    """
+
+    def setUp(self):
+        self.studio, self.timeslot = create_bookable_timeslot()
+        self.member = User.objects.create_user(username='member', email='member@example.com')
+        self.other_member = User.objects.create_user(username='other-member', email='other-member@example.com')
+        MemberStudioRelationship.objects.create(member=self.member, studio=self.studio, member_role='RM')
+        MemberStudioRelationship.objects.create(member=self.other_member, studio=self.studio, member_role='RM')
+
+        book_timeslot(self.studio, self.member, self.timeslot, self.timeslot.start_date)
+        book_timeslot(self.studio, self.other_member, self.timeslot, self.timeslot.start_date + timedelta(days=7))
+
+    def get_feed_url(self, user, feed, studio_url_extension='test-studio'):
+        return reverse('calendar_feed', kwargs={
+            'studio_url_extension': studio_url_extension,
+            'token': make_feed_token(self.studio, user.pk, feed),
+        })
+
+    def get_feed(self, url, **headers):
+        response = self.client.get(url, **headers)
+        content = b''.join(response.streaming_content).decode() if response.streaming else ''
+
+        return response, content
+
+    def test_member_feed(self):
+        response, content = self.get_feed(self.get_feed_url(self.member, MEMBER_FEED))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/calendar; charset=utf-8')
+        self.assertTrue(content.startswith('BEGIN:VCALENDAR\r\n'))
+        self.assertTrue(content.endswith('END:VCALENDAR\r\n'))
+        self.assertEqual(content.count('BEGIN:VEVENT'), 1)
+        self.assertIn('SUMMARY:Kiln kiln load\r\n', content)
+
+    def test_studio_feed(self):
+        response, content = self.get_feed(self.get_feed_url(self.studio.linked_account, STUDIO_FEED))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(content.count('BEGIN:VEVENT'), 2)
+        self.assertIn('SUMMARY:Kiln kiln load: other-member\r\n', content)
+
+    def test_unchanged_feed_is_not_modified_without_queries(self):
+        url = self.get_feed_url(self.member, MEMBER_FEED)
+        response, _ = self.get_feed(url)
+
+        with self.assertNumQueries(0):
+            not_modified = self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+
+        self.assertEqual(not_modified.status_code, 304)
+        self.assertEqual(not_modified['ETag'], response['ETag'])
+
+        not_modified = self.client.get(url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+        self.assertEqual(not_modified.status_code, 304)
+
+    def test_booking_changes_etag(self):
+        url = self.get_feed_url(self.member, MEMBER_FEED)
+        response, _ = self.get_feed(url)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            BookingManagement.objects.filter(member=self.member).delete()
+        response_after_change, content = self.get_feed(url, HTTP_IF_NONE_MATCH=response['ETag'])
+
+        self.assertEqual(response_after_change.status_code, 200)
+        self.assertNotEqual(response_after_change['ETag'], response['ETag'])
+        self.assertNotIn('BEGIN:VEVENT', content)
+
+    def test_invalid_tokens(self):
+        invalid_urls = [
+            # Tampered signature.
+            self.get_feed_url(self.member, MEMBER_FEED)[:-5] + 'x.ics',
+            # Studio feeds are only valid for the studio owner.
+            self.get_feed_url(self.member, STUDIO_FEED),
+        ]
+
+        # Token signed for another studio.
+        other_owner = User.objects.create_user(username='other-owner', email='other-owner@example.com')
+        StudioInfo.objects.create(linked_account=other_owner, url_extension='other-studio', name='Other Studio', bio='', new_member_role='RM')
+        invalid_urls.append(self.get_feed_url(self.member, MEMBER_FEED, studio_url_extension='other-studio'))
+
+        for url in invalid_urls:
+            with self.subTest(url=url):
+                self.assertEqual(self.client.get(url).status_code, 404)
+
+    def test_removed_member_loses_access(self):
+        url = self.get_feed_url(self.member, MEMBER_FEED)
+        MemberStudioRelationship.objects.filter(member=self.member).delete()
+
+        self.assertEqual(self.client.get(url).status_code, 404)
+
+    def test_fold_line(self):
+        folded = fold_line('DESCRIPTION:' + 'é' * 100)
+
+        self.assertTrue(all(len(line.encode()) <= 75 for line in folded.split('\r\n')))
+        self.assertEqual(folded.replace('\r\n ', ''), 'DESCRIPTION:' + 'é' * 100 + '\r\n')
+
+
+
+@override_settings(CACHES=TEST_CACHES)
+@skipUnlessDBFeature('test_db_allows_multiple_connections')
+class BookTimeslotContentionTests(TransactionTestCase):
+    """
+    Description:
+        Fires simultaneous bookings for one slot from separate threads (and database connections),
+        exactly one of them may succeed. Skipped on the SQLite test database, see
+        BookTimeslotTests.test_slot_booked_meanwhile_is_already_booked.
+    """
+
+    booking_attempts = 200
+
+    def test_simultaneous_bookings(self):
+        studio, timeslot = create_bookable_timeslot()
+        members = User.objects.bulk_create([
+            User(username=f'member-{i}', email=f'member-{i}@example.com')
+            for i in range(self.booking_attempts)
+        ])
+        barrier = threading.Barrier(self.booking_attempts)
+        results = []
+        errors = []
+
+        def attempt_booking(member):
+            try:
+                barrier.wait()
+                results.append(book_timeslot(studio, member, timeslot, timeslot.start_date))
+            except Exception as error:
+                errors.append(error)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=attempt_booking, args=(member,)) for member in members]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        self.assertEqual(sum(not result.already_booked for result in results), 1)
+        self.assertEqual(sum(result.already_booked for result in results), self.booking_attempts - 1)
+        self.assertEqual(BookingManagement.objects.count(), 1)
+
+
+
+@override_settings(CACHES=TEST_CACHES)
+class StudioVersionCommitTests(TestCase):
+    """
+    Description:
+        Tests bookings bump the studio version only once their transaction commits, so readers
+        never cache the rows from before a booking under the version after it.
+    """
+
+    def setUp(self):
+        self.studio, self.timeslot = create_bookable_timeslot()
+        generate_occurrences(self.timeslot)
+        self.member = User.objects.create_user(username='member', email='member@example.com')
+        self.date_list = [self.timeslot.start_date]
+
+    def is_booked(self):
+        return get_availability(self.studio, self.date_list)[self.timeslot.start_date][0].is_booked
+
+    def test_version_is_bumped_on_commit(self):
+        self.assertFalse(self.is_booked())
+        version, _ = get_studio_version(self.studio.pk)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            with transaction.atomic():
+                book_timeslot(self.studio, self.member, self.timeslot, self.timeslot.start_date)
+                self.assertEqual(get_studio_version(self.studio.pk)[0], version)
+
+        self.assertGreater(get_studio_version(self.studio.pk)[0], version)
+        self.assertTrue(self.is_booked())
+
+    def test_rolled_back_booking_keeps_version(self):
+        version, _ = get_studio_version(self.studio.pk)
+
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            with transaction.atomic():
+                book_timeslot(self.studio, self.member, self.timeslot, self.timeslot.start_date)
+                transaction.set_rollback(True)
+
+        self.assertEqual(callbacks, [])
+        self.assertEqual(get_studio_version(self.studio.pk)[0], version)
+
+
+
+@override_settings(CACHES=TEST_CACHES)
+@skipUnlessDBFeature('test_db_allows_multiple_connections')
+class StudioVersionConcurrencyTests(TransactionTestCase):
+    """
+    Description:
+        Reads the availability from another connection while a booking is uncommitted, the
+        availability cached meanwhile must not outlive the booking's commit.
+    """
+
+    def test_read_during_booking(self):
+        studio, timeslot = create_bookable_timeslot()
+        generate_occurrences(timeslot)
+        member = User.objects.create_user(username='member', email='member@example.com')
+        booked = threading.Event()
+        commit = threading.Event()
+        errors = []
+
+        def book():
+            try:
+                with transaction.atomic():
+                    book_timeslot(studio, member, timeslot, timeslot.start_date)
+                    booked.set()
+                    commit.wait(5)
+            except Exception as error:
+                errors.append(error)
+                booked.set()
+            finally:
+                connection.close()
+
+        thread = threading.Thread(target=book)
+        thread.start()
+        booked.wait(5)
+
+        date_list = [timeslot.start_date]
+        self.assertFalse(get_availability(studio, date_list)[timeslot.start_date][0].is_booked)
+
+        commit.set()
+        thread.join()
+
+        self.assertEqual(errors, [])
+        self.assertTrue(get_availability(studio, date_list)[timeslot.start_date][0].is_booked)
+
+
+
+class MemberViewBudgetTests(ViewBudgetTestCase):
+    """
+    Description:
+        Query-count and latency budgets of the member_suite views, see ViewBudgetTestCase.
+    """
+
+    def get_url(self, name):
+        return lambda seeded: reverse(name, kwargs={'studio_url_extension': seeded['studio'].url_extension})
+
+    def test_book_a_kiln_view_as_member(self):
+        self.assertViewBudgetAtEachScale(self.get_url('book_a_kiln'), 2, 1.0, lambda seeded: seeded['member'])
+
+    def test_book_a_kiln_view_as_owner(self):
+        self.assertViewBudgetAtEachScale(self.get_url('book_a_kiln'), 2, 1.0, lambda seeded: seeded['owner'])
+
+    def test_book_a_kiln_view_uncached(self):
+        # Every cache is cold, the studio, member role, version and availability are loaded,
+        # and the build checks for occurrences not rolled forward through the window yet.
+        self.assertViewBudgetAtEachScale(self.get_url('book_a_kiln'), 8, 1.0, lambda seeded: seeded['member'], warm=False)
+
+    def test_unchanged_booking_page_is_not_modified(self):
+        seeded = self.scales['small']
+        url = self.get_url('book_a_kiln')(seeded)
+        self.client.force_login(seeded['member'])
+        etag = self.client.get(url)['ETag']
+
+        with self.assertNumQueries(0):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        # A booking (or a membership change) bumps the studio version.
+        with self.captureOnCommitCallbacks(execute=True):
+            MemberStudioRelationship.objects.filter(studio=seeded['studio']).exclude(member=seeded['member']).first().delete()
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_outdated_booking_page_keeps_its_etag(self):
+        seeded = self.scales['small']
+        url = self.get_url('book_a_kiln')(seeded)
+        self.client.force_login(seeded['member'])
+        etag = self.client.get(url)['ETag']
+        bump_studio_version(seeded['studio'].pk)
+
+        # Another request is rebuilding the availability, the previous one is served meanwhile.
+        with mock.patch('member_suite.availability.CachedComputation.acquire', return_value=False):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual((response.status_code, response['ETag']), (200, etag))
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_member_home_view_has_no_etag(self):
+        seeded = self.scales['small']
+        self.client.force_login(seeded['member'])
+
+        self.assertFalse(self.client.get(self.get_url('member_home')(seeded)).has_header('ETag'))
+
+    def test_member_home_view(self):
+        self.assertViewBudgetAtEachScale(self.get_url('member_home'), 2, 0.25, lambda seeded: seeded['member'])
+
+    def test_member_home_view_with_many_studios(self):
+        seeded = self.scales['small']
+        other_studios = StudioSeeder(studios=20, kilns=1, timeslots=0, members=0, bookings=0, prefix='other').seed()
+        MemberStudioRelationship.objects.bulk_create([
+            MemberStudioRelationship(member=seeded['member'], studio=studio, member_role='RM')
+            for studio in other_studios
+        ])
+
+        self.assertViewBudget(self.get_url('member_home')(seeded), 2, 0.25, user=seeded['member'])
+
+
+
+class AsyncMemberUrls:
+    """
+    Description:
+        URLconf routing the member pages to their async views, as with ASYNC_MEMBER_VIEWS.
+    """
+
+    urlpatterns = [
+        path('member-suite/home/<str:studio_url_extension>', AsyncMemberHomeView.as_view(), name='member_home'),
+        path('member-suite/book-a-kiln/<str:studio_url_extension>', AsyncBookAKilnView.as_view(), name='book_a_kiln'),
+        path('', include('app.urls')),
+    ]
+
+
+
+@override_settings(ROOT_URLCONF=AsyncMemberUrls)
+class AsyncMemberViewTests(MemberViewBudgetTests):
+    """
+    Description:
+        Runs the member view budgets against the async views and checks they serve the same pages.
+    """
+
+    def test_views_are_async(self):
+        self.assertTrue(AsyncMemberHomeView.view_is_async)
+        self.assertTrue(AsyncBookAKilnView.view_is_async)
+
+    def test_book_a_kiln_matches_availability(self):
+        seeded = self.scales['small']
+        self.client.force_login(seeded['member'])
+
+        response = self.client.get(self.get_url('book_a_kiln')(seeded))
+        self.assertIs(response.resolver_match.func.view_class, AsyncBookAKilnView)
+        builder = AvailabilityBuilder(seeded['studio'], response.context['window'].date_list, 'MANAGER')
+
+        self.assertEqual(
+            {day: [slot.timeslot.id for slot in slots] for day, slots in response.context['upcoming_timeslots'].items()},
+            {day: [slot.timeslot.id for slot in slots] for day, slots in builder.build().items()},
+        )
+        self.assertEqual(
+            [booking.id for booking in response.context['users_bookings']],
+            list(BookingManagement.objects.filter(member=seeded['member'], studio=seeded['studio']).values_list('id', flat=True)),
+        )
+
+    def test_book_a_kiln_post(self):
+        studio, timeslot = create_bookable_timeslot()
+        generate_occurrences(timeslot)
+        member = User.objects.create_user(username='async-member', email='async-member@example.com')
+        MemberStudioRelationship.objects.create(member=member, studio=studio, member_role='RM')
+        self.client.force_login(member)
+
+        response = self.client.post(reverse('book_a_kiln', kwargs={'studio_url_extension': studio.url_extension}), {
+            'book_timeslot': timeslot.id,
+            'day': timeslot.start_date.strftime('%Y-%m-%d'),
+        })
+
+        self.assertRedirects(response, reverse('book_a_kiln', kwargs={'studio_url_extension': studio.url_extension}))
+        self.assertTrue(BookingManagement.objects.filter(member=member, timeslot=timeslot).exists())
+
+    def test_non_member_is_not_found(self):
+        seeded = self.scales['small']
+        outsider = User.objects.create_user(username='outsider', email='outsider@example.com')
+        self.client.force_login(outsider)
+
+        response = self.client.get(self.get_url('book_a_kiln')(seeded))
+
+        self.assertEqual(response.status_code, 404)
@@ -1,15 +1,31 @@
 """
 member_suite URL routing, mapping and indexing.
+
+With ASYNC_MEMBER_VIEWS the member pages are served by their async views (see AsyncMemberView).
 """
 
+from django.conf import settings
 from django.urls import path
 
 from .views import (
     MemberHomeView,
     BookAKilnView,
+    AvailabilityView,
+    AvailabilityChangesView,
+    AsyncMemberHomeView,
+    AsyncBookAKilnView,
+    CalendarFeedView,
 )
 
+if settings.ASYNC_MEMBER_VIEWS:
+    member_home_view, book_a_kiln_view = AsyncMemberHomeView, AsyncBookAKilnView
+else:
+    member_home_view, book_a_kiln_view = MemberHomeView, BookAKilnView
+
 urlpatterns = [
-    path('home/<str:studio_url_extension>', MemberHomeView.as_view(), name='member_home'),
-    path('book-a-kiln/<str:studio_url_extension>', BookAKilnView.as_view(), name='book_a_kiln'),
+    path('home/<str:studio_url_extension>', member_home_view.as_view(), name='member_home'),
+    path('book-a-kiln/<str:studio_url_extension>', book_a_kiln_view.as_view(), name='book_a_kiln'),
+    path('api/availability/<str:studio_url_extension>', AvailabilityView.as_view(), name='availability'),
+    path('api/availability/<str:studio_url_extension>/changes', AvailabilityChangesView.as_view(), name='availability_changes'),
+    path('calendar/<str:studio_url_extension>/<str:token>.ics', CalendarFeedView.as_view(), name='calendar_feed'),
 ]
@@ -7,18 +7,31 @@ functionalities. For instance, if a studio enables bookings, members can view an
 the booking system when logged into their studio account.
 """
 
-from django.http import HttpResponseBadRequest
+from asgiref.sync import sync_to_async
+from django.contrib.auth.views import redirect_to_login
+from app.async_queries import gather_queries
+from django.urls import reverse
+from django.utils import timezone
+from django.http import Http404, HttpResponseBadRequest, JsonResponse, StreamingHttpResponse
 from django.shortcuts import get_object_or_404, redirect, render
 from django.views import View
-from studio_suite.models import StudioInfo, MemberStudioRelationship, TimeslotManagement
+from studio_suite.models import StudioInfo, MemberStudioRelationship
 from .models import BookingManagement
+from .availability import AvailabilityWindow, get_availability_entry
+from .bookings import book_timeslot, get_bookable_timeslot, get_member_bookings
+from .changes import get_changes
+from .calendar import MEMBER_FEED, STUDIO_FEED, CalendarFeed, get_feed_url, read_feed_token
 from .forms import BookKilnForm, UnbookKilnForm
 from django.utils.decorators import method_decorator
 from django.contrib.auth.decorators import login_required
-from app.decorators import member_group_required
+from app.decorators import mark_served_studio_version, member_group_required, studio_version_etag
+from app.studio_access import NOT_A_MEMBER, get_member_role_by_id, get_studio, resolve_studio_access
 from django.contrib import messages
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, urlencode
+from studio_suite.versioning import get_studio_version
 
-from datetime import datetime, timedelta
+from datetime import datetime
 
 
 class MemberView(View):
@@ -31,6 +44,9 @@ class MemberView(View):
         Dispatch Requires Login and Member Group Decorator    
     """
 
+    studio_etag = True  # Answer unchanged pages with 304, see studio_version_etag.
+
+    @studio_version_etag
     @member_group_required # Has signed up as a member of the studio.
     @method_decorator(login_required, name="dispatch") # Check the user is logged in.
     def dispatch(self, request, *args, **kwargs):
@@ -48,11 +64,23 @@ class MemberView(View):
         - Remove Studio UUID From Context
         """
 
+        self.setup_member(request, kwargs.get('studio_url_extension'))
+
+        return super().dispatch(request, *args, **kwargs)
+
+    def setup_member(self, request, studio_url_extension):
+        """
+        Description:
+            Sets the studio, ownership, member role and common context of the request.
+        """
+
         self.request = request  # Get requesting client data.
         self.user = request.user  # Get the user data from the request.
-        self.studio_url_extension = kwargs.get('studio_url_extension')  # Get requested studio identifier.
-        self.studio = get_object_or_404(StudioInfo, url_extension=self.studio_url_extension)
-        self.is_owner = request.user == self.studio.linked_account  # Check if user has access to studio_suite.
+        self.studio_url_extension = studio_url_extension  # Get requested studio identifier.
+        studio_access = resolve_studio_access(request, self.studio_url_extension)  # Resolved once per request.
+        self.studio = studio_access.studio
+        self.is_owner = studio_access.is_owner  # Check if user has access to studio_suite.
+        self.member_role = studio_access.member_role
 
         # The following is data we want to be passed to every page update.
         self.context = {
@@ -61,8 +89,6 @@ class MemberView(View):
             'is_owner': self.is_owner,
         }
 
-        return super().dispatch(request, *args, **kwargs)
-
 
 
 class MemberHomeView(MemberView):
@@ -76,6 +102,7 @@ class MemberHomeView(MemberView):
     """
 
     template_name = 'member_suite/member-home.html'
+    studio_etag = False  # Lists the users other studios as well.
 
     def get(self, *args, **kwargs):
         """
@@ -91,7 +118,7 @@ class MemberHomeView(MemberView):
         """
 
         # Temp: Show all studios the user is associated with.
-        user_studios = MemberStudioRelationship.objects.filter(member=self.user)
+        user_studios = MemberStudioRelationship.objects.filter(member=self.user).select_related('studio')
         
         self.context.update({
             'user_studios': user_studios,
@@ -116,8 +143,8 @@ class BookAKilnView(MemberView):
     def get(self, *args, **kwargs):
         """
         Description:
-            Handles GET requests for the kiln booking page. Fetches available timeslots for the next 90 days
-            and related booking information for display.
+            Handles GET requests for the kiln booking page. Fetches available timeslots for a window
+            of days (see get_window) and related booking information for display.
 
         Returns:
             Required information for display bookable or non bookable timeslots on top of the common context.
@@ -127,26 +154,23 @@ class BookAKilnView(MemberView):
             Remove ID's from user_bookings & upcoming timeslots
         """
 
-        # Generate a list of the next 90 days.
-        next_90_days = self.get_next_90_days()
-
-        # Get all of this studios existing bookings for the next 90 days for all users.
-        bookings_within_90_days = BookingManagement.objects.filter(
-            studio=self.studio,
-            booking_date__range=[next_90_days[0], next_90_days[-1]]
-        )
+        try:
+            window = self.get_window()
+        except ValueError:
+            return HttpResponseBadRequest("Invalid date format")
 
         # Create a list of all bookable timeslots, checked against booked timeslots for validity.
-        upcoming_timeslots = self.get_upcoming_bookings(self.studio, next_90_days, self.user, self.is_owner, bookings_within_90_days)
+        upcoming_timeslots = self.get_upcoming_bookings(self.studio, window.date_list, self.member_role, self.is_owner)
 
         # Get all of this users bookings so that they may unbook them if they choose.
         users_bookings = self.get_users_bookings()
 
 
         self.context.update({
-            'next_90_days': next_90_days,
+            'window': window,
             'upcoming_timeslots': upcoming_timeslots,
             'users_bookings': users_bookings,
+            'calendar_feed_url': get_feed_url(self.request, self.studio, self.user.pk, MEMBER_FEED),
         })
 
         return render(self.request, self.template_name, self.context)
@@ -182,24 +206,19 @@ class BookAKilnView(MemberView):
                 except ValueError:
                     return HttpResponseBadRequest("Invalid date format")
                 
-                timeslot = TimeslotManagement.objects.get(studio=self.studio, id=timeslot_id)
+                # Studio owners can book every timeslot, members are limited by their role.
+                timeslot = get_bookable_timeslot(self.studio, timeslot_id, day.date(), None if self.is_owner else self.member_role)
+                if timeslot is None:
+                    messages.error(self.request, "This timeslot can't be booked on this day.")
+                    return self.get_post_response()
 
-                # Set the booking_date to the selected day and the load_after_time of the timeslot
-                booking_date = datetime.combine(day, timeslot.load_after_time)
+                # Book the timeslot at its load_after_time on the selected day, the database refuses double bookings.
+                booking_result = book_timeslot(self.studio, self.request.user, timeslot, day.date())
 
-                # Check if the timeslot is already booked on the selected day
-                if BookingManagement.objects.filter(timeslot=timeslot, booking_date=booking_date).exists():
-                    # Timeslot is already booked, add a failure message and don't save the booking.
+                if booking_result.already_booked:
+                    # Timeslot is already booked, add a failure message.
                     messages.error(self.request, "Timeslot is already booked on this day.")
-                else: # Timeslot is free to book
-                    # Book and provide a success message.
-                    BookingManagement.objects.create(
-                        studio=self.studio,
-                        member=self.request.user,
-                        timeslot=timeslot,
-                        booking_date=booking_date
-                    )
-
+                else:
                     messages.success(self.request, "Booking successful!")
 
         if 'unbook_timeslot' in self.request.POST:
@@ -210,10 +229,10 @@ class BookAKilnView(MemberView):
                 unbook_date_str = unbook_form.cleaned_data.get('unbook_date')
 
                 try:
-                    unbook_date = datetime.strptime(unbook_date_str, '%Y-%m-%d %H:%M:%S')
+                    unbook_date = timezone.make_aware(datetime.strptime(unbook_date_str, '%Y-%m-%d %H:%M:%S'))
                 except ValueError:
                     messages.error(self.request, "Invalid date format")
-                    return redirect('book_a_kiln', studio_url_extension=self.studio_url_extension)
+                    return self.get_post_response()
 
                 if timeslot_id is not None:
                     booking_to_unbook = get_object_or_404(
@@ -227,23 +246,50 @@ class BookAKilnView(MemberView):
                     messages.success(self.request, "Booking canceled successfully!")
 
         # Redirect to the booking page or any other appropriate page
-        return redirect('book_a_kiln', studio_url_extension=self.studio_url_extension)
+        return self.get_post_response()
+
+
+    def get_post_response(self):
+        """
+        Description:
+            Redirects browsers back to the window of the booking page they posted from. Clients
+            asking for JSON get the messages instead, and pull the changed slots since their
+            cursor (see AvailabilityChangesView) rather than reloading the page.
+        """
 
+        if self.request.accepts('application/json') and not self.request.accepts('text/html'):
+            return JsonResponse({
+                'messages': [
+                    {'level': message.level_tag, 'message': message.message}
+                    for message in messages.get_messages(self.request)
+                ],
+            })
 
-    def get_next_90_days(self):
+        booking_url = reverse('book_a_kiln', kwargs={'studio_url_extension': self.studio_url_extension})
+        if 'start' in self.request.GET:
+            booking_url += '?' + urlencode({'start': self.request.GET['start']})
+
+        return redirect(booking_url)
+
+
+    def get_window(self):
         """
         Description:
-            Fetches the next 90 days from the current date.
+            The window of days to display, starting at the start cursor (YYYY-MM-DD, today by default)
+            and spanning the studios availability_window.
 
         Returns:
-            next_90_days (list): A list of datetime objects representing the next 90 days.
+            AvailabilityWindow: The window, moved into the studios booking horizon when outside it.
+
+        Raises:
+            ValueError: The start cursor is not a date.
         """
 
-        # Generate a list of datetime objects for the next 90 days
-        start_date = datetime.now()
-        next_90_days = [(start_date + timedelta(days=day)).date() for day in range(90)]
+        start = self.request.GET.get('start')
+        if start is not None:
+            start = datetime.strptime(start, '%Y-%m-%d').date()
 
-        return next_90_days
+        return AvailabilityWindow(self.studio, start)
 
 
     def get_users_bookings(self):
@@ -258,7 +304,7 @@ class BookAKilnView(MemberView):
             studio as well as a prefilled uneditable hidden form which allows them to unbook it.
         """
 
-        users_bookings = BookingManagement.objects.filter(member=self.user, studio=self.studio)
+        users_bookings = get_member_bookings(self.studio, self.user)
         # for booking in users_bookings (apply uneditable unbook form)
         
         for booking in users_bookings:
@@ -272,88 +318,301 @@ class BookAKilnView(MemberView):
         return users_bookings
 
 
-    def get_upcoming_bookings(self, studio: StudioInfo, date_list: list, user, is_owner, bookings_within_90_days):
+    def get_upcoming_bookings(self, studio: StudioInfo, date_list: list, member_role: str, is_owner):
         """
         Description:
-            Relates days to bookable timeslots for display.
+            Relates days to bookable timeslots for display, see get_availability_entry. The page
+            is tagged with the version of the availability it shows, see mark_served_studio_version.
 
         Returns:
-            dict: A dictionary where keys are dates and values are lists of bookable timeslots for each date.
-        """
-
-        # Fetch all timeslots associated with the studio
-        studio_timeslots = TimeslotManagement.objects.filter(studio=studio)
-
-        # Initialize an empty dictionary to store bookable timeslots for each date
-        upcoming_timeslots = {key: [] for key in date_list}
-
-        # Check if the user is not the owner, and get the user's role and indexed role values
-        if not is_owner:
-            member_role = MemberStudioRelationship.objects.get(member=user, studio=studio).get_member_role()
-            indexed_roles = {tpl[0]: i for i, tpl in enumerate(MemberStudioRelationship.MEMBER_ROLE_CHOICES)}
-
-        # Iterate through each timeslot and relate it to the given dates
-        for timeslot in studio_timeslots:
-            # Check if the user is the owner or has sufficient role permissions
-            if is_owner or indexed_roles.get(member_role) >= indexed_roles.get(timeslot.min_role_required):
-                for day in date_list:
-                    recurring_weekdays = [day.day for day in timeslot.recurring_weekdays.all()]
-                    is_booked = self.check_timeslot_booked(timeslot, day, bookings_within_90_days)
-
-                    # Check if the timeslot is not recurring and starts on the specified day
-                    if timeslot.end_date is None:
-                        if timeslot.is_recurring == False and timeslot.start_date == day:
-                            timeslot_info = {'timeslot': timeslot, 'is_booked': is_booked}
-                            upcoming_timeslots[day].append(timeslot_info)
-
-                        # Check if the timeslot is recurring and the day falls within the range
-                        elif timeslot.is_recurring and timeslot.start_date <= day:
-                            if day.strftime("%A") in recurring_weekdays:
-                                timeslot_info = {'timeslot': timeslot, 'is_booked': is_booked}
-                                upcoming_timeslots[day].append(timeslot_info)
-
-                    # Check if the day falls within the range of a recurring timeslot with an end date      
-                    elif timeslot.start_date <= day <= timeslot.end_date:
-                        if day.strftime("%A") in recurring_weekdays:
-                            timeslot_info = {'timeslot': timeslot, 'is_booked': is_booked}
-                            upcoming_timeslots[day].append(timeslot_info)
-        
-        self.append_booking_forms(upcoming_timeslots)
+            dict: A dictionary where keys are dates and values are lists of the bookable Slots of each date.
+        """
+
+        # Studio owners can book every timeslot, members are limited by their role.
+        # The template renders the booking inputs of open slots, see member_suite.templatetags.booking_inputs.
+        availability = get_availability_entry(studio, date_list, None if is_owner else member_role)
+        mark_served_studio_version(self.request, availability['version'])
+
+        return availability['value']
+
+
 
-        # Return the dictionary of bookable timeslots for each date
-        return upcoming_timeslots
+class AvailabilityView(MemberView):
+    """
+    Description:
+        Compact JSON availability of a window of days (see AvailabilityWindow), for the front-end
+        to render and keep current with AvailabilityChangesView instead of reloading the booking page.
+
+    Security:
+        Dispatch Requires Login and Member Group Decorator
+    """
 
-    def check_timeslot_booked(self, timeslot, day, bookings_within_90_days):
+    def get(self, *args, **kwargs):
         """
         Description:
-            Checks if a timeslot is booked on a specific day.
+            Handles GET requests for the availability of a window of days from start (default today),
+            days long (default the studios availability_window).
 
         Returns:
-            bool: True if the timeslot is booked on the given day, False otherwise.
+            JSON:
+                version: Studio version of the availability, pass it to AvailabilityChangesView
+                start, days: The window, moved into the studios booking horizon when outside it
+                previous_start, next_start: Start of the neighbouring windows, null at either end
+                timeslots: Timeslot id to its kiln, load_after_time and notes
+                slots: [day, timeslot id, is booked] of every bookable slot
         """
-        
-        for booking in bookings_within_90_days:
-            # Check if the booking corresponds to the provided timeslot and day
-            if booking.timeslot == timeslot and booking.booking_date.date() == day:
-                return True
-        return False
-    
-    
-    def append_booking_forms(self, upcoming_timeslots):
+
+        try:
+            start = datetime.strptime(self.request.GET['start'], '%Y-%m-%d').date() if 'start' in self.request.GET else None
+            days = int(self.request.GET['days']) if 'days' in self.request.GET else None
+        except ValueError:
+            return JsonResponse({'error': 'start must be a YYYY-MM-DD date and days a number.'}, status=400)
+
+        if days is not None and days < 1:
+            return JsonResponse({'error': 'days must be at least 1.'}, status=400)
+
+        window = AvailabilityWindow(self.studio, start, days)
+        availability = get_availability_entry(self.studio, window.date_list, None if self.is_owner else self.member_role)
+        mark_served_studio_version(self.request, availability['version'])
+
+        timeslots = {}
+        slots = []
+        for day_slots in availability['value'].values():
+            for slot in day_slots:
+                timeslot = slot.timeslot
+                timeslots.setdefault(timeslot.id, {
+                    'kiln': timeslot.kiln,
+                    'load_after_time': timeslot.load_after_time.strftime('%H:%M'),
+                    'notes': timeslot.notes,
+                })
+                slots.append([slot.day.isoformat(), timeslot.id, slot.is_booked])
+
+        return JsonResponse({
+            'version': availability['version'],
+            'start': window.start.isoformat(),
+            'days': window.days,
+            'previous_start': window.previous_start and window.previous_start.isoformat(),
+            'next_start': window.next_start and window.next_start.isoformat(),
+            'timeslots': timeslots,
+            'slots': slots,
+        })
+
+
+
+class AvailabilityChangesView(MemberView):
+    """
+    Description:
+        JSON slot changes since a studio version, see member_suite.changes.
+
+    Security:
+        Dispatch Requires Login and Member Group Decorator
+    """
+
+    def get(self, *args, **kwargs):
         """
         Description:
-            Add custom pre-filled booking forms to upcoming timeslots.
-        
+            Handles GET requests for the changes after the since version.
+
         Returns:
-            Upcoming timeslots with forms where necessary.
-        """
-        for date, timeslots_list in upcoming_timeslots.items():
-            for timeslot_info in timeslots_list:
-                if not timeslot_info['is_booked']:
-                    booking_form = BookKilnForm({
-                        'book_timeslot': timeslot_info['timeslot'].id,
-                        'day': date.strftime("%Y-%m-%d")
-                    })
-                    timeslot_info['booking_form'] = booking_form
-
-        return upcoming_timeslots
+            JSON:
+                version: Newest logged studio version covered, pass it as since next time
+                changes: [day, timeslot id, is booked] of every changed slot, in order
+                reset: The availability must be reloaded instead (changes is empty)
+        """
+
+        try:
+            since = int(self.request.GET['since'])
+        except (KeyError, ValueError):
+            return JsonResponse({'error': 'since must be a studio version.'}, status=400)
+
+        changes, version = get_changes(self.studio, since, None if self.is_owner else self.member_role)
+
+        return JsonResponse({
+            'version': version,
+            'changes': changes or [],
+            'reset': changes is None,
+        })
+
+
+
+class AsyncMemberView(MemberView):
+    """
+    Description:
+        Async counterpart of MemberView for deployments served over ASGI (see app.asgi). The access
+        checks and setup of MemberView run in one trip to the sync thread, then the async handler is
+        awaited. Handlers fetch independent querysets concurrently, see app.async_queries.
+
+    Security:
+        Same checks as MemberView, Member Group then Login
+    """
+
+    @studio_version_etag
+    async def dispatch(self, request, *args, **kwargs):
+        """
+        Description:
+            Async dispatch method, see MemberView.dispatch.
+        """
+
+        login_redirect = await sync_to_async(self.authorize)(request, kwargs.get('studio_url_extension'))
+        if login_redirect is not None:
+            return login_redirect
+
+        if request.method.lower() in self.http_method_names:
+            handler = getattr(self, request.method.lower(), self.http_method_not_allowed)
+        else:
+            handler = self.http_method_not_allowed
+
+        return await handler(request, *args, **kwargs)
+
+    def authorize(self, request, studio_url_extension):
+        """
+        Description:
+            Applies the member_group_required and login_required checks of MemberView, then sets up the request.
+            The session, user and studio access are synchronous, so this runs on the sync thread.
+
+        Returns:
+            A redirect to the login page for anonymous users, otherwise None.
+
+        Raises:
+            Http404: The user is not a member of the studio.
+        """
+
+        if not resolve_studio_access(request, studio_url_extension).is_member:
+            raise Http404()
+
+        if not request.user.is_authenticated:
+            return redirect_to_login(request.get_full_path())
+
+        self.setup_member(request, studio_url_extension)
+
+
+
+class AsyncMemberHomeView(AsyncMemberView, MemberHomeView):
+    """
+    Description:
+        Async MemberHomeView, see AsyncMemberView.
+
+    Security:
+        Dispatch Requires Login and Member Group Decorator
+    """
+
+    async def get(self, *args, **kwargs):
+        """
+        Description:
+            Handles GET requests for the member's home page, see MemberHomeView.get.
+        """
+
+        user_studios = [
+            relationship async for relationship in
+            MemberStudioRelationship.objects.filter(member=self.user).select_related('studio')
+        ]
+
+        self.context.update({
+            'user_studios': user_studios,
+        })
+
+        return await sync_to_async(render)(self.request, self.template_name, self.context)
+
+
+
+class AsyncBookAKilnView(AsyncMemberView, BookAKilnView):
+    """
+    Description:
+        Async BookAKilnView, see AsyncMemberView. The availability and the users bookings are
+        independent of each other and are fetched concurrently.
+
+    Security:
+        Dispatch Requires Login and Member Group Decorator
+    """
+
+    async def get(self, *args, **kwargs):
+        """
+        Description:
+            Handles GET requests for the kiln booking page, see BookAKilnView.get.
+        """
+
+        try:
+            window = self.get_window()
+        except ValueError:
+            return HttpResponseBadRequest("Invalid date format")
+
+        upcoming_timeslots, users_bookings = await gather_queries(
+            lambda: self.get_upcoming_bookings(self.studio, window.date_list, self.member_role, self.is_owner),
+            self.get_users_bookings,
+        )
+
+        self.context.update({
+            'window': window,
+            'upcoming_timeslots': upcoming_timeslots,
+            'users_bookings': users_bookings,
+            'calendar_feed_url': get_feed_url(self.request, self.studio, self.user.pk, MEMBER_FEED),
+        })
+
+        return await sync_to_async(render)(self.request, self.template_name, self.context)
+
+    async def post(self, *args, **kwargs):
+        """
+        Description:
+            Handles POST requests for the kiln booking page, see BookAKilnView.post. Bookings run
+            in a transaction, so they are handled on the sync thread.
+        """
+        return await sync_to_async(BookAKilnView.post)(self, *args, **kwargs)
+
+
+
+class CalendarFeedView(View):
+    """
+    Description:
+        iCalendar feed of a members bookings or of every booking of a studio, see member_suite.calendar.
+        Calendar clients poll feeds every few minutes, the studio version (see studio_suite.versioning)
+        is the ETag of the feed so unchanged feeds are answered with a 304 straight from the cache.
+
+    Security:
+        Calendar clients cannot log in, the signed token in the url authorizes the request:
+        - The token must be signed by this server for the requested studio.
+        - Member feeds require the token user to still be a member (or the owner) of the studio.
+        - Studio feeds require the token user to own the studio.
+    """
+
+    def get(self, request, studio_url_extension, token):
+        """
+        Description:
+            Handles GET requests for a calendar feed.
+
+        Returns:
+            304 when the clients ETag (or Last-Modified) is current, otherwise the streamed feed.
+        """
+
+        studio = get_studio(studio_url_extension)
+        feed_token = read_feed_token(token)
+
+        if feed_token is None or feed_token['studio'] != str(studio.pk) or not self.has_access(studio, feed_token):
+            raise Http404()
+
+        # Read before the bookings, a change made while streaming makes the ETag stale rather than the feed.
+        version, modified = get_studio_version(studio.pk)
+        etag = f'"{version}"'
+
+        response = get_conditional_response(request, etag=etag, last_modified=modified)
+        if response is None:
+            feed = CalendarFeed(studio, feed_token['feed'], feed_token['user'], modified, request.get_host())
+            response = StreamingHttpResponse(feed.stream(), content_type='text/calendar; charset=utf-8')
+
+        response.headers['ETag'] = etag
+        response.headers['Last-Modified'] = http_date(modified)
+        patch_cache_control(response, private=True, no_cache=True)
+
+        return response
+
+    def has_access(self, studio: StudioInfo, feed_token: dict):
+        """
+        Description:
+            Checks the token user may still read the feed, using the cached member role.
+        """
+
+        is_owner = studio.linked_account_id == feed_token['user']
+
+        if feed_token['feed'] == STUDIO_FEED:
+            return is_owner
+
+        return is_owner or get_member_role_by_id(studio, feed_token['user']) != NOT_A_MEMBER
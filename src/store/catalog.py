@@ -0,0 +1,90 @@
+"""
+Cached product catalog for the store.
+
+Products and their prices are loaded with a single prefetch and cached as plain dicts,
+so the purchase page and checkout never touch the Product and Price tables while the
+cache is warm. The signal receivers in store.signals drop the cached catalog whenever
+a product or price changes, a single request then rebuilds it (see CachedComputation).
+"""
+
+from django.core.cache import cache
+from app.single_flight import CachedComputation
+from .models import Product
+
+CATALOG_CACHE_KEY = 'store:catalog'
+CATALOG_CACHE_TIMEOUT = 60 * 60 * 24  # 1 day in seconds, changes invalidate it sooner.
+
+
+def build_catalog():
+    """
+    Description:
+        Loads every product and its prices in one prefetch.
+
+    Returns:
+        dict:
+            products: Product dicts (in Product.Meta.ordering) with a list of their price dicts
+            prices: Price id to a price dict, including the name and description of its product
+    """
+
+    products = []
+    prices = {}
+
+    for product in Product.objects.prefetch_related('price_set'):
+        product_prices = []
+
+        for price in product.price_set.all():
+            price_info = {
+                'id': price.id,
+                'price': price.price,
+                'product_id': product.id,
+                'product_name': product.name,
+                'product_description': product.description,
+            }
+            product_prices.append(price_info)
+            prices[price.id] = price_info
+
+        products.append({
+            'id': product.id,
+            'name': product.name,
+            'description': product.description,
+            'url': product.url,
+            'prices': product_prices,
+        })
+
+    return {'products': products, 'prices': prices}
+
+
+def get_catalog():
+    """
+    Description:
+        Returns the catalog, from the cache when possible, see build_catalog.
+    """
+
+    # No stale_timeout, checkout must never see a dropped product or price.
+    computation = CachedComputation(CATALOG_CACHE_KEY, CATALOG_CACHE_TIMEOUT, stale_timeout=0)
+
+    return computation.get_or_compute(build_catalog)
+
+
+def get_price(price_id):
+    """
+    Description:
+        Looks up a price (with its product details) in the catalog.
+
+    Returns:
+        dict: The price dict, None if no price has that id.
+    """
+
+    try:
+        return get_catalog()['prices'].get(int(price_id))
+    except (TypeError, ValueError):
+        return None
+
+
+def invalidate_catalog():
+    """
+    Description:
+        Drops the cached catalog, the next request rebuilds it.
+    """
+
+    cache.delete(CATALOG_CACHE_KEY)
@@ -0,0 +1,115 @@
+"""
+Background jobs for the store, executed by the django_rq worker (mh-worker).
+"""
+
+import logging
+from datetime import timedelta
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from django_rq import job
+from .models import Payment, Product, StripeEvent
+from .signals import user_purchase
+
+logger = logging.getLogger(settings.LOGGER_NAME)
+
+# Events still unprocessed this long after they were received are retried, see retry_stripe_events.
+STRIPE_EVENT_RETRY_AFTER = timedelta(minutes=10)
+
+
+@job('default')
+def process_stripe_event(stripe_event_id: int):
+    """
+    Description:
+        Processes a recorded Stripe webhook event, see StripeWebhookView.
+        The event is locked and marked processed in the same transaction as its payment,
+        so a retried job never records a payment twice.
+
+    Returns:
+        bool: True if the event was processed, False if it had already been processed.
+    """
+
+    with transaction.atomic():
+        stripe_event = StripeEvent.objects.select_for_update().get(pk=stripe_event_id)
+
+        if stripe_event.processed_at:
+            return False
+
+        if stripe_event.event_type == 'checkout.session.completed':
+            record_checkout_payment(stripe_event.payload['data']['object'])
+
+        stripe_event.processed_at = timezone.now()
+        stripe_event.save(update_fields=['processed_at'])
+
+    return True
+
+
+def get_unprocessed_stripe_event_ids():
+    """
+    Description:
+        Recorded Stripe events whose processing was never enqueued or failed, received more than
+        STRIPE_EVENT_RETRY_AFTER ago (more recent events may still be waiting on the worker).
+
+    Returns:
+        list: Primary keys of the events, oldest first.
+    """
+
+    return list(
+        StripeEvent.objects
+        .filter(processed_at__isnull=True, received_at__lt=timezone.now() - STRIPE_EVENT_RETRY_AFTER)
+        .order_by('received_at')
+        .values_list('pk', flat=True)
+    )
+
+
+@job('default')
+def retry_stripe_events():
+    """
+    Description:
+        Enqueues process_stripe_event for every unprocessed Stripe event, see get_unprocessed_stripe_event_ids.
+        Stripe stops redelivering an event once it was answered with 200, so events whose job failed
+        are only retried by this sweep. Intended to be enqueued periodically (see the
+        retry_stripe_events management command).
+
+    Returns:
+        int: Number of events enqueued.
+    """
+
+    stripe_event_ids = get_unprocessed_stripe_event_ids()
+    for stripe_event_id in stripe_event_ids:
+        process_stripe_event.delay(stripe_event_id)
+
+    if stripe_event_ids:
+        logger.warning('Retrying %s unprocessed Stripe events', len(stripe_event_ids))
+
+    return len(stripe_event_ids)
+
+
+def record_checkout_payment(session: dict):
+    """
+    Description:
+        Records the payment of a completed checkout session and notifies other apps of the purchase.
+    """
+
+    logger.info('Payment successful')
+
+    customer_email = session['customer_details']['email']
+    product_id = session['metadata']['product_id']
+    user_id = session['metadata']['user_id']
+
+    try:
+        product = Product.objects.get(id=product_id)
+    except Product.DoesNotExist:
+        logger.error('Stripe checkout session %s references unknown product %s', session.get('id'), product_id)
+        return
+
+    # TODO: using user_id, find the corresponding user and grant the product to their account.
+
+    payment = Payment.objects.create(
+        user_email=customer_email,
+        user_id=user_id,
+        product=product,
+        payment_status=Payment.COMPLETED
+    )
+
+    user_purchase.send(sender=process_stripe_event, product_id=product_id, payment_id=payment.id)
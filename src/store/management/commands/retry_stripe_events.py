@@ -0,0 +1,37 @@
+"""
+Retries Stripe webhook events that were recorded but never processed, see store.jobs.retry_stripe_events.
+
+Run every few minutes from cron (or any scheduler), either inline or by handing the work to the RQ worker:
+    python manage.py retry_stripe_events
+    python manage.py retry_stripe_events --enqueue
+"""
+
+from django.core.management.base import BaseCommand
+from store.jobs import get_unprocessed_stripe_event_ids, process_stripe_event, retry_stripe_events
+
+
+class Command(BaseCommand):
+    help = 'Processes recorded Stripe events that are still unprocessed.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--enqueue',
+            action='store_true',
+            help='Enqueue the job on the default RQ queue instead of running it inline.',
+        )
+
+    def handle(self, *args, **options):
+        if options['enqueue']:
+            queued_job = retry_stripe_events.delay()
+            self.stdout.write(f'Enqueued job {queued_job.id}')
+            return
+
+        processed = failed = 0
+        for stripe_event_id in get_unprocessed_stripe_event_ids():
+            try:
+                processed += process_stripe_event(stripe_event_id)
+            except Exception as error:
+                failed += 1
+                self.stderr.write(f'Stripe event {stripe_event_id} failed: {error!r}')
+
+        self.stdout.write(self.style.SUCCESS(f'Processed {processed} Stripe events, {failed} failed.'))
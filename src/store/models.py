@@ -91,3 +91,34 @@ class Payment(models.Model):
         """
 
         return self.product.name
+
+
+
+class StripeEvent(models.Model):
+    """
+    Description:
+        Idempotency record of every Stripe webhook event received. The unique event_id makes a
+        repeated delivery of the same event fail on insert, so it is dropped without a lookup.
+
+    Collects:
+        event_id: Stripe event id (evt_...)
+        event_type: Stripe event type, eg: checkout.session.completed
+        payload: Verified event body, processed by store.jobs.process_stripe_event
+        received_at: When the event was first delivered
+        processed_at: When the event was processed by the worker, null until then
+    """
+
+    event_id = models.CharField(max_length=255, unique=True)
+    event_type = models.CharField(max_length=255)
+    payload = models.JSONField()
+    received_at = models.DateTimeField(auto_now_add=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
+
+
+    def __str__(self):
+        """
+        Description:
+            Return the event id and type.
+        """
+
+        return f"{self.event_id} ({self.event_type})"
@@ -1,7 +1,20 @@
 """
-Unused - Left as provided for reference.
+Store signals and the receivers keeping the cached catalog (store.catalog) in sync.
 """
 
-from django.dispatch import Signal
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import Signal, receiver
+from .catalog import invalidate_catalog
+from .models import Price, Product
 
 user_purchase = Signal()
+
+
+@receiver([post_save, post_delete], sender=Product)
+@receiver([post_save, post_delete], sender=Price)
+def invalidate_cached_catalog(sender, **kwargs):
+    """
+    Description:
+        Drops the cached catalog when a product or price is saved or deleted.
+    """
+    invalidate_catalog()
@@ -0,0 +1,222 @@
+"""
+This module contains unit and integration tests for the store application.
+"""
+
+import hashlib
+import hmac
+import io
+import json
+import time
+from unittest import mock
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import IntegrityError
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from studio_suite.testing import TEST_CACHES, ViewBudgetTestCase
+from .catalog import get_catalog, get_price
+from .jobs import STRIPE_EVENT_RETRY_AFTER, process_stripe_event, retry_stripe_events
+from .models import Payment, Price, Product, StripeEvent
+
+TEST_WEBHOOK_SECRET = 'whsec_test'
+
+
+
+class PurchaseViewBudgetTests(ViewBudgetTestCase):
+    """
+    Description:
+        Query-count and latency budgets of the PurchaseView, see ViewBudgetTestCase.
+    """
+
+    def create_products(self, count):
+        products = Product.objects.bulk_create([
+            Product(name=f'Product {i}', description='Kiln credits', url='https://example.com')
+            for i in range(count)
+        ])
+        Price.objects.bulk_create([
+            Price(product=product, price=price)
+            for product in products
+            for price in (10, 25)
+        ])
+
+    def test_purchase_view(self):
+        member = self.scales['small']['member']
+
+        for product_count in (2, 50):
+            with self.subTest(products=product_count):
+                Product.objects.all().delete()
+                self.create_products(product_count)
+                # Only the session user is loaded, the catalog is served from the cache.
+                self.assertViewBudget(reverse('purchase'), 1, 0.5, user=member)
+
+    def test_purchase_checkout_uses_cached_price(self):
+        self.create_products(2)
+        price = Price.objects.select_related('product').first()
+        self.client.force_login(self.scales['small']['member'])
+        get_catalog()
+
+        with mock.patch('store.views.stripe.checkout.Session.create') as create_session:
+            create_session.return_value.url = 'https://checkout.stripe.com/pay/cs_1'
+
+            with self.assertNumQueries(1):
+                response = self.client.post(reverse('purchase'), {'pk': price.id})
+
+        self.assertRedirects(response, 'https://checkout.stripe.com/pay/cs_1', fetch_redirect_response=False)
+        line_item = create_session.call_args.kwargs['line_items'][0]
+        self.assertEqual(line_item['price_data']['product_data']['name'], price.product.name)
+        self.assertEqual(create_session.call_args.kwargs['metadata']['product_id'], price.product.id)
+
+    def test_purchase_checkout_unknown_price(self):
+        self.client.force_login(self.scales['small']['member'])
+
+        self.assertEqual(self.client.post(reverse('purchase'), {'pk': 'unknown'}).status_code, 404)
+
+
+
+@override_settings(CACHES=TEST_CACHES)
+class CatalogTests(TestCase):
+    """
+    Description:
+        Tests the cached catalog is built in one prefetch and dropped when products or prices change.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.product = Product.objects.create(name='Kiln credits', description='10 firings', url='https://example.com')
+        self.price = Price.objects.create(product=self.product, price=25)
+
+    def test_catalog_is_cached(self):
+        with self.assertNumQueries(2):
+            catalog = get_catalog()
+        with self.assertNumQueries(0):
+            self.assertEqual(get_catalog(), catalog)
+
+        self.assertEqual(catalog['products'][0]['prices'][0]['price'], 25)
+        self.assertEqual(get_price(self.price.id)['product_name'], 'Kiln credits')
+        self.assertIsNone(get_price(self.price.id + 1))
+
+    def test_price_change_invalidates_catalog(self):
+        get_catalog()
+        self.price.price = 30
+        self.price.save()
+
+        self.assertEqual(get_price(self.price.id)['price'], 30)
+
+    def test_product_delete_invalidates_catalog(self):
+        get_catalog()
+        self.product.delete()
+
+        self.assertEqual(get_catalog()['products'], [])
+
+
+
+@override_settings(CACHES=TEST_CACHES, STRIPE_WEBHOOK_SECRET=TEST_WEBHOOK_SECRET)
+class StripeWebhookTests(TestCase):
+    """
+    Description:
+        Tests the webhook records events once and leaves their processing to the worker.
+    """
+
+    def setUp(self):
+        self.product = Product.objects.create(name='Kiln credits', description='10 firings', url='https://example.com')
+
+    def get_event(self, event_id='evt_1'):
+        return {
+            'id': event_id,
+            'object': 'event',
+            'type': 'checkout.session.completed',
+            'data': {'object': {
+                'id': 'cs_1',
+                'customer_details': {'email': 'member@example.com'},
+                'metadata': {'product_id': str(self.product.id), 'user_id': '1'},
+            }},
+        }
+
+    def post_event(self, event):
+        """
+        Description:
+            Posts an event signed the way Stripe signs webhook payloads.
+        """
+
+        payload = json.dumps(event)
+        timestamp = int(time.time())
+        signature = hmac.new(
+            TEST_WEBHOOK_SECRET.encode(), f'{timestamp}.{payload}'.encode(), hashlib.sha256
+        ).hexdigest()
+
+        with mock.patch('store.views.process_stripe_event.delay') as delay:
+            with self.captureOnCommitCallbacks(execute=True):
+                response = self.client.post(
+                    reverse('stripe_webhook'),
+                    payload,
+                    content_type='application/json',
+                    HTTP_STRIPE_SIGNATURE=f't={timestamp},v1={signature}',
+                )
+
+        return response, delay
+
+    def test_records_and_enqueues_event(self):
+        response, delay = self.post_event(self.get_event())
+
+        self.assertEqual(response.status_code, 200)
+        stripe_event = StripeEvent.objects.get(event_id='evt_1')
+        delay.assert_called_once_with(stripe_event.pk)
+        self.assertFalse(Payment.objects.exists())
+
+    def test_drops_duplicate_event(self):
+        self.post_event(self.get_event())
+        process_stripe_event(StripeEvent.objects.get().pk)
+        response, delay = self.post_event(self.get_event())
+
+        self.assertEqual(response.status_code, 200)
+        delay.assert_not_called()
+        self.assertEqual(StripeEvent.objects.count(), 1)
+
+    def test_reenqueues_unprocessed_duplicate_event(self):
+        self.post_event(self.get_event())
+        response, delay = self.post_event(self.get_event())
+
+        self.assertEqual(response.status_code, 200)
+        delay.assert_called_once_with(StripeEvent.objects.get().pk)
+
+    def test_rejects_invalid_signature(self):
+        response = self.client.post(
+            reverse('stripe_webhook'),
+            json.dumps(self.get_event()),
+            content_type='application/json',
+            HTTP_STRIPE_SIGNATURE='t=1,v1=invalid',
+        )
+
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(StripeEvent.objects.exists())
+
+    def test_process_stripe_event_once(self):
+        self.post_event(self.get_event())
+        stripe_event = StripeEvent.objects.get()
+
+        self.assertTrue(process_stripe_event(stripe_event.pk))
+        self.assertFalse(process_stripe_event(stripe_event.pk))
+
+        payment = Payment.objects.get()
+        self.assertEqual(payment.product, self.product)
+        self.assertEqual(payment.payment_status, Payment.COMPLETED)
+
+    def test_retries_failed_events(self):
+        self.post_event(self.get_event())
+        self.post_event(self.get_event('evt_2'))
+        failed, recent = StripeEvent.objects.order_by('event_id')
+
+        with mock.patch('store.jobs.Payment.objects.create', side_effect=IntegrityError):
+            with self.assertRaises(IntegrityError):
+                process_stripe_event(failed.pk)
+
+        StripeEvent.objects.filter(pk=failed.pk).update(received_at=timezone.now() - STRIPE_EVENT_RETRY_AFTER)
+        with mock.patch('store.jobs.process_stripe_event.delay') as delay:
+            self.assertEqual(retry_stripe_events(), 1)
+        delay.assert_called_once_with(failed.pk)
+
+        call_command('retry_stripe_events', stdout=io.StringIO())
+        self.assertIsNotNone(StripeEvent.objects.get(pk=failed.pk).processed_at)
+        self.assertIsNone(StripeEvent.objects.get(pk=recent.pk).processed_at)
+        self.assertEqual(Payment.objects.count(), 1)
@@ -2,20 +2,23 @@
 Unused - Left as provided for reference.
 """
 
+import json
 import logging
 import stripe
 from django.conf import settings
 from django.contrib.auth.decorators import login_required
-from django.http import HttpResponse
-from django.shortcuts import redirect, get_object_or_404
+from django.db import IntegrityError, transaction
+from django.http import Http404, HttpResponse
+from django.shortcuts import redirect
 from django.shortcuts import render
 from django.utils.decorators import method_decorator
 from django.views import View
 from django.views.decorators.csrf import csrf_exempt
 from django.views.generic import TemplateView
 
-from .models import Price, Product, Payment
-from .signals import user_purchase
+from .jobs import process_stripe_event
+from .catalog import get_catalog, get_price
+from .models import StripeEvent
 
 stripe.api_key = settings.STRIPE_SECRET
 
@@ -34,13 +37,8 @@ class PurchaseView(View):
         Unused - Left as provided for reference.
         """
 
-        products = {}
-
-        for product in Product.objects.all():
-            products[product] = Price.objects.filter(product=product)
-
         return render(request, 'store/purchase.html', {
-            'products': products
+            'products': get_catalog()['products']
         })
 
     @method_decorator(login_required)
@@ -49,7 +47,10 @@ class PurchaseView(View):
         Create a checkout session and redirect the user to Stripe's checkout page
         """
 
-        price = Price.objects.get(id=request.POST.get('pk'))
+        price = get_price(request.POST.get('pk'))
+
+        if price is None:
+            raise Http404()
 
         checkout_session = stripe.checkout.Session.create(
             payment_method_types=['card'],
@@ -57,17 +58,17 @@ class PurchaseView(View):
                 {
                     'price_data': {
                         'currency': 'usd',
-                        'unit_amount': int(price.price) * 100,
+                        'unit_amount': int(price['price']) * 100,
                         'product_data': {
-                            'name': price.product.name,
-                            'description': price.product.description
+                            'name': price['product_name'],
+                            'description': price['product_description']
                         },
                     },
                     'quantity': 1,
                 }
             ],
             metadata={
-                'product_id': price.product.id,
+                'product_id': price['product_id'],
                 'user_id': request.user.id
             },
             mode='payment',
@@ -104,7 +105,14 @@ class StripeWebhookView(View):
 
     def post(self, request, *args, **kwargs):
         """
-        Unused - Left as provided for reference.
+        Description:
+            Verifies the event signature, records the event and enqueues its processing
+            (store.jobs.process_stripe_event) on the default queue. Repeated deliveries of an
+            event that is still unprocessed enqueue it again, see store.jobs.retry_stripe_events.
+
+        Returns:
+            200 once the event is recorded (or was already processed), 400 if it can't be verified.
+            A failing enqueue is raised, so Stripe redelivers the event.
         """
 
         payload = request.body
@@ -120,26 +128,24 @@ class StripeWebhookView(View):
             # Invalid signature
             return HttpResponse(status=400)
 
-        if event['type'] == 'checkout.session.completed':
-            logger.info('Payment successful')
-
-            session = event['data']['object']
-            customer_email = session['customer_details']['email']
-            product_id = session['metadata']['product_id']
-            user_id = session['metadata']['user_id']
-            product: Product = get_object_or_404(Product, id=product_id)
-
-            # TODO: using user_id, find the corresponding user and grant the product to their account.
-            # Next, record payment, and send signal to notify other apps of the purchase.
-            # To avoid failure modes, use a transaction to wrap the entire operation.
-
-            payment = Payment.objects.create(
-                user_email=customer_email,
-                user_id=user_id,
-                product=product,
-                payment_status='completed'
-            )
-
-            user_purchase.send(sender=self.__class__, product_id=product_id, payment_id=payment.id)
+        # Record the event before anything else, a repeated delivery of the same event fails on the unique event_id.
+        try:
+            with transaction.atomic():
+                stripe_event = StripeEvent.objects.create(
+                    event_id=event['id'],
+                    event_type=event['type'],
+                    payload=json.loads(payload),
+                )
+        except IntegrityError:
+            stripe_event = StripeEvent.objects.filter(event_id=event['id'], processed_at__isnull=True).first()
+            if stripe_event is None:
+                logger.info('Dropped duplicate Stripe event %s', event['id'])
+                return HttpResponse(status=200)
+
+            # Enqueueing or processing an earlier delivery failed (or is pending), the job skips processed events.
+            logger.info('Re-enqueued unprocessed Stripe event %s', event['id'])
+
+        # Process the event on the worker once the record is committed, so Stripe gets its response right away.
+        transaction.on_commit(lambda: process_stripe_event.delay(stripe_event.pk))
 
         return HttpResponse(status=200)
@@ -10,9 +10,10 @@ from .models import (
     KilnRange,
     KilnManagement,
     TimeslotManagement,
-    Weekday,
     # TimeslotBlackout
 )
+from .forms import TimeslotManagementAdminForm
+from .occurrences import regenerate_occurrences
 
 
 class StudioInfoAdmin(admin.ModelAdmin):
@@ -76,36 +77,63 @@ class KilnManagementAdmin(admin.ModelAdmin):
 
 
 
+class RecurringWeekdayListFilter(admin.SimpleListFilter):
+    """
+    Description:
+        Filters timeslots by a recurring weekday with a bitwise filter on recurring_weekday_mask.
+    """
+
+    title = 'recurring weekday'
+    parameter_name = 'recurring_weekday'
+
+    def lookups(self, request, model_admin):
+        return [(str(i), day) for i, (day, _) in enumerate(TimeslotManagement.DAYS_OF_WEEK_CHOICES)]
+
+    def queryset(self, request, queryset):
+        if self.value() is None:
+            return queryset
+        return queryset.on_weekday(int(self.value()))
+
+
+
 class TimeslotManagementAdmin(admin.ModelAdmin):
     """
     Description:
         Defines the admin configuration for the 'TimeslotManagement' model.
     """
 
+    form = TimeslotManagementAdminForm
     list_display = (
         'studio', 'kiln', 'is_recurring', 'start_date', 'end_date',
         'recurrence_frequency', 'load_after_time', 'get_recurring_weekdays',
         )
-    list_filter = ('is_recurring', 'recurrence_frequency')
+    list_filter = ('is_recurring', 'recurrence_frequency', RecurringWeekdayListFilter)
     search_fields = ('studio__name', 'kiln__name', 'notes')
     list_per_page = 20
-    filter_horizontal = ('recurring_weekdays',)
 
     def get_recurring_weekdays(self, obj):
         """
         Description:
-            This function takes an object that has a many-to-many relationship with recurring weekdays
-            and returns a readable list of those weekdays, separated by commas.
+            Returns a readable list of the timeslots recurring weekdays, separated by commas.
         """
 
-        return ", ".join([day.get_day_display() for day in obj.recurring_weekdays.all()])
+        return ", ".join(obj.get_recurring_weekdays())
     get_recurring_weekdays.short_description = 'Recurring Weekdays'
 
+    def save_related(self, request, form, formsets, change):
+        """
+        Description:
+            Once the recurring weekdays are saved, re-expand the timeslots materialized occurrences
+            so that admin edits are reflected on the booking page.
+        """
+
+        super().save_related(request, form, formsets, change)
+        regenerate_occurrences(form.instance)
+
 
 
 admin.site.register(StudioInfo, StudioInfoAdmin)
 admin.site.register(MemberStudioRelationship, MemberStudioRelationshipAdmin)
 admin.site.register(KilnManagement, KilnManagementAdmin)
-admin.site.register(Weekday)
 admin.site.register(TimeslotManagement, TimeslotManagementAdmin)
 admin.site.register(KilnRange, KilnRangeAdmin)
\ No newline at end of file
@@ -1,6 +1,6 @@
 """
 This module defines the configuration for the 'studio_suite' Django application.
-It specifies the app's name and database field configuration.
+It specifies the app's name, database field configuration and connects its signals.
 """
 
 from django.apps import AppConfig
@@ -16,3 +16,11 @@ class StudiosuiteConfig(AppConfig):
 
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'studio_suite'
+
+    def ready(self):
+        """
+        Description:
+            Connects the studio_suite signal receivers once the app registry is ready.
+        """
+
+        import studio_suite.signals  # noqa
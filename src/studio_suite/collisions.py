@@ -0,0 +1,226 @@
+"""
+Timeslot collision detection against a per-kiln interval index of concrete load datetimes.
+
+Every kiln load (a materialized TimeslotOccurrence) is kept in a sorted array, so a new
+timeslot rule is only compared against the saved loads within 24 hours of its own loads
+(found with bisect) instead of against every saved rule of the kiln.
+"""
+
+from bisect import bisect_left, bisect_right
+from collections import defaultdict, deque
+from datetime import date, datetime, timedelta
+from django.utils import timezone
+from .models import KilnManagement, TimeslotManagement, TimeslotOccurrence
+from .occurrences import get_horizon_date, occurrence_dates, roll_forward_occurrences
+
+# Two kiln loads collide when they are less than 24 hours apart.
+COLLISION_WINDOW = timedelta(hours=23, minutes=59)
+
+COLLISION_MESSAGES = {
+    # Do not re-number the keys, if you create a new collision rule, add a new key for it.
+    0: 'Submitted Timeslots Date (or Start Date) is less than 24 hours from the following Timeslots Date (or Start Date).',
+    1: 'Submitted Timeslots End Date is less than 24 hours from the following Timeslots Date.',
+    2: 'Submitted Timeslots Recurring Weekdays will overlap the following Timeslots Date.',
+    3: 'Submitted Timeslots Recurring Weekdays will overlap (some of) the following Timeslots Recurring Weekdays.',
+    4: 'Submitted Timeslots Date (or Start Date) is less than 24 hours from the following Timeslots End Date.',
+    5: 'Submitted Timeslots Date overlaps the following Timeslots Recurring Weekdays.',
+    6: 'Submitted Timeslots End Date is less than 24 hours from the following Timeslots Start Date.',
+    7: 'Submitted Timeslots Load After Time is less than 24 hours from the following Timeslots Load After Time (Is within 24 hours of another timeslots load after time).'
+}
+
+
+class KilnOccurrenceIndex:
+    """
+    Description:
+        Sorted array of a kilns concrete load datetimes, searched with bisect.
+
+    Collects:
+        load_datetimes: Sorted load datetimes
+        timeslot_ids: Timeslot id of the load at the same position in load_datetimes
+    """
+
+    def __init__(self, loads):
+        loads = sorted(loads)
+        self.load_datetimes = [load_datetime for load_datetime, _ in loads]
+        self.timeslot_ids = [timeslot_id for _, timeslot_id in loads]
+
+    @staticmethod
+    def get_occurrence_queryset(kiln: KilnManagement, window_start: date, window_end: date):
+        """
+        Description:
+            (timeslot_id, occurrence_date, load_after_time) of the kilns occurrences within the padded window.
+        """
+
+        return TimeslotOccurrence.objects.filter(
+            kiln=kiln,
+            occurrence_date__range=[window_start - timedelta(days=1), window_end + timedelta(days=1)],
+        ).values_list('timeslot_id', 'occurrence_date', 'load_after_time')
+
+    @classmethod
+    def for_kiln(cls, kiln: KilnManagement, window_start: date, window_end: date):
+        """
+        Description:
+            Builds the index from the kilns materialized occurrences within a window, padded
+            by a day on each side so loads just outside the window are still found.
+        """
+
+        occurrences = cls.get_occurrence_queryset(kiln, window_start, window_end)
+
+        return cls(
+            (datetime.combine(occurrence_date, load_after_time), timeslot_id)
+            for timeslot_id, occurrence_date, load_after_time in occurrences
+        )
+
+    def nearby(self, load_datetime: datetime):
+        """
+        Description:
+            Finds the indexed loads that collide with a load datetime.
+
+        Returns:
+            list: (load_datetime, timeslot_id) tuples within COLLISION_WINDOW of load_datetime.
+        """
+
+        low = bisect_left(self.load_datetimes, load_datetime - COLLISION_WINDOW)
+        high = bisect_right(self.load_datetimes, load_datetime + COLLISION_WINDOW)
+
+        return list(zip(self.load_datetimes[low:high], self.timeslot_ids[low:high]))
+
+
+def sweep_collisions(loads):
+    """
+    Description:
+        Finds every pair of loads on the same kiln less than 24 hours apart. The loads are sorted
+        by datetime and swept once, keeping per kiln only the loads within COLLISION_WINDOW of the
+        current one, so this is O(n log n) plus the number of colliding pairs.
+
+    Collects:
+        loads: (load_datetime, kiln_id, key, day) tuples, key identifies the timeslot (or row) of the load
+
+    Returns:
+        generator: ((key, day), (other_key, other_day)) pairs of colliding loads of different keys,
+        the other load is the earlier one.
+    """
+
+    windows = defaultdict(deque)
+
+    for load_datetime, kiln_id, key, day in sorted(loads, key=lambda load: load[0]):
+        window = windows[kiln_id]
+        while window and window[0][0] < load_datetime - COLLISION_WINDOW:
+            window.popleft()
+
+        for _, other_key, other_day in window:
+            if other_key != key:
+                yield (key, day), (other_key, other_day)
+
+        window.append((load_datetime, key, day))
+
+
+def get_rule_window_end(timeslot: TimeslotManagement):
+    """
+    Description:
+        Last date a rule has to be checked through. Rules recurring forever are checked
+        through the occurrence horizon of their first load.
+    """
+
+    if not timeslot.is_recurring:
+        return timeslot.start_date
+    if timeslot.end_date:
+        return timeslot.end_date
+
+    return get_horizon_date(max(timeslot.start_date, timezone.localdate()))
+
+
+def classify_collision(new_timeslot: TimeslotManagement, new_day: date, saved_timeslot: TimeslotManagement, saved_day: date):
+    """
+    Description:
+        Maps two colliding kiln loads to the collision message categories.
+
+    Returns:
+        set: COLLISION_MESSAGES keys describing the collision.
+    """
+
+    categories = set()
+    new_is_start = new_day == new_timeslot.start_date
+    new_is_end = new_day == new_timeslot.end_date
+    saved_is_start = saved_day == saved_timeslot.start_date
+    saved_is_end = saved_day == saved_timeslot.end_date
+
+    # Start dates, end dates and start to end dates can't collide.
+    if new_is_start and saved_is_start:
+        categories.add(0)
+    if new_is_end and saved_is_start:
+        categories.add(6 if saved_timeslot.is_recurring else 1)
+    if new_is_start and saved_is_end:
+        categories.add(4)
+
+    if new_day == saved_day:
+        # Recurring weekdays can't land on the same day as another timeslots load.
+        if new_timeslot.is_recurring and saved_timeslot.is_recurring:
+            categories.add(3)
+        elif new_timeslot.is_recurring:
+            categories.add(2)
+        elif saved_timeslot.is_recurring and not saved_is_end:
+            categories.add(5)
+    elif not categories:
+        # Loads on neighbouring days must be more than 24 hours apart.
+        categories.add(7)
+
+    return categories
+
+
+def get_kiln_timeslots(studio_id, kiln_id):
+    """
+    Description:
+        The saved timeslot rules of a kiln, see detect_collisions.
+    """
+    return TimeslotManagement.objects.filter(studio_id=studio_id, kiln=kiln_id)
+
+
+def detect_collisions(new_timeslot: TimeslotManagement):
+    """
+    Description:
+        Detects collisions between a (not yet saved) timeslot rule and the saved timeslots of its kiln.
+        The new rule is expanded into its concrete loads, which are each checked against the kilns
+        occurrence index for saved loads less than 24 hours away.
+
+    Returns:
+        collisions_detected (list): A list of collisions detected, where each collision is
+        represented as a list containing collision warnings and the associated timeslot.
+        The collision warnings are strings describing the type of collision detected.
+    """
+
+    window_start = new_timeslot.start_date
+    window_end = get_rule_window_end(new_timeslot)
+    new_days = occurrence_dates(new_timeslot, window_start, window_end)
+
+    if not new_days:
+        return []
+
+    # Saved rules may not be materialized as far out as the new rule yet.
+    kiln_timeslots = get_kiln_timeslots(new_timeslot.studio_id, new_timeslot.kiln_id)
+    roll_forward_occurrences(until=window_end + timedelta(days=1), queryset=kiln_timeslots)
+
+    index = KilnOccurrenceIndex.for_kiln(new_timeslot.kiln_id, window_start, window_end)
+
+    colliding_loads = {}
+    for new_day in new_days:
+        new_datetime = datetime.combine(new_day, new_timeslot.load_after_time)
+        for saved_datetime, timeslot_id in index.nearby(new_datetime):
+            # An edited timeslot can't collide with its own saved loads.
+            if timeslot_id == new_timeslot.pk:
+                continue
+            colliding_loads.setdefault(timeslot_id, []).append((new_day, saved_datetime.date()))
+
+    saved_timeslots = kiln_timeslots.in_bulk(colliding_loads.keys())
+
+    collisions_detected = []
+    for timeslot_id in sorted(colliding_loads):
+        saved_timeslot = saved_timeslots[timeslot_id]
+        categories = set()
+        for new_day, saved_day in colliding_loads[timeslot_id]:
+            categories |= classify_collision(new_timeslot, new_day, saved_timeslot, saved_day)
+
+        collision_warnings = [COLLISION_MESSAGES[category] for category in sorted(categories)]
+        collisions_detected.append([collision_warnings, saved_timeslot])
+
+    return collisions_detected
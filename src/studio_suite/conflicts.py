@@ -0,0 +1,118 @@
+"""
+Studio-wide schedule conflict report.
+
+Every timeslot rule of a studio is expanded into its concrete loads from today onwards and all
+of them are swept once (see sweep_collisions), finding every pair of timeslots with loads less
+than 24 hours apart on the same kiln. This catches conflicts the submission-time detector never
+saw, eg: after a kiln was reassigned or the collision rules changed.
+
+Reports are computed by the compute_conflict_report job and cached with the studio version
+they were computed at (see studio_suite.versioning). Once the schedule changes, the previous
+report is shown while a single job computes the new one, see CachedComputation.
+"""
+
+from datetime import datetime
+from django.utils import timezone
+from app.single_flight import CachedComputation
+from .collisions import COLLISION_MESSAGES, classify_collision, get_rule_window_end, sweep_collisions
+from .models import TimeslotManagement
+from .occurrences import occurrence_dates
+
+# Bump when the collision rules or the report format change, so cached reports are recomputed.
+CONFLICT_REPORT_REVISION = 2
+CONFLICT_REPORT_TIMEOUT = 60 * 60 * 24  # 1 day in seconds, schedule changes replace it sooner.
+CONFLICT_REPORT_LOCK_TIMEOUT = 60 * 10  # 10 minutes in seconds, the report is requested again if the job was lost.
+
+
+def get_conflict_report_cache_key(studio_id):
+    """
+    Description:
+        Cache key of a studios conflict report.
+    """
+    return f'studio:{studio_id}:conflicts:{CONFLICT_REPORT_REVISION}'
+
+
+def get_conflict_report_computation(studio_id, version):
+    """
+    Description:
+        The cached conflict report of a studio at a studio version, see CachedComputation.
+        The lock is held from enqueueing the compute_conflict_report job until it has finished.
+    """
+
+    return CachedComputation(
+        get_conflict_report_cache_key(studio_id),
+        CONFLICT_REPORT_TIMEOUT,
+        version,
+        lock_timeout=CONFLICT_REPORT_LOCK_TIMEOUT,
+    )
+
+
+def describe_timeslot(timeslot: TimeslotManagement):
+    """
+    Description:
+        Plain dict of the timeslot details shown in the report (reports are cached, so they hold no model instances).
+    """
+
+    return {
+        'id': timeslot.id,
+        'is_recurring': timeslot.is_recurring,
+        'start_date': timeslot.start_date,
+        'end_date': timeslot.end_date,
+        'recurring_weekdays': timeslot.get_recurring_weekdays(),
+        'load_after_time': timeslot.load_after_time,
+    }
+
+
+def build_conflict_report(studio_id):
+    """
+    Description:
+        Computes every pairwise conflict between the current and upcoming timeslots of a studio.
+        Within a pair the newer timeslot (higher id) is treated as the submitted one, matching
+        the messages the submission-time detector would have shown.
+
+    Returns:
+        list: A dict per conflicting pair of timeslots, earliest conflict first:
+            kiln: Kiln name
+            timeslots: The newer and the older timeslot, see describe_timeslot
+            messages: COLLISION_MESSAGES of the conflict
+            first_date: Day of the earliest colliding load
+            load_count: Number of colliding load pairs
+    """
+
+    today = timezone.localdate()
+    timeslots = TimeslotManagement.objects.filter(studio_id=studio_id).exclude(
+        end_date__lt=today,
+    ).exclude(
+        is_recurring=0,
+        start_date__lt=today,
+    ).select_related('kiln').in_bulk()
+
+    loads = [
+        (datetime.combine(day, timeslot.load_after_time), timeslot.kiln_id, timeslot.id, day)
+        for timeslot in timeslots.values()
+        for day in occurrence_dates(timeslot, today, get_rule_window_end(timeslot))
+    ]
+
+    conflicts = {}
+    for (timeslot_id, day), (other_id, other_day) in sweep_collisions(loads):
+        if timeslot_id < other_id:
+            timeslot_id, day, other_id, other_day = other_id, other_day, timeslot_id, day
+
+        conflict = conflicts.setdefault((timeslot_id, other_id), {'categories': set(), 'first_date': day, 'load_count': 0})
+        conflict['categories'] |= classify_collision(timeslots[timeslot_id], day, timeslots[other_id], other_day)
+        conflict['first_date'] = min(conflict['first_date'], day, other_day)
+        conflict['load_count'] += 1
+
+    report = [
+        {
+            'kiln': str(timeslots[timeslot_id].kiln),
+            'timeslots': [describe_timeslot(timeslots[timeslot_id]), describe_timeslot(timeslots[other_id])],
+            'messages': [COLLISION_MESSAGES[category] for category in sorted(conflict['categories'])],
+            'first_date': conflict['first_date'],
+            'load_count': conflict['load_count'],
+        }
+        for (timeslot_id, other_id), conflict in conflicts.items()
+    ]
+    report.sort(key=lambda conflict: (conflict['first_date'], conflict['kiln'], conflict['timeslots'][0]['id']))
+
+    return report
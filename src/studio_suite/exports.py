@@ -0,0 +1,169 @@
+"""
+CSV exports of a studios bookings, timeslots and members for studio owners.
+
+Rows are read as tuples with values_list(...).iterator(chunk_size=EXPORT_CHUNK_SIZE), which uses a
+server-side cursor on PostgreSQL, and written through a small buffer that is handed to a
+StreamingHttpResponse whenever it fills. Memory use stays flat whatever the number of rows.
+"""
+
+import csv
+import io
+from django.utils import timezone
+from member_suite.models import BookingManagement
+from .models import MemberStudioRelationship, StudioInfo, TimeslotManagement
+
+EXPORT_CHUNK_SIZE = 2000  # Rows fetched per database round trip.
+STREAM_BUFFER_SIZE = 64 * 1024  # Characters of CSV written per streamed chunk.
+
+# Spreadsheet apps evaluate cells starting with these characters as formulas.
+FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+
+def escape_cell(value):
+    """
+    Description:
+        Prevents member entered text (usernames, notes) from being evaluated as a spreadsheet formula.
+    """
+
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return "'" + value
+
+    return value
+
+
+
+class StudioExport:
+    """
+    Description:
+        Base class of a streamed CSV export of a studio, subclasses define the header and rows.
+
+    Collects:
+        studio: StudioInfo object being exported
+    """
+
+    name = None
+    header = []
+
+    def __init__(self, studio: StudioInfo):
+        self.studio = studio
+
+    def get_rows(self):
+        """
+        Description:
+            values_list queryset of the exported rows.
+        """
+        raise NotImplementedError
+
+    def format_row(self, row):
+        """
+        Description:
+            Converts a values_list row into the cells of a CSV row.
+        """
+        return row
+
+    def get_filename(self):
+        return f'{self.studio.url_extension}-{self.name}-{timezone.localdate():%Y-%m-%d}.csv'
+
+    def stream(self):
+        """
+        Description:
+            Yields the CSV in chunks of about STREAM_BUFFER_SIZE characters.
+        """
+
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(self.header)
+
+        for row in self.get_rows().iterator(chunk_size=EXPORT_CHUNK_SIZE):
+            writer.writerow([escape_cell(cell) for cell in self.format_row(row)])
+
+            if buffer.tell() >= STREAM_BUFFER_SIZE:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+
+        yield buffer.getvalue()
+
+
+
+class BookingsExport(StudioExport):
+    """
+    Description:
+        Every booking of the studio, oldest first.
+    """
+
+    name = 'bookings'
+    header = ['Booking ID', 'Booking Date', 'Timeslot ID', 'Kiln', 'Member', 'Member Email']
+
+    def get_rows(self):
+        return BookingManagement.objects.filter(studio=self.studio).order_by('booking_date', 'id').values_list(
+            'id', 'booking_date', 'timeslot_id', 'timeslot__kiln__kiln_name', 'member__username', 'member__email',
+        )
+
+    def format_row(self, row):
+        booking_id, booking_date, *rest = row
+        return [booking_id, booking_date.isoformat(), *rest]
+
+
+
+class TimeslotsExport(StudioExport):
+    """
+    Description:
+        Every timeslot rule of the studio.
+    """
+
+    name = 'timeslots'
+    header = [
+        'Timeslot ID', 'Kiln', 'Minimum Role', 'Recurring', 'Recurring Weekdays',
+        'Start Date', 'End Date', 'Load After Time', 'Notes',
+    ]
+
+    role_names = dict(MemberStudioRelationship.MEMBER_ROLE_CHOICES)
+    recurring_names = dict(TimeslotManagement.RECURRING_CHOICES)
+
+    def get_rows(self):
+        return TimeslotManagement.objects.filter(studio=self.studio).order_by('id').values_list(
+            'id', 'kiln__kiln_name', 'min_role_required', 'is_recurring', 'recurring_weekday_mask',
+            'start_date', 'end_date', 'load_after_time', 'notes',
+        )
+
+    def format_row(self, row):
+        timeslot_id, kiln_name, min_role, is_recurring, weekday_mask, start_date, end_date, load_after_time, notes = row
+        weekdays = [day for i, (day, _) in enumerate(TimeslotManagement.DAYS_OF_WEEK_CHOICES) if weekday_mask & (1 << i)]
+
+        return [
+            timeslot_id,
+            kiln_name,
+            self.role_names.get(min_role, min_role),
+            self.recurring_names.get(is_recurring, is_recurring),
+            ' '.join(weekdays),
+            start_date.isoformat(),
+            end_date.isoformat() if end_date else '',
+            load_after_time.isoformat(),
+            notes or '',
+        ]
+
+
+
+class MembersExport(StudioExport):
+    """
+    Description:
+        Every member of the studio and their role.
+    """
+
+    name = 'members'
+    header = ['Username', 'Email', 'Role', 'Date Joined']
+
+    role_names = dict(MemberStudioRelationship.MEMBER_ROLE_CHOICES)
+
+    def get_rows(self):
+        return MemberStudioRelationship.objects.filter(studio=self.studio).order_by('member__username').values_list(
+            'member__username', 'member__email', 'member_role', 'member__date_joined',
+        )
+
+    def format_row(self, row):
+        username, email, member_role, date_joined = row
+        return [username, email, self.role_names.get(member_role, member_role), date_joined.isoformat()]
+
+
+EXPORTS = {export.name: export for export in (BookingsExport, TimeslotsExport, MembersExport)}
@@ -2,6 +2,9 @@
 Custom forms served in relation to studio information gathering.
 """
 
+import csv
+import io
+import json
 import re
 from django.core.validators import URLValidator
 from django.core.exceptions import ValidationError
@@ -12,10 +15,10 @@ from .models import (
     KilnManagement,
     KilnRange,
     TimeslotManagement,
-    Weekday,
     TimeslotBlackout,
     MemberStudioRelationship,
 )
+from .occurrences import OCCURRENCE_HORIZON_DAYS
 
 
 
@@ -48,7 +51,9 @@ class StudioInfoForm(forms.ModelForm):
             'business_main_address', #added address
             'website_link', #added link
             'timezone', #added timezone
-            'currency' #added currency
+            'currency', #added currency
+            'availability_window',
+            'booking_horizon',
             ]
 
     url_extension = forms.CharField(
@@ -106,6 +111,19 @@ class StudioInfoForm(forms.ModelForm):
 
         return currency
 
+    def clean_booking_horizon(self):
+        """
+        Description:
+            Custom validation method to keep the booking horizon within the materialized timeslot occurrences.
+        """
+
+        booking_horizon = self.cleaned_data['booking_horizon']
+
+        if booking_horizon is not None and booking_horizon > OCCURRENCE_HORIZON_DAYS:
+            raise forms.ValidationError(f"Bookings can open at most {OCCURRENCE_HORIZON_DAYS} days ahead.")
+
+        return booking_horizon
+
     def clean_url_extension(self):
         """
         Description:
@@ -253,7 +271,59 @@ class KilnDeleteForm(forms.Form):
 
 
 
-class TimeslotManagementForm(forms.ModelForm):
+class KilnChoiceField(forms.ModelChoiceField):
+    """
+    Description:
+        Kiln choice resolved among loaded_kilns (kiln id to kiln) when they are set, instead of
+        querying the submitted kiln, so forms validated in bulk share one kiln query.
+    """
+
+    loaded_kilns = None
+
+    def to_python(self, value):
+        if self.loaded_kilns is None or value in self.empty_values:
+            return super().to_python(value)
+
+        kiln = self.loaded_kilns.get(str(value))
+        if kiln is None:
+            raise ValidationError(self.error_messages['invalid_choice'], code='invalid_choice', params={'value': value})
+
+        return kiln
+
+
+
+class WeekdayMaskFormMixin:
+    """
+    Description:
+        Serves TimeslotManagement.recurring_weekday_mask as a recurring_weekdays checkbox
+        field of weekday names, and writes the selected names back into the mask on save.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        if self.instance.pk and 'recurring_weekdays' not in self.initial:
+            self.initial['recurring_weekdays'] = self.instance.get_recurring_weekdays()
+
+    def save(self, commit=True):
+        """
+        Description:
+            Sets the recurring weekday mask from the selected weekdays before saving.
+        """
+
+        instance = super().save(commit=False)
+        instance.recurring_weekday_mask = TimeslotManagement.get_weekday_mask(
+            self.cleaned_data.get('recurring_weekdays') or []
+        )
+
+        if commit:
+            instance.save()
+
+        return instance
+
+
+
+class TimeslotManagementForm(WeekdayMaskFormMixin, forms.ModelForm):
     """
     Description:
         This form is used for creating or updating timeslot management,
@@ -273,10 +343,10 @@ class TimeslotManagementForm(forms.ModelForm):
         choices=TimeslotManagement.RECURRENCE_FREQUENCY_CHOICES,
     )
 
-    recurring_weekdays = forms.ModelMultipleChoiceField(
+    recurring_weekdays = forms.MultipleChoiceField(
         label = '',
         required=False,
-        queryset=Weekday.objects.all(),
+        choices=TimeslotManagement.DAYS_OF_WEEK_CHOICES,
         widget=forms.CheckboxSelectMultiple,
     )
 
@@ -287,15 +357,30 @@ class TimeslotManagementForm(forms.ModelForm):
         This method allows for custom initialization and configuration of the form.
         In particular, it checks for the 'studio' keyword argument in 'kwargs'and,
         if provided, customizes the 'kiln' field's queryset based on the 'studio' value.
+        The 'kilns' keyword argument, the studio's kilns already loaded, resolves the
+        kiln without querying it (see studio_suite.imports).
         """
 
         studio = kwargs.pop('studio', None)  # Get the user from the form's kwargs if needed
+        kilns = kwargs.pop('kilns', None)
         super(TimeslotManagementForm, self).__init__(*args, **kwargs)
 
         # Customize the queryset for the kiln field based on your requirements
         if studio:
             self.fields['kiln'].queryset = KilnManagement.objects.filter(studio=studio)
 
+        if kilns is not None:
+            self.fields['kiln'].loaded_kilns = {str(kiln.pk): kiln for kiln in kilns}
+
+    def _get_validation_exclusions(self):
+        exclude = super()._get_validation_exclusions()
+
+        # A kiln resolved among the loaded kilns exists, the model need not query it again.
+        if self.fields['kiln'].loaded_kilns is not None:
+            exclude.add('kiln')
+
+        return exclude
+
 
 
     class Meta:
@@ -317,6 +402,10 @@ class TimeslotManagementForm(forms.ModelForm):
             'notes',
         ]
 
+        field_classes = {
+            'kiln': KilnChoiceField,
+        }
+
         labels = {
             'kiln': 'Kiln',
             'min_role_required': 'Required Role',
@@ -380,8 +469,8 @@ class TimeslotManagementForm(forms.ModelForm):
             if not end_date:
                 self.add_error('end_date', 'Required for recurring bookings.')
 
-            if end_date and recurring_weekdays:
-                form_weekdays_list = [weekday.day for weekday in recurring_weekdays]
+            if start_date and end_date and recurring_weekdays:
+                form_weekdays_list = list(recurring_weekdays)
                 startdate_weekday = weekday_mapping[start_date.weekday()]
                 if startdate_weekday not in form_weekdays_list:
                     self.add_error('start_date', f"Start date must be on a selected recurring weekday {form_weekdays_list}. Current '{startdate_weekday}'.")
@@ -393,14 +482,15 @@ class TimeslotManagementForm(forms.ModelForm):
 
         elif is_recurring == 2: # Forever
             cleaned_data['end_date'] = None
-            form_weekdays_list = [weekday.day for weekday in recurring_weekdays]
+            form_weekdays_list = list(recurring_weekdays or [])
 
             if not recurrence_frequency:
                 self.add_error('recurrence_frequency', 'Required for recurring bookings.')
 
-            startdate_weekday = weekday_mapping[start_date.weekday()]
-            if startdate_weekday not in form_weekdays_list:
-                self.add_error('start_date', f"Start date must be on a selected recurring weekday {form_weekdays_list}. Current '{startdate_weekday}'.")
+            if start_date:
+                startdate_weekday = weekday_mapping[start_date.weekday()]
+                if startdate_weekday not in form_weekdays_list:
+                    self.add_error('start_date', f"Start date must be on a selected recurring weekday {form_weekdays_list}. Current '{startdate_weekday}'.")
 
         if start_date and end_date:
             if end_date <= start_date:
@@ -410,6 +500,84 @@ class TimeslotManagementForm(forms.ModelForm):
 
 
 
+class TimeslotImportForm(forms.Form):
+    """
+    Description:
+        Upload of a .csv or .json file of timeslots, imported by studio_suite.imports.TimeslotImport.
+
+    Collects:
+        import_file: Parsed into a list of row dicts by clean_import_file
+        check_only: Report which rows would be accepted without saving any
+    """
+
+    max_rows = 1000
+
+    import_file = forms.FileField(label='Timeslot File (.csv or .json)')
+    check_only = forms.BooleanField(label='Check only, do not save', required=False)
+
+    def clean_import_file(self):
+        """
+        Description:
+            Replaces the uploaded file with its rows, a dict of TimeslotManagementForm data per row.
+            A .csv file has a header of TimeslotManagementForm field names, a .json file is a list
+            of objects with those keys. Kilns are referenced by name, recurring_weekdays is a list
+            of weekday names (or in CSV a cell of names separated by spaces, commas or semicolons).
+        """
+
+        import_file = self.cleaned_data['import_file']
+
+        try:
+            content = import_file.read().decode('utf-8-sig')
+        except UnicodeDecodeError:
+            raise ValidationError('The import file must be UTF-8 encoded.')
+
+        if import_file.name.lower().endswith('.json'):
+            try:
+                rows = json.loads(content)
+            except ValueError as error:
+                raise ValidationError(f'The import file is not valid JSON: {error}')
+            if not isinstance(rows, list) or not all(isinstance(row, dict) for row in rows):
+                raise ValidationError('The JSON import file must be a list of timeslot objects.')
+        elif import_file.name.lower().endswith('.csv'):
+            rows = list(csv.DictReader(io.StringIO(content)))
+        else:
+            raise ValidationError('The import file must be a .csv or .json file.')
+
+        if not rows:
+            raise ValidationError('The import file has no timeslots.')
+        if len(rows) > self.max_rows:
+            raise ValidationError(f'The import file has {len(rows)} timeslots, the limit is {self.max_rows}.')
+
+        for row in rows:
+            weekdays = row.get('recurring_weekdays') or []
+            if isinstance(weekdays, str):
+                row['recurring_weekdays'] = [day for day in re.split(r'[\s,;]+', weekdays) if day]
+
+        return rows
+
+
+
+class TimeslotManagementAdminForm(WeekdayMaskFormMixin, forms.ModelForm):
+    """
+    Description:
+        Admin panel form for timeslots, edits the recurring weekday mask as weekday checkboxes.
+
+    Related Model:
+        TimeslotManagement
+    """
+
+    recurring_weekdays = forms.MultipleChoiceField(
+        required=False,
+        choices=TimeslotManagement.DAYS_OF_WEEK_CHOICES,
+        widget=forms.CheckboxSelectMultiple,
+    )
+
+    class Meta:
+        model = TimeslotManagement
+        exclude = ['recurring_weekday_mask']
+
+
+
 class DeleteTimeslotForm(forms.Form):
     """
     Description:
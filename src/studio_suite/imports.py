@@ -0,0 +1,196 @@
+"""
+Bulk import of timeslot rules from a CSV or JSON file (parsed by TimeslotImportForm).
+
+Every row is validated with TimeslotManagementForm, then the concrete loads of every valid row
+and the saved loads of the same kilns are checked for collisions in a single sweep-line pass
+sorted by load datetime, which finds collisions within the batch as well as against saved
+timeslots. Rows are accepted in file order, a row is rejected when it collides with a saved
+timeslot or with an earlier accepted row. Accepted rows and their materialized occurrences are
+written with bulk_create in one transaction.
+"""
+
+from collections import defaultdict
+from datetime import datetime, timedelta
+from django.db import transaction
+from member_suite.changes import record_reset
+from .collisions import COLLISION_MESSAGES, classify_collision, get_rule_window_end, sweep_collisions
+from .forms import TimeslotManagementForm
+from .models import KilnManagement, StudioInfo, TimeslotManagement, TimeslotOccurrence
+from .occurrences import get_horizon_date, occurrence_dates, roll_forward_occurrences
+
+
+
+class TimeslotImport:
+    """
+    Description:
+        Validates, collision checks and saves a batch of timeslot rows for a studio.
+
+    Collects:
+        studio: StudioInfo object the timeslots are imported into
+        rows: Form data dicts, see TimeslotImportForm
+        accepted: (row number, unsaved TimeslotManagement) of the rows that will be saved
+        rejected: (row number, list of error messages) of the invalid and colliding rows
+    """
+
+    def __init__(self, studio: StudioInfo, rows: list):
+        self.studio = studio
+        self.rows = rows
+        self.accepted = []
+        self.rejected = []
+
+    def validate_rows(self):
+        """
+        Description:
+            Validates every row with TimeslotManagementForm. Kilns are referenced by name.
+
+        Returns:
+            list: (row number, unsaved TimeslotManagement) of the valid rows.
+        """
+
+        # Loaded once, every row's form resolves its kiln among them.
+        kilns = list(KilnManagement.objects.filter(studio=self.studio))
+        kiln_ids = {kiln.kiln_name: kiln.pk for kiln in kilns}
+        valid_rows = []
+
+        for row_number, row in enumerate(self.rows, start=1):
+            data = {field: row.get(field) for field in TimeslotManagementForm.Meta.fields}
+            data['kiln'] = kiln_ids.get(data['kiln'], data['kiln'])
+
+            form = TimeslotManagementForm(data, studio=self.studio, kilns=kilns)
+            if form.is_valid():
+                timeslot = form.save(commit=False)
+                timeslot.studio = self.studio
+                valid_rows.append((row_number, timeslot))
+            else:
+                self.rejected.append((row_number, [
+                    f'{field}: {error}' for field, errors in form.errors.items() for error in errors
+                ]))
+
+        return valid_rows
+
+    def get_loads(self, valid_rows):
+        """
+        Description:
+            Concrete loads of the valid rows and the saved loads of their kilns.
+
+        Returns:
+            list: (load_datetime, kiln_id, key, day) tuples, key is ('row', row number) or ('saved', timeslot id).
+        """
+
+        loads = []
+        window_start = min(timeslot.start_date for _, timeslot in valid_rows)
+        window_end = window_start
+
+        for row_number, timeslot in valid_rows:
+            row_window_end = get_rule_window_end(timeslot)
+            window_end = max(window_end, row_window_end)
+            for day in occurrence_dates(timeslot, timeslot.start_date, row_window_end):
+                loads.append((datetime.combine(day, timeslot.load_after_time), timeslot.kiln_id, ('row', row_number), day))
+
+        # Saved rules may not be materialized as far out as the imported rules yet.
+        kiln_ids = {timeslot.kiln_id for _, timeslot in valid_rows}
+        kiln_timeslots = TimeslotManagement.objects.filter(studio=self.studio, kiln__in=kiln_ids)
+        roll_forward_occurrences(until=window_end + timedelta(days=1), queryset=kiln_timeslots)
+
+        saved_loads = TimeslotOccurrence.objects.filter(
+            kiln__in=kiln_ids,
+            occurrence_date__range=[window_start - timedelta(days=1), window_end + timedelta(days=1)],
+        ).values_list('timeslot_id', 'kiln_id', 'occurrence_date', 'load_after_time')
+
+        for timeslot_id, kiln_id, day, load_after_time in saved_loads.iterator(chunk_size=2000):
+            loads.append((datetime.combine(day, load_after_time), kiln_id, ('saved', timeslot_id), day))
+
+        return loads
+
+    def find_collisions(self, loads):
+        """
+        Description:
+            Collisions of every row load with saved loads and other row loads, see sweep_collisions.
+
+        Returns:
+            dict: Row number to a list of (other key, row day, other day) collisions.
+        """
+
+        collisions = defaultdict(list)
+
+        for (key, day), (other_key, other_day) in sweep_collisions(loads):
+            if key[0] == 'row':
+                collisions[key[1]].append((other_key, day, other_day))
+            if other_key[0] == 'row':
+                collisions[other_key[1]].append((key, other_day, day))
+
+        return collisions
+
+    def check(self):
+        """
+        Description:
+            Validates the rows and splits them into accepted and rejected, without saving anything.
+        """
+
+        valid_rows = self.validate_rows()
+        if not valid_rows:
+            return
+
+        collisions = self.find_collisions(self.get_loads(valid_rows))
+        saved_timeslots = TimeslotManagement.objects.select_related('kiln').in_bulk({
+            other_key[1] for row_collisions in collisions.values() for other_key, _, _ in row_collisions
+            if other_key[0] == 'saved'
+        })
+        accepted_rows = {}
+
+        for row_number, timeslot in valid_rows:
+            categories = defaultdict(set)
+            for (source, other_id), day, other_day in collisions.get(row_number, []):
+                if source == 'saved':
+                    categories[f'timeslot {other_id} ({saved_timeslots[other_id].kiln})'] |= classify_collision(
+                        timeslot, day, saved_timeslots[other_id], other_day)
+                elif other_id in accepted_rows:
+                    categories[f'row {other_id}'] |= classify_collision(timeslot, day, accepted_rows[other_id], other_day)
+
+            if categories:
+                self.rejected.append((row_number, [
+                    f'Collides with {other}: {COLLISION_MESSAGES[category]}'
+                    for other, other_categories in categories.items() for category in sorted(other_categories)
+                ]))
+            else:
+                accepted_rows[row_number] = timeslot
+
+        self.accepted = list(accepted_rows.items())
+        self.rejected.sort(key=lambda rejected_row: rejected_row[0])
+
+    def save(self):
+        """
+        Description:
+            Writes the accepted timeslots and their occurrences (through the occurrence horizon,
+            as generate_occurrences would) with bulk_create in one transaction.
+
+        Returns:
+            list: The created TimeslotManagement objects.
+        """
+
+        timeslots = [timeslot for _, timeslot in self.accepted]
+        if not timeslots:
+            return []
+
+        horizon_date = get_horizon_date()
+        for timeslot in timeslots:
+            timeslot.occurrences_generated_until = horizon_date if timeslot.is_recurring else max(horizon_date, timeslot.start_date)
+
+        with transaction.atomic():
+            TimeslotManagement.objects.bulk_create(timeslots)
+            TimeslotOccurrence.objects.bulk_create([
+                TimeslotOccurrence(
+                    studio_id=timeslot.studio_id,
+                    kiln_id=timeslot.kiln_id,
+                    timeslot=timeslot,
+                    occurrence_date=day,
+                    load_after_time=timeslot.load_after_time,
+                )
+                for timeslot in timeslots
+                for day in occurrence_dates(timeslot, timeslot.start_date, timeslot.occurrences_generated_until)
+            ], batch_size=2000)
+
+        # bulk_create sends no post_save signals.
+        record_reset(self.studio.pk)
+
+        return timeslots
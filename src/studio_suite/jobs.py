@@ -0,0 +1,66 @@
+"""
+Background jobs for the studio_suite, executed by the django_rq worker (mh-worker).
+"""
+
+import logging
+from django.conf import settings
+from django_rq import job
+from member_suite.changes import prune_changes
+from .conflicts import build_conflict_report, get_conflict_report_computation
+from .occurrences import roll_forward_occurrences
+
+logger = logging.getLogger(settings.LOGGER_NAME)
+
+
+@job('default')
+def roll_timeslot_occurrences():
+    """
+    Description:
+        Rolls every timeslots materialized occurrences forward to the occurrence horizon, and
+        prunes the availability change log (see member_suite.changes).
+        Intended to be enqueued daily (see the roll_timeslot_occurrences management command).
+
+    Returns:
+        int: Number of occurrences created.
+    """
+
+    created = roll_forward_occurrences()
+    logger.info('Rolled timeslot occurrences forward, %s created', created)
+
+    pruned = prune_changes()
+    logger.info('Pruned %s availability changes', pruned)
+
+    return created
+
+
+@job('default')
+def compute_conflict_report(studio_id, version):
+    """
+    Description:
+        Computes a studios conflict report and caches it at the studio version it was requested at,
+        then releases the lock taken by enqueue_conflict_report, see studio_suite.conflicts.
+
+    Returns:
+        int: Number of conflicting timeslot pairs.
+    """
+
+    computation = get_conflict_report_computation(studio_id, version)
+    try:
+        report = computation.compute(lambda: build_conflict_report(studio_id))['value']
+    finally:
+        computation.release()
+
+    logger.info('Computed the conflict report of studio %s, %s conflicts', studio_id, len(report))
+
+    return len(report)
+
+
+def enqueue_conflict_report(studio_id, version):
+    """
+    Description:
+        Enqueues compute_conflict_report unless the job is already queued or running, so
+        repeated requests for an outdated report compute it once.
+    """
+
+    if get_conflict_report_computation(studio_id, version).acquire():
+        compute_conflict_report.delay(studio_id, version)
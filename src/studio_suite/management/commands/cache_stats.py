@@ -0,0 +1,43 @@
+"""
+Prints the hit and miss counters of the two-tier cache (see app.cache) of every running process:
+    python manage.py cache_stats
+"""
+
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from app.cache import COUNTERS, STATS_INTERVAL, TwoTierCache
+
+
+class Command(BaseCommand):
+    help = 'Prints the local and Redis tier hit and miss counters of every process using the two-tier cache.'
+
+    def handle(self, *args, **options):
+        if not isinstance(cache, TwoTierCache):
+            raise CommandError('The default cache is not a TwoTierCache.')
+
+        stats = cache.get_published_stats()
+        if not stats:
+            self.stdout.write(f'No process has published its counters (every {STATS_INTERVAL} seconds) yet.')
+            return
+
+        totals = dict.fromkeys(COUNTERS, 0)
+        for process, counters in sorted(stats.items()):
+            self.stdout.write(self.format_counters(process, counters))
+            for name, value in counters.items():
+                totals[name] += value
+
+        self.stdout.write(self.format_counters(f'Total of {len(stats)} processes', totals))
+
+    def format_counters(self, label, counters):
+        """
+        Description:
+            Formats the counters and hit ratio of each tier.
+        """
+
+        tiers = []
+        for tier in ('local', 'redis'):
+            hits, misses = counters[f'{tier}_hits'], counters[f'{tier}_misses']
+            ratio = hits / (hits + misses) if hits + misses else 0
+            tiers.append(f'{tier} {hits} hits / {misses} misses ({ratio:.1%})')
+
+        return f'{label}: ' + ', '.join(tiers)
@@ -0,0 +1,107 @@
+"""
+Prints the database query plans of the hot studio_suite and member_suite view queries.
+
+Seeds a few studios inside a transaction that is rolled back afterwards, so it is safe to run
+against a development database:
+    python manage.py explain_queries
+    python manage.py explain_queries --analyze  # PostgreSQL only
+"""
+
+from datetime import timedelta
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.utils import timezone
+from app.studio_access import get_member_role_queryset
+from studio_suite.collisions import KilnOccurrenceIndex, get_kiln_timeslots
+from studio_suite.models import KilnManagement, TimeslotOccurrence
+from studio_suite.seed import StudioSeeder
+from studio_suite.views import KilnManagementView
+from member_suite.availability import AvailabilityBuilder, AvailabilityWindow
+from member_suite.bookings import get_bookable_timeslot_queryset, get_member_bookings
+
+
+class Command(BaseCommand):
+    help = 'Prints EXPLAIN output of the hot view queries against seeded (and rolled back) studios.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--studios', type=int, default=5)
+        parser.add_argument('--kilns', type=int, default=10)
+        parser.add_argument('--timeslots', type=int, default=100)
+        parser.add_argument('--members', type=int, default=50)
+        parser.add_argument('--bookings', type=int, default=2000)
+        parser.add_argument('--seed', type=int, default=1)
+        parser.add_argument('--analyze', action='store_true', help='Run EXPLAIN ANALYZE (PostgreSQL only).')
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            studio, member, kiln = self.seed(options)
+
+            # Refresh the planner statistics so the plans reflect the seeded data.
+            with connection.cursor() as cursor:
+                cursor.execute('ANALYZE')
+
+            explain_options = {'analyze': True} if options['analyze'] else {}
+            for label, queryset in self.get_queries(studio, member, kiln):
+                self.stdout.write(self.style.MIGRATE_HEADING(label))
+                self.stdout.write(str(queryset.query))
+                self.stdout.write(queryset.explain(**explain_options))
+                self.stdout.write('')
+
+            transaction.set_rollback(True)
+
+    def get_queries(self, studio, member, kiln):
+        """
+        Description:
+            The queries of the views, built by the same helpers: AvailabilityBuilder, get_member_bookings,
+            get_bookable_timeslot, detect_collisions, app.studio_access and KilnManagementView.
+
+        Returns:
+            list: (label, queryset) tuples.
+        """
+
+        today = timezone.localdate()
+        member_role = get_member_role_queryset(studio, member.pk).first()
+        builder = AvailabilityBuilder(studio, AvailabilityWindow(studio).date_list, member_role)
+        occurrence = TimeslotOccurrence.objects.filter(studio=studio).first()
+
+        return [
+            ('BookAKilnView availability: bookings within the window', builder.get_booking_queryset()),
+            ('BookAKilnView availability: timeslots occurring within the window', builder.get_timeslot_queryset()),
+            ('BookAKilnView availability: occurrences within the window', builder.get_occurrences()),
+            ('BookAKilnView: users bookings', get_member_bookings(studio, member)),
+            ('book_timeslot: bookable timeslot', get_bookable_timeslot_queryset(
+                studio, occurrence.timeslot_id, occurrence.occurrence_date, member_role,
+            )),
+            ('TimeslotManagementView collisions: kiln timeslots', get_kiln_timeslots(studio.pk, kiln.pk)),
+            ('TimeslotManagementView collisions: kiln occurrences', KilnOccurrenceIndex.get_occurrence_queryset(
+                kiln, today, today + timedelta(days=89),
+            )),
+            ('Studio access: member role', get_member_role_queryset(studio, member.pk)),
+            ('KilnManagementView: existing range name', KilnManagementView.get_named_ranges(studio, 'Range 0')),
+            ('KilnManagementView: existing kiln name', KilnManagementView.get_named_kilns(studio, 'Kiln 0')),
+        ]
+
+    def seed(self, options):
+        """
+        Description:
+            Seeds a few studios, see StudioSeeder.
+
+        Returns:
+            tuple: The first studio, one of its members and one of its kilns.
+        """
+
+        studio = StudioSeeder(
+            studios=options['studios'],
+            kilns=options['kilns'],
+            timeslots=options['timeslots'],
+            members=options['members'],
+            bookings=options['bookings'],
+            prefix='explain',
+            seed=options['seed'],
+        ).seed()[0]
+
+        member = User.objects.filter(memberstudiorelationship__studio=studio).first()
+        kiln = KilnManagement.objects.filter(studio=studio).first()
+
+        return studio, member, kiln
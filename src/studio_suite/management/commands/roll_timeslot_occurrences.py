@@ -0,0 +1,30 @@
+"""
+Rolls materialized timeslot occurrences forward to the occurrence horizon.
+
+Run daily from cron (or any scheduler), either inline or by handing the work to the RQ worker:
+    python manage.py roll_timeslot_occurrences
+    python manage.py roll_timeslot_occurrences --enqueue
+"""
+
+from django.core.management.base import BaseCommand
+from studio_suite.jobs import roll_timeslot_occurrences
+
+
+class Command(BaseCommand):
+    help = 'Materializes timeslot occurrences through the occurrence horizon.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--enqueue',
+            action='store_true',
+            help='Enqueue the job on the default RQ queue instead of running it inline.',
+        )
+
+    def handle(self, *args, **options):
+        if options['enqueue']:
+            queued_job = roll_timeslot_occurrences.delay()
+            self.stdout.write(f'Enqueued job {queued_job.id}')
+            return
+
+        created = roll_timeslot_occurrences()
+        self.stdout.write(self.style.SUCCESS(f'Created {created} timeslot occurrences.'))
@@ -0,0 +1,59 @@
+"""
+Seeds synthetic studios for load testing, see studio_suite.seed.StudioSeeder.
+
+Usage:
+    python manage.py seed_studios
+    python manage.py seed_studios --studios 50 --kilns 20 --timeslots 200 --members 200 --bookings 2000
+    python manage.py seed_studios --prefix load --seed 7
+
+Every seeded user can log in with the password in studio_suite.seed.SEED_PASSWORD.
+"""
+
+import time
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from studio_suite.models import StudioInfo
+from studio_suite.seed import SEED_PASSWORD, StudioSeeder
+
+
+class Command(BaseCommand):
+    help = 'Bulk-creates synthetic studios with kilns, timeslots, members and bookings.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--studios', type=int, default=10)
+        parser.add_argument('--kilns', type=int, default=10, help='Kilns (and kiln ranges) per studio.')
+        parser.add_argument('--timeslots', type=int, default=100, help='Timeslot rules per studio.')
+        parser.add_argument('--members', type=int, default=100, help='Members per studio.')
+        parser.add_argument('--bookings', type=int, default=1000, help='Bookings per studio.')
+        parser.add_argument('--prefix', default='seed', help='Prefix of seeded usernames and url extensions.')
+        parser.add_argument('--seed', type=int, default=1, help='Random seed.')
+
+    def handle(self, *args, **options):
+        if StudioInfo.objects.filter(url_extension__startswith=f"{options['prefix']}-studio-").exists():
+            raise CommandError(f"Studios prefixed '{options['prefix']}' already exist, pick another --prefix.")
+
+        seeder = StudioSeeder(
+            studios=options['studios'],
+            kilns=options['kilns'],
+            timeslots=options['timeslots'],
+            members=options['members'],
+            bookings=options['bookings'],
+            prefix=options['prefix'],
+            seed=options['seed'],
+        )
+
+        start = time.perf_counter()
+        with transaction.atomic():
+            seeder.seed()
+        elapsed = time.perf_counter() - start
+
+        for model_name, count in seeder.counts.items():
+            self.stdout.write(f'{model_name}: {count}')
+        if seeder.unplaced_bookings:
+            self.stdout.write(self.style.WARNING(
+                f'{seeder.unplaced_bookings} bookings did not fit the occurrences seeded, pass more --timeslots.'
+            ))
+        self.stdout.write(self.style.SUCCESS(
+            f'Seeded {sum(seeder.counts.values())} rows in {elapsed:.1f} s. '
+            f"Log in as {options['prefix']}-owner-0 with password '{SEED_PASSWORD}'."
+        ))
@@ -0,0 +1,42 @@
+# Generated by Django 4.2 on 2026-10-17 02:09
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('studio_suite', '0028_studioinfo_business_main_address_studioinfo_currency_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='timeslotmanagement',
+            name='occurrences_generated_until',
+            field=models.DateField(blank=True, editable=False, null=True),
+        ),
+        migrations.CreateModel(
+            name='TimeslotOccurrence',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('occurrence_date', models.DateField()),
+                ('load_after_time', models.TimeField()),
+                ('kiln', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='studio_suite.kilnmanagement')),
+                ('studio', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='studio_suite.studioinfo')),
+                ('timeslot', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='occurrences', to='studio_suite.timeslotmanagement')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='timeslotoccurrence',
+            index=models.Index(fields=['studio', 'occurrence_date'], name='occurrence_studio_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='timeslotoccurrence',
+            index=models.Index(fields=['kiln', 'occurrence_date'], name='occurrence_kiln_date_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='timeslotoccurrence',
+            constraint=models.UniqueConstraint(fields=('timeslot', 'occurrence_date'), name='unique_timeslot_occurrence'),
+        ),
+    ]
@@ -0,0 +1,58 @@
+# Generated by Django 4.2 on 2026-10-17 02:10
+
+from datetime import date, timedelta
+from django.db import migrations
+
+OCCURRENCE_HORIZON_DAYS = 120
+
+
+def backfill_occurrences(apps, schema_editor):
+    """
+    Materialize the occurrences of every existing timeslot through the occurrence horizon.
+    The expansion is inlined so this migration does not depend on the current app code.
+    """
+
+    TimeslotManagement = apps.get_model('studio_suite', 'TimeslotManagement')
+    TimeslotOccurrence = apps.get_model('studio_suite', 'TimeslotOccurrence')
+    horizon = date.today() + timedelta(days=OCCURRENCE_HORIZON_DAYS)
+
+    for timeslot in TimeslotManagement.objects.prefetch_related('recurring_weekdays'):
+        if not timeslot.is_recurring:
+            days = [timeslot.start_date]
+            until = max(horizon, timeslot.start_date)
+        else:
+            weekday_names = {weekday.day for weekday in timeslot.recurring_weekdays.all()}
+            last_day = min(horizon, timeslot.end_date) if timeslot.end_date else horizon
+            days = []
+            day = timeslot.start_date
+            while day <= last_day:
+                if day.strftime("%A") in weekday_names:
+                    days.append(day)
+                day += timedelta(days=1)
+            until = horizon
+
+        TimeslotOccurrence.objects.bulk_create(
+            [
+                TimeslotOccurrence(
+                    studio_id=timeslot.studio_id,
+                    kiln_id=timeslot.kiln_id,
+                    timeslot_id=timeslot.id,
+                    occurrence_date=day,
+                    load_after_time=timeslot.load_after_time,
+                )
+                for day in days
+            ],
+            ignore_conflicts=True,
+        )
+        TimeslotManagement.objects.filter(pk=timeslot.pk).update(occurrences_generated_until=until)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('studio_suite', '0029_timeslotoccurrence'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_occurrences, migrations.RunPython.noop),
+    ]
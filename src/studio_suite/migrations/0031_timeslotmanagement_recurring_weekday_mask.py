@@ -0,0 +1,58 @@
+# Generated by Django 4.2 on 2026-10-17 02:13
+
+from django.db import migrations, models
+
+WEEKDAYS = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+
+
+def weekdays_to_mask(apps, schema_editor):
+    """
+    Copy each timeslots Weekday relations into its recurring weekday mask (Monday is bit 0).
+    """
+
+    TimeslotManagement = apps.get_model('studio_suite', 'TimeslotManagement')
+
+    for timeslot in TimeslotManagement.objects.prefetch_related('recurring_weekdays'):
+        mask = 0
+        for weekday in timeslot.recurring_weekdays.all():
+            mask |= 1 << WEEKDAYS.index(weekday.day)
+        if mask:
+            TimeslotManagement.objects.filter(pk=timeslot.pk).update(recurring_weekday_mask=mask)
+
+
+def mask_to_weekdays(apps, schema_editor):
+    """
+    Recreate the Weekday rows and relations from the recurring weekday masks.
+    """
+
+    TimeslotManagement = apps.get_model('studio_suite', 'TimeslotManagement')
+    Weekday = apps.get_model('studio_suite', 'Weekday')
+    weekdays = [Weekday.objects.get_or_create(day=day)[0] for day in WEEKDAYS]
+
+    for timeslot in TimeslotManagement.objects.exclude(recurring_weekday_mask=0):
+        timeslot.recurring_weekdays.set(
+            [weekday for i, weekday in enumerate(weekdays) if timeslot.recurring_weekday_mask & (1 << i)]
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('studio_suite', '0030_backfill_timeslotoccurrence'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='timeslotmanagement',
+            name='recurring_weekday_mask',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.RunPython(weekdays_to_mask, mask_to_weekdays),
+        migrations.RemoveField(
+            model_name='timeslotmanagement',
+            name='recurring_weekdays',
+        ),
+        migrations.DeleteModel(
+            name='Weekday',
+        ),
+    ]
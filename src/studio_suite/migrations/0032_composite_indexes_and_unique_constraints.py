@@ -0,0 +1,69 @@
+# Generated by Django 4.2 on 2026-10-17 02:17
+
+from django.db import migrations, models
+from django.db.models import Count, Min
+
+
+def get_duplicates(model, fields):
+    """
+    Groups of rows sharing the same values for fields, with the id of the first row of each group.
+    """
+
+    return model.objects.values(*fields).annotate(first_id=Min('id'), rows=Count('id')).filter(rows__gt=1)
+
+
+def remove_duplicates(apps, schema_editor):
+    """
+    Make existing rows satisfy the new unique constraints.
+
+    Duplicate member relationships are removed (keeping the first). Duplicate kiln and range
+    names are renamed instead, deleting them would cascade to their kilns, timeslots and bookings.
+    """
+
+    MemberStudioRelationship = apps.get_model('studio_suite', 'MemberStudioRelationship')
+    KilnRange = apps.get_model('studio_suite', 'KilnRange')
+    KilnManagement = apps.get_model('studio_suite', 'KilnManagement')
+
+    for duplicate in get_duplicates(MemberStudioRelationship, ['member', 'studio']):
+        MemberStudioRelationship.objects.filter(
+            member=duplicate['member'],
+            studio=duplicate['studio'],
+        ).exclude(id=duplicate['first_id']).delete()
+
+    for model, name_field in [(KilnRange, 'range_name'), (KilnManagement, 'kiln_name')]:
+        for duplicate in get_duplicates(model, ['studio', name_field]):
+            renamed = model.objects.filter(
+                studio=duplicate['studio'],
+                **{name_field: duplicate[name_field]},
+            ).exclude(id=duplicate['first_id'])
+
+            for row in renamed:
+                setattr(row, name_field, f"{duplicate[name_field][:90]} ({row.id})")
+                row.save(update_fields=[name_field])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('studio_suite', '0031_timeslotmanagement_recurring_weekday_mask'),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_duplicates, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='timeslotmanagement',
+            index=models.Index(fields=['studio', 'kiln'], name='timeslot_studio_kiln_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='kilnmanagement',
+            constraint=models.UniqueConstraint(fields=('studio', 'kiln_name'), name='unique_studio_kiln_name'),
+        ),
+        migrations.AddConstraint(
+            model_name='kilnrange',
+            constraint=models.UniqueConstraint(fields=('studio', 'range_name'), name='unique_studio_range_name'),
+        ),
+        migrations.AddConstraint(
+            model_name='memberstudiorelationship',
+            constraint=models.UniqueConstraint(fields=('member', 'studio'), name='unique_member_studio'),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 4.2 on 2026-10-17 02:53
+
+import django.core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('studio_suite', '0032_composite_indexes_and_unique_constraints'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='studioinfo',
+            name='availability_window',
+            field=models.PositiveSmallIntegerField(default=7, validators=[django.core.validators.MinValueValidator(1), django.core.validators.MaxValueValidator(31)]),
+        ),
+        migrations.AddField(
+            model_name='studioinfo',
+            name='booking_horizon',
+            field=models.PositiveSmallIntegerField(default=90, validators=[django.core.validators.MinValueValidator(1)]),
+        ),
+    ]
@@ -3,10 +3,13 @@ Database models related only to studio_suite, this is everything explicitly
 focused on managing a studio and the objects related to a studio.
 """
 
+from django.core.validators import MaxValueValidator, MinValueValidator
 from django.db import models
 from django.contrib.auth.models import User
 import uuid
 
+MAX_AVAILABILITY_WINDOW = 31  # Days a booking page shows at most, keeping its render cost bounded.
+
 class StudioInfo(models.Model):
     """
     Description:
@@ -20,6 +23,8 @@ class StudioInfo(models.Model):
         name: Public studio name
         bio: Studio description/slogan
         new_member_role: Sets the role of new members based on studio preferences
+        availability_window: Days of availability members see at once on the booking page
+        booking_horizon: Days from today members can book, paged through availability_window days at a time
 
     Note:
         Although odds of duplicate uuids is astronomically low, this function gaurentees that
@@ -69,6 +74,11 @@ class StudioInfo(models.Model):
     timezone = models.CharField(max_length=3, default="", choices=TIMEZONE_CHOICES)
     currency = models.CharField(max_length=3, default="", choices=CURRENCY_CHOICES)    
     new_member_role = models.CharField(max_length=2, choices=NEW_MEMBER_ROLES)
+    availability_window = models.PositiveSmallIntegerField(
+        default=7,
+        validators=[MinValueValidator(1), MaxValueValidator(MAX_AVAILABILITY_WINDOW)],
+    )
+    booking_horizon = models.PositiveSmallIntegerField(default=90, validators=[MinValueValidator(1)])
 
     def save(self, *args, **kwargs):
         """
@@ -83,6 +93,19 @@ class StudioInfo(models.Model):
         # Otherwise use the regular record save function.
         super().save(*args, **kwargs)
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """
+        Description:
+            Remembers the url_extension the studio was loaded with, its cached copy is keyed by it
+            and must be dropped when the url_extension changes (see studio_suite.signals).
+        """
+
+        instance = super().from_db(db, field_names, values)
+        instance.loaded_url_extension = instance.__dict__.get('url_extension')
+
+        return instance
+
     def generate_unique_uuid(self):
         """
         Description:
@@ -126,10 +149,19 @@ class MemberStudioRelationship(models.Model):
         ('MANAGER', 'Studio Manager'),
     ]
 
+    # Roles ordered by access level, a member can book timeslots requiring their rank or lower.
+    ROLE_RANKS = {role: rank for rank, (role, _) in enumerate(MEMBER_ROLE_CHOICES)}
+
     member = models.ForeignKey(User, on_delete=models.CASCADE)
     studio = models.ForeignKey(StudioInfo, on_delete=models.CASCADE)
     member_role = models.CharField(max_length=7, choices=MEMBER_ROLE_CHOICES)
 
+    class Meta:
+        constraints = [
+            # A member has a single relationship (and role) per studio, also indexes (member, studio) lookups.
+            models.UniqueConstraint(fields=['member', 'studio'], name='unique_member_studio'),
+        ]
+
     def __str__(self):
         """
         Description:
@@ -145,6 +177,19 @@ class MemberStudioRelationship(models.Model):
         """
         return self.member_role
 
+    @classmethod
+    def get_role_rank_expression(cls, field_name: str):
+        """
+        Description:
+            Case/When expression ranking a role field (see ROLE_RANKS) in the database,
+            so role comparisons can be filtered on in SQL.
+        """
+
+        return models.Case(
+            *[models.When(**{field_name: role}, then=models.Value(rank)) for role, rank in cls.ROLE_RANKS.items()],
+            output_field=models.IntegerField(),
+        )
+
 
 
 class KilnRange(models.Model):
@@ -180,6 +225,11 @@ class KilnRange(models.Model):
     min_temp = models.CharField(max_length=100, choices=TEMP_CHOICES)
     max_temp = models.CharField(max_length=100, choices=TEMP_CHOICES)
 
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['studio', 'range_name'], name='unique_studio_range_name'),
+        ]
+
     def __str__(self):
         """
         Description:
@@ -215,6 +265,10 @@ class KilnManagement(models.Model):
     kiln_max_temp = models.CharField(max_length=100, choices=KilnRange.TEMP_CHOICES)
     kiln_range = models.ForeignKey('KilnRange', on_delete=models.CASCADE, null=True, blank=True)
 
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['studio', 'kiln_name'], name='unique_studio_kiln_name'),
+        ]
 
     def __str__(self):
         """
@@ -225,6 +279,36 @@ class KilnManagement(models.Model):
 
 
 
+class TimeslotManagementQuerySet(models.QuerySet):
+    """
+    Description:
+        Custom queryset methods for TimeslotManagement.
+    """
+
+    def on_weekday(self, weekday: int):
+        """
+        Description:
+            Filters to timeslots whose recurring weekday mask includes a weekday (date.weekday() value),
+            using a bitwise and in the database.
+        """
+
+        return self.alias(
+            weekday_bit=models.F('recurring_weekday_mask').bitand(1 << weekday),
+        ).filter(weekday_bit__gt=0)
+
+    def bookable_by(self, member_role: str):
+        """
+        Description:
+            Filters to timeslots a member role may book, comparing role ranks in the database.
+            Roles without a rank (eg: users who are not members) can book nothing.
+        """
+
+        return self.alias(
+            min_role_rank=MemberStudioRelationship.get_role_rank_expression('min_role_required'),
+        ).filter(min_role_rank__lte=MemberStudioRelationship.ROLE_RANKS.get(member_role, -1))
+
+
+
 class TimeslotManagement(models.Model):
     """
     Description:
@@ -239,8 +323,10 @@ class TimeslotManagement(models.Model):
             - Temporarily: Has start and end_date and repeats weekly
             - Forever: Has start daten and repreats weekly forever
         recurrence_frequency: how often the timeslot repeats
-        recurring_weekdays:
+        recurring_weekday_mask:
             - If recurring: Which weekly days does this apply to
+            - 7-bit mask, bit n is set when the timeslot occurs on date.weekday() == n
+              (Monday is bit 0, Sunday is bit 6)
         start_date:
             - First day this rule applys to
             - If recurring: start_date must be one of the recurring weekdays
@@ -249,6 +335,8 @@ class TimeslotManagement(models.Model):
             - If recurring: end_date must be one of the recurring weekdays
         load_after_time: Latest time the kiln will be loaded that day
         notes: A field for studios to add additional info about the timeslot.
+        occurrences_generated_until (server managed):
+            - Last date TimeslotOccurrence rows have been materialized through
 
         TODO:
         recurrence_frequency can be deleted, artificate from when monthly recurrence existed
@@ -290,46 +378,50 @@ class TimeslotManagement(models.Model):
         null=True,
         blank=True,
     )
-    recurring_weekdays = models.ManyToManyField(
-        'Weekday',
-        blank=True,
-    )
+    recurring_weekday_mask = models.PositiveSmallIntegerField(default=0)
     start_date = models.DateField() #For single day timeslots, stores the bookable date.
     end_date = models.DateField(null=True, blank=True)
     load_after_time = models.TimeField()
     notes = models.TextField(max_length=100, null=True, blank=True)
+    occurrences_generated_until = models.DateField(null=True, blank=True, editable=False)
 
+    objects = TimeslotManagementQuerySet.as_manager()
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['studio', 'kiln'], name='timeslot_studio_kiln_idx'),
+        ]
 
-class Weekday(models.Model):
-    """
-    Description:
-        Database model to store the selectable day options for TimeslotManagement.
-        This treats weekdays as objects that can be linked to the studio.
-        This is also why we have a database table of just weekday names.
-    
-    Collects:
-        day (admin panel managed on setup):  
+    @classmethod
+    def get_weekday_mask(cls, weekday_names):
+        """
+        Description:
+            Converts weekday names (eg: ['Monday', 'Friday']) into a recurring weekday mask.
+        """
 
-    TODO:
-    Currently when the application relaunches, these need to be manually associated
-    with the table through the admin panel. I want the app to be able to check
-    if these exists whenever it starts and if they dont, then automatically fill the
-    table.
-    """
+        weekday_bits = {day: 1 << i for i, (day, _) in enumerate(cls.DAYS_OF_WEEK_CHOICES)}
 
-    day = models.CharField(
-        max_length=10,
-        choices=TimeslotManagement.DAYS_OF_WEEK_CHOICES,
-        unique=True,
-    )
+        mask = 0
+        for weekday_name in weekday_names:
+            mask |= weekday_bits[weekday_name]
 
-    def __str__(self):
+        return mask
+
+    def occurs_on_weekday(self, weekday: int):
         """
         Description:
-            When a day object is referenced, return the weekday display name.   
+            Checks if the recurring weekday mask includes a weekday (date.weekday() value).
         """
-        return self.get_day_display()
+
+        return bool(self.recurring_weekday_mask & (1 << weekday))
+
+    def get_recurring_weekdays(self):
+        """
+        Description:
+            Returns the names of the recurring weekdays, Monday first.
+        """
+
+        return [day for i, (day, _) in enumerate(self.DAYS_OF_WEEK_CHOICES) if self.occurs_on_weekday(i)]
 
 
 
@@ -357,3 +449,63 @@ class TimeslotBlackout(models.Model):
     blackout_start_datetime = models.DateTimeField()
     blackout_end_datetime = models.DateTimeField()
     blackout_reason = models.TextField(max_length=100, null=True, blank=True)
+
+
+
+class TimeslotOccurrenceQuerySet(models.QuerySet):
+    """
+    Description:
+        Custom queryset methods for TimeslotOccurrence.
+    """
+
+    def bookable_by(self, member_role: str):
+        """
+        Description:
+            Filters to occurrences of timeslots a member role may book, see TimeslotManagementQuerySet.bookable_by.
+        """
+
+        return self.alias(
+            min_role_rank=MemberStudioRelationship.get_role_rank_expression('timeslot__min_role_required'),
+        ).filter(min_role_rank__lte=MemberStudioRelationship.ROLE_RANKS.get(member_role, -1))
+
+
+
+class TimeslotOccurrence(models.Model):
+    """
+    Description:
+        Materialized concrete kiln loads of a TimeslotManagement rule, one row per day the
+        rule applies to. Rules are expanded when they are created and rolled forward by the
+        roll_timeslot_occurrences job, so the booking page can read a single date range
+        instead of re-expanding every recurrence rule on each request.
+
+    Collects:
+        studio (server managed): StudioInfo object of the studio that owns the timeslot
+        kiln (server managed): KilnManagement object the timeslot is for
+        timeslot (server managed): TimeslotManagement rule this occurrence was expanded from
+        occurrence_date (server managed): Day the kiln is loaded
+        load_after_time (server managed): Copy of the timeslots load_after_time
+    """
+
+    studio = models.ForeignKey(StudioInfo, on_delete=models.CASCADE)
+    kiln = models.ForeignKey(KilnManagement, on_delete=models.CASCADE)
+    timeslot = models.ForeignKey(TimeslotManagement, on_delete=models.CASCADE, related_name='occurrences')
+    occurrence_date = models.DateField()
+    load_after_time = models.TimeField()
+
+    objects = TimeslotOccurrenceQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['studio', 'occurrence_date'], name='occurrence_studio_date_idx'),
+            models.Index(fields=['kiln', 'occurrence_date'], name='occurrence_kiln_date_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=['timeslot', 'occurrence_date'], name='unique_timeslot_occurrence'),
+        ]
+
+    def __str__(self):
+        """
+        Description:
+            When an occurrence is referenced, return its timeslot and load datetime.
+        """
+        return f"Timeslot {self.timeslot_id} on {self.occurrence_date} at {self.load_after_time}"
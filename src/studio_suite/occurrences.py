@@ -0,0 +1,151 @@
+"""
+Materialization of TimeslotManagement rules into concrete TimeslotOccurrence rows.
+
+A timeslot rule is expanded once when it is created and then rolled forward by the
+roll_timeslot_occurrences job, or by an availability build reaching past its last
+roll forward (see member_suite.availability.AvailabilityBuilder.build), so readers
+only ever run an indexed date range query against TimeslotOccurrence instead of
+re-expanding recurrence rules per request.
+"""
+
+from datetime import date, timedelta
+from django.conf import settings
+from django.db.models import F, Q
+from django.utils import timezone
+from .models import TimeslotManagement, TimeslotOccurrence
+from .versioning import bump_studio_version_on_commit
+
+# Number of days past today that occurrences are kept materialized for.
+OCCURRENCE_HORIZON_DAYS = getattr(settings, 'TIMESLOT_OCCURRENCE_HORIZON_DAYS', 120)
+
+
+def get_horizon_date(today: date = None):
+    """
+    Description:
+        Last date occurrences should be materialized through.
+    """
+
+    today = today or timezone.localdate()
+    return today + timedelta(days=OCCURRENCE_HORIZON_DAYS)
+
+
+def occurrence_dates(timeslot: TimeslotManagement, window_start: date, window_end: date):
+    """
+    Description:
+        Expands a timeslot rule into the concrete days it applies to within a window.
+
+    Returns:
+        list: Dates (inclusive of window_start and window_end) the timeslot occurs on.
+    """
+
+    # Never recurring timeslots only occur on their start date.
+    if not timeslot.is_recurring:
+        if window_start <= timeslot.start_date <= window_end:
+            return [timeslot.start_date]
+        return []
+
+    first_day = max(window_start, timeslot.start_date)
+    last_day = min(window_end, timeslot.end_date) if timeslot.end_date else window_end
+
+    dates = []
+    day = first_day
+    while day <= last_day:
+        if timeslot.occurs_on_weekday(day.weekday()):
+            dates.append(day)
+        day += timedelta(days=1)
+
+    return dates
+
+
+def generate_occurrences(timeslot: TimeslotManagement, until: date = None):
+    """
+    Description:
+        Materializes the occurrences of a timeslot that have not been generated yet,
+        from its start date (or the last generated date) through until.
+
+    Returns:
+        int: Number of occurrences created.
+    """
+
+    until = until or get_horizon_date()
+    generated_until = timeslot.occurrences_generated_until
+
+    # Single day timeslots are always materialized in full, however far out they are.
+    if not timeslot.is_recurring:
+        until = max(until, timeslot.start_date)
+
+    if generated_until and generated_until >= until:
+        return 0
+
+    window_start = generated_until + timedelta(days=1) if generated_until else timeslot.start_date
+
+    occurrences = [
+        TimeslotOccurrence(
+            studio_id=timeslot.studio_id,
+            kiln_id=timeslot.kiln_id,
+            timeslot=timeslot,
+            occurrence_date=day,
+            load_after_time=timeslot.load_after_time,
+        )
+        for day in occurrence_dates(timeslot, window_start, until)
+    ]
+    TimeslotOccurrence.objects.bulk_create(occurrences, ignore_conflicts=True)
+
+    timeslot.occurrences_generated_until = until
+    TimeslotManagement.objects.filter(pk=timeslot.pk).update(occurrences_generated_until=until)
+
+    return len(occurrences)
+
+
+def regenerate_occurrences(timeslot: TimeslotManagement, until: date = None):
+    """
+    Description:
+        Drops and re-expands every occurrence of a timeslot, used when the rule itself changes.
+
+    Returns:
+        int: Number of occurrences created.
+    """
+
+    TimeslotOccurrence.objects.filter(timeslot=timeslot).delete()
+    timeslot.occurrences_generated_until = None
+
+    return generate_occurrences(timeslot, until)
+
+
+def roll_forward_occurrences(until: date = None, queryset=None):
+    """
+    Description:
+        Extends the materialized occurrences of every timeslot that has not been
+        generated through until yet. Rules that ended before their last generated
+        date are skipped. Studios that got new occurrences have their version bumped,
+        so availability cached without them is rebuilt.
+
+    Returns:
+        int: Number of occurrences created.
+    """
+
+    until = until or get_horizon_date()
+    queryset = queryset if queryset is not None else TimeslotManagement.objects.all()
+
+    stale_timeslots = queryset.filter(
+        Q(occurrences_generated_until__isnull=True) | Q(occurrences_generated_until__lt=until)
+    ).exclude(
+        end_date__isnull=False,
+        occurrences_generated_until__gte=F('end_date'),
+    ).exclude(
+        is_recurring=0,
+        occurrences_generated_until__isnull=False,
+    )
+
+    created = 0
+    changed_studio_ids = set()
+    for timeslot in stale_timeslots.iterator(chunk_size=500):
+        timeslot_created = generate_occurrences(timeslot, until)
+        if timeslot_created:
+            created += timeslot_created
+            changed_studio_ids.add(timeslot.studio_id)
+
+    for studio_id in changed_studio_ids:
+        bump_studio_version_on_commit(studio_id)
+
+    return created
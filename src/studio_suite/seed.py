@@ -0,0 +1,320 @@
+"""
+Synthetic studio data for load testing and benchmarks.
+
+StudioSeeder bulk-creates studios with kilns, kiln ranges, recurring and one-off timeslots
+(with their materialized occurrences), members with mixed roles and bookings. Every row is
+derived from a seeded random generator, so the same sizes and seed always produce the same data.
+"""
+
+import random
+import uuid
+from datetime import datetime, time, timedelta
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.utils import timezone
+from member_suite.models import BookingManagement
+from .models import (
+    StudioInfo,
+    MemberStudioRelationship,
+    KilnRange,
+    KilnManagement,
+    TimeslotManagement,
+    TimeslotOccurrence,
+)
+from .occurrences import get_horizon_date, occurrence_dates
+
+BATCH_SIZE = 1000
+SEED_PASSWORD = 'seed-password'  # Password of every seeded user, so seeded accounts can log in.
+
+# Relative weight of each member role among seeded members.
+MEMBER_ROLE_WEIGHTS = {'NA': 1, 'RM': 14, 'TECH': 3, 'MANAGER': 2}
+
+# Relative weight of never, temporarily and forever recurring timeslots.
+RECURRING_WEIGHTS = {0: 3, 1: 2, 2: 5}
+
+
+class StudioSeeder:
+    """
+    Description:
+        Bulk-creates synthetic studios and everything they own.
+
+    Collects:
+        studios: Number of studios to create
+        kilns: Kilns (and kiln ranges) per studio
+        timeslots: Timeslot rules per studio
+        members: Members per studio
+        bookings: Bookings per studio, taken from the occurrences of the next booking_days
+        prefix: Prefix of every seeded username, url_extension and studio name
+        seed: Random seed
+        booking_days: Number of days from today that bookings are spread over
+        unplaced_bookings: Bookings that did not fit the occurrences of their studio, see create_bookings
+    """
+
+    weekday_names = [day for day, _ in TimeslotManagement.DAYS_OF_WEEK_CHOICES]
+
+    def __init__(self, studios=10, kilns=10, timeslots=100, members=100, bookings=1000,
+                 prefix='seed', seed=1, booking_days=90):
+        self.studio_count = studios
+        self.kiln_count = kilns
+        self.timeslot_count = timeslots
+        self.member_count = members
+        self.booking_count = bookings
+        self.prefix = prefix
+        self.rng = random.Random(seed)
+        self.booking_days = booking_days
+        self.today = timezone.localdate()
+        self.password = make_password(SEED_PASSWORD)  # Hashed once, hashing per user dominates the runtime.
+        self.counts = {}
+        self.unplaced_bookings = 0
+
+    def seed(self):
+        """
+        Description:
+            Creates every studio and its related rows.
+
+        Returns:
+            list: The created StudioInfo objects.
+        """
+
+        owners = self.create_users('owner', self.studio_count)
+        studios = self.bulk_create(StudioInfo, [
+            StudioInfo(
+                uuid=uuid.uuid5(uuid.NAMESPACE_URL, f'{self.prefix}-studio-{i}'),  # Unique per prefix.
+                linked_account=owner,
+                url_extension=f'{self.prefix}-studio-{i}',
+                name=f'{self.prefix} Studio {i}'[:50],
+                bio='Synthetic studio for load testing.',
+                new_member_role='RM',
+            )
+            for i, owner in enumerate(owners)
+        ])
+
+        members = self.create_members(studios)
+        kilns = self.create_kilns(studios)
+        timeslots = self.create_timeslots(studios, kilns)
+        occurrences = self.create_occurrences(timeslots)
+        self.create_bookings(members, occurrences)
+
+        return studios
+
+    def bulk_create(self, model, objects):
+        """
+        Description:
+            Bulk-creates objects in batches and counts them per model.
+        """
+
+        created = model.objects.bulk_create(objects, batch_size=BATCH_SIZE)
+        self.counts[model.__name__] = self.counts.get(model.__name__, 0) + len(created)
+
+        return created
+
+    def create_users(self, kind, count, studio_number=None):
+        """
+        Description:
+            Creates seeded users sharing the seed password.
+        """
+
+        name = f'{self.prefix}-{kind}' if studio_number is None else f'{self.prefix}-{studio_number}-{kind}'
+
+        return self.bulk_create(User, [
+            User(username=f'{name}-{i}', email=f'{name}-{i}@example.com', password=self.password)
+            for i in range(count)
+        ])
+
+    def create_members(self, studios):
+        """
+        Description:
+            Creates the members of each studio with randomly weighted roles.
+
+        Returns:
+            dict: Studio uuid to a list of (member, member_role) tuples.
+        """
+
+        roles = list(MEMBER_ROLE_WEIGHTS)
+        weights = list(MEMBER_ROLE_WEIGHTS.values())
+
+        studio_members = {}
+        relationships = []
+        for i, studio in enumerate(studios):
+            members = self.create_users('member', self.member_count, studio_number=i)
+            member_roles = self.rng.choices(roles, weights, k=len(members))
+            studio_members[studio.pk] = list(zip(members, member_roles))
+
+            relationships += [
+                MemberStudioRelationship(member=member, studio=studio, member_role=member_role)
+                for member, member_role in studio_members[studio.pk]
+            ]
+
+        self.bulk_create(MemberStudioRelationship, relationships)
+
+        return studio_members
+
+    def create_kilns(self, studios):
+        """
+        Description:
+            Creates the kiln ranges and kilns of each studio, every kiln uses one of the ranges.
+
+        Returns:
+            dict: Studio uuid to a list of its kilns.
+        """
+
+        temperatures = [temperature for temperature, _ in KilnRange.TEMP_CHOICES]
+
+        kiln_ranges = self.bulk_create(KilnRange, [
+            KilnRange(
+                studio=studio,
+                range_name=f'Range {i}',
+                min_temp=temperatures[i % 5],
+                max_temp=temperatures[5 + i % 5],
+            )
+            for studio in studios
+            for i in range(self.kiln_count)
+        ])
+
+        kilns = self.bulk_create(KilnManagement, [
+            KilnManagement(
+                studio=kiln_range.studio,
+                kiln_name=f'Kiln {i % self.kiln_count}',
+                kiln_make='Skutt',
+                kiln_model='KM-1027',
+                kiln_size='Large',
+                kiln_max_temp=kiln_range.max_temp,
+                kiln_range=kiln_range,
+            )
+            for i, kiln_range in enumerate(kiln_ranges)
+        ])
+
+        studio_kilns = {}
+        for kiln in kilns:
+            studio_kilns.setdefault(kiln.studio_id, []).append(kiln)
+
+        return studio_kilns
+
+    def get_timeslot(self, studio, kiln):
+        """
+        Description:
+            Builds a random timeslot rule, recurring rules start (and end) on one of their weekdays.
+        """
+
+        is_recurring = self.rng.choices(list(RECURRING_WEIGHTS), list(RECURRING_WEIGHTS.values()))[0]
+        start_date = self.today + timedelta(days=self.rng.randrange(self.booking_days))
+        timeslot = TimeslotManagement(
+            studio=studio,
+            kiln=kiln,
+            min_role_required=self.rng.choices(['RM', 'TECH', 'MANAGER'], [8, 1, 1])[0],
+            is_recurring=is_recurring,
+            start_date=start_date,
+            load_after_time=time(hour=self.rng.randrange(24), minute=self.rng.choice([0, 15, 30, 45])),
+        )
+
+        if is_recurring:
+            weekdays = self.rng.sample(range(7), self.rng.randint(1, 4))
+            timeslot.recurrence_frequency = 'weekly'
+            timeslot.recurring_weekday_mask = TimeslotManagement.get_weekday_mask(
+                [self.weekday_names[weekday] for weekday in weekdays]
+            )
+            timeslot.start_date = self.get_nearest_weekday(timeslot, start_date, timedelta(days=1))
+
+        if is_recurring == 1:
+            end_date = timeslot.start_date + timedelta(weeks=self.rng.randint(2, 12))
+            timeslot.end_date = self.get_nearest_weekday(timeslot, end_date, timedelta(days=-1))
+
+        return timeslot
+
+    def get_nearest_weekday(self, timeslot, day, step):
+        """
+        Description:
+            First day (stepping forwards or backwards from day) on one of the timeslots recurring weekdays.
+        """
+
+        while not timeslot.occurs_on_weekday(day.weekday()):
+            day += step
+
+        return day
+
+    def create_timeslots(self, studios, kilns):
+        """
+        Description:
+            Creates the never, temporarily and forever recurring timeslots of each studio.
+        """
+
+        return self.bulk_create(TimeslotManagement, [
+            self.get_timeslot(studio, self.rng.choice(kilns[studio.pk]))
+            for studio in studios
+            for _ in range(self.timeslot_count)
+        ])
+
+    def create_occurrences(self, timeslots):
+        """
+        Description:
+            Materializes the occurrences of the seeded timeslots through the occurrence horizon,
+            the same rows generate_occurrences would create.
+
+        Returns:
+            list: The created TimeslotOccurrence objects.
+        """
+
+        horizon_date = get_horizon_date(self.today)
+
+        occurrences = []
+        for timeslot in timeslots:
+            until = horizon_date if timeslot.is_recurring else max(horizon_date, timeslot.start_date)
+            timeslot.occurrences_generated_until = until
+
+            occurrences += [
+                TimeslotOccurrence(
+                    studio_id=timeslot.studio_id,
+                    kiln_id=timeslot.kiln_id,
+                    timeslot=timeslot,
+                    occurrence_date=day,
+                    load_after_time=timeslot.load_after_time,
+                )
+                for day in occurrence_dates(timeslot, timeslot.start_date, until)
+            ]
+
+        TimeslotManagement.objects.bulk_update(timeslots, ['occurrences_generated_until'], batch_size=BATCH_SIZE)
+
+        return self.bulk_create(TimeslotOccurrence, occurrences)
+
+    def create_bookings(self, members, occurrences):
+        """
+        Description:
+            Books random occurrences within the booking days, each by a member whose role
+            allows booking the timeslot. Every occurrence is booked at most once, so a studio
+            gets fewer bookings when it has fewer occurrences, counted in unplaced_bookings.
+        """
+
+        booking_end = self.today + timedelta(days=self.booking_days)
+
+        studio_occurrences = {}
+        for occurrence in occurrences:
+            if occurrence.occurrence_date < booking_end:
+                studio_occurrences.setdefault(occurrence.studio_id, []).append(occurrence)
+
+        bookings = []
+        for studio_id, bookable in studio_occurrences.items():
+            # Members allowed to book each min_role_required.
+            eligible_members = {
+                role: [
+                    member for member, member_role in members[studio_id]
+                    if MemberStudioRelationship.ROLE_RANKS[member_role] >= rank
+                ]
+                for role, rank in MemberStudioRelationship.ROLE_RANKS.items()
+            }
+
+            for occurrence in self.rng.sample(bookable, min(self.booking_count, len(bookable))):
+                eligible = eligible_members[occurrence.timeslot.min_role_required]
+
+                if eligible:
+                    bookings.append(BookingManagement(
+                        studio_id=studio_id,
+                        member=self.rng.choice(eligible),
+                        timeslot=occurrence.timeslot,
+                        booking_date=timezone.make_aware(
+                            datetime.combine(occurrence.occurrence_date, occurrence.load_after_time)
+                        ),
+                    ))
+
+        self.unplaced_bookings = self.booking_count * len(members) - len(bookings)
+
+        return self.bulk_create(BookingManagement, bookings)
@@ -0,0 +1,57 @@
+"""
+Signal receivers for the studio_suite, keeping cached studio data in sync with the database.
+"""
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from app.studio_access import get_member_role_cache_key, get_studio_cache_key
+from member_suite.changes import record_reset
+from .models import KilnManagement, KilnRange, MemberStudioRelationship, StudioInfo, TimeslotManagement
+from .versioning import bump_studio_version_on_commit
+
+
+@receiver([post_save, post_delete], sender=StudioInfo)
+def invalidate_cached_studio(sender, instance, **kwargs):
+    """
+    Description:
+        Drops the cached studio when it is updated or deleted, under its current url_extension and
+        the one it was loaded with (see StudioInfo.from_db). It is dropped again once the change
+        has committed, a concurrent request may have cached the old row in between.
+    """
+
+    url_extensions = {instance.url_extension, getattr(instance, 'loaded_url_extension', None)} - {None}
+    cache_keys = [get_studio_cache_key(url_extension) for url_extension in url_extensions]
+    instance.loaded_url_extension = instance.url_extension
+
+    cache.delete_many(cache_keys)
+    transaction.on_commit(lambda: cache.delete_many(cache_keys), robust=True)
+    bump_studio_version_on_commit(instance.pk)
+
+
+@receiver([post_save, post_delete], sender=MemberStudioRelationship)
+def invalidate_cached_member_role(sender, instance, **kwargs):
+    """
+    Description:
+        Drops a members cached role when their studio relationship changes, who can access
+        the studio changed so a reset is logged as well. The role is dropped again once the
+        change has committed, see invalidate_cached_studio.
+    """
+    cache_key = get_member_role_cache_key(instance.studio_id, instance.member_id)
+    cache.delete(cache_key)
+    transaction.on_commit(lambda: cache.delete(cache_key), robust=True)
+    record_reset(instance.studio_id)
+
+
+@receiver([post_save, post_delete], sender=TimeslotManagement)
+@receiver([post_save, post_delete], sender=KilnManagement)
+@receiver([post_save, post_delete], sender=KilnRange)
+def bump_version_on_schedule_change(sender, instance, **kwargs):
+    """
+    Description:
+        Logs a reset, bumping the studio version, when one of its timeslots, kilns or kiln
+        ranges changes, which may change any of its slots (see member_suite.changes).
+    """
+
+    record_reset(instance.studio_id)
@@ -0,0 +1,91 @@
+"""
+Shared helpers for the view query-count and latency regression tests.
+
+ViewBudgetTestCase seeds a small and a large studio (see StudioSeeder) and asserts a view
+runs the same number of queries within the same wall-clock budget at both scales, so an
+N+1 query shows up as a failing test instead of a slow page.
+"""
+
+import time
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from .models import MemberStudioRelationship
+from .seed import StudioSeeder
+
+TEST_CACHES = {
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+    'sessions': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'sessions'},
+}
+TEST_PASSWORD_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']
+
+# Sizes of the seeded studio at each scale, the large scale has 10-20x the rows of the small one.
+SCALES = {
+    'small': {'kilns': 2, 'timeslots': 10, 'members': 10, 'bookings': 20},
+    'large': {'kilns': 20, 'timeslots': 200, 'members': 200, 'bookings': 2000},
+}
+
+
+@override_settings(CACHES=TEST_CACHES, PASSWORD_HASHERS=TEST_PASSWORD_HASHERS)
+class ViewBudgetTestCase(TestCase):
+    """
+    Description:
+        Base test case seeding a studio per scale.
+
+    Collects:
+        scales: Scale name to a dict of the seeded studio, its owner and a member with the
+        MANAGER role (who can book every timeslot)
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.scales = {}
+
+        for scale, sizes in SCALES.items():
+            studio = StudioSeeder(studios=1, prefix=scale, **sizes).seed()[0]
+            manager = User.objects.create_user(username=f'{scale}-manager', email=f'{scale}-manager@example.com')
+            MemberStudioRelationship.objects.create(member=manager, studio=studio, member_role='MANAGER')
+
+            cls.scales[scale] = {'studio': studio, 'owner': studio.linked_account, 'member': manager}
+
+    def setUp(self):
+        cache.clear()
+
+    def assertViewBudget(self, url, num_queries, seconds, user=None, method='get', data=None, status_code=200, warm=True):
+        """
+        Description:
+            Requests a url and asserts the number of queries, the wall-clock time and the status code.
+            Warm requests are measured after one unmeasured request, so the studio cache is populated.
+
+        Returns:
+            The measured response.
+        """
+
+        if user is not None:
+            self.client.force_login(user)
+
+        request = getattr(self.client, method)
+        if warm:
+            request(url, data)
+
+        with self.assertNumQueries(num_queries):
+            start = time.perf_counter()
+            response = request(url, data)
+            elapsed = time.perf_counter() - start
+
+        self.assertEqual(response.status_code, status_code)
+        self.assertLess(elapsed, seconds, f'{url} took {elapsed:.3f} s, the budget is {seconds} s.')
+
+        return response
+
+    def assertViewBudgetAtEachScale(self, get_url, num_queries, seconds, get_user=None, **kwargs):
+        """
+        Description:
+            Runs assertViewBudget against the studio of every scale, the query count must not grow with the data.
+        """
+
+        for scale, seeded in self.scales.items():
+            with self.subTest(scale=scale):
+                self.client.logout()
+                user = get_user(seeded) if get_user else None
+                self.assertViewBudget(get_url(seeded), num_queries, seconds, user=user, **kwargs)
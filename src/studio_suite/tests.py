@@ -9,6 +9,707 @@ Note:
     prior to application launch.
 """
 
-# from django.test import TestCase
+import csv
+import io
+import json
+import re
+import uuid
+from datetime import time, timedelta
+from unittest import mock
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from member_suite.availability import AvailabilityBuilder
+from member_suite.models import BookingManagement
+from .exports import STREAM_BUFFER_SIZE
+from .collisions import COLLISION_MESSAGES, detect_collisions
+from .conflicts import build_conflict_report
+from .forms import TimeslotManagementForm
+from .imports import TimeslotImport
+from .jobs import compute_conflict_report
+from .models import KilnManagement, MemberStudioRelationship, StudioInfo, TimeslotManagement, TimeslotOccurrence
+from .occurrences import generate_occurrences, get_horizon_date, regenerate_occurrences, roll_forward_occurrences
+from .seed import StudioSeeder
+from .testing import TEST_CACHES, ViewBudgetTestCase
+from .versioning import get_studio_version
 
-# Create your tests here.
+
+def get_owner(seeded):
+    return seeded['owner']
+
+
+
+class StudioViewBudgetTests(ViewBudgetTestCase):
+    """
+    Description:
+        Query-count and latency budgets of the studio_suite views, see ViewBudgetTestCase.
+    """
+
+    def get_url(self, name):
+        return lambda seeded: reverse(name, kwargs={'studio_url_extension': seeded['studio'].url_extension})
+
+    def test_timeslot_management_view(self):
+        self.assertViewBudgetAtEachScale(self.get_url('timeslot_management'), 4, 1.0, get_owner)
+
+    def test_kiln_management_view(self):
+        self.assertViewBudgetAtEachScale(self.get_url('kiln_management'), 4, 0.5, get_owner)
+
+    def test_member_management_view(self):
+        self.assertViewBudgetAtEachScale(self.get_url('member_management'), 2, 2.0, get_owner)
+
+    def test_studio_home_view(self):
+        self.assertViewBudgetAtEachScale(self.get_url('studio_home'), 1, 0.25, get_owner)
+
+    def test_unchanged_page_is_not_modified(self):
+        seeded = self.scales['small']
+        url = self.get_url('kiln_management')(seeded)
+        self.client.force_login(seeded['owner'])
+        etag = self.client.get(url)['ETag']
+
+        with self.assertNumQueries(0):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+
+        # A kiln change bumps the studio version.
+        kiln = KilnManagement.objects.filter(studio=seeded['studio']).first()
+        kiln.kiln_make = 'Changed'
+        with self.captureOnCommitCallbacks(execute=True):
+            kiln.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_etag_is_bound_to_the_session(self):
+        seeded = self.scales['small']
+        url = self.get_url('studio_home')(seeded)
+        self.client.force_login(seeded['owner'])
+        etag = self.client.get(url)['ETag']
+
+        # Another session must pass the access checks again, a member of the studio is not its owner.
+        self.client.logout()
+        self.client.force_login(seeded['member'])
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 404)
+
+
+
+class StudioExportTests(ViewBudgetTestCase):
+    """
+    Description:
+        Tests the streamed CSV exports return every row in a constant number of queries.
+    """
+
+    def get_export(self, export_name, scale='large', user=None):
+        seeded = self.scales[scale]
+        self.client.force_login(user or seeded['owner'])
+
+        return self.client.get(reverse('studio_export', kwargs={
+            'export_name': export_name,
+            'studio_url_extension': seeded['studio'].url_extension,
+        }))
+
+    def read_rows(self, response):
+        chunks = list(response.streaming_content)
+        rows = list(csv.reader(io.StringIO(b''.join(chunks).decode())))
+
+        return chunks, rows
+
+    def test_bookings_export(self):
+        studio = self.scales['large']['studio']
+
+        self.read_rows(self.get_export('bookings'))  # Logs in and caches the studio.
+
+        # The session user and a single query for every booking, however many there are.
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('studio_export', kwargs={
+                'export_name': 'bookings',
+                'studio_url_extension': studio.url_extension,
+            }))
+            chunks, rows = self.read_rows(response)
+
+        self.assertEqual(response['Content-Type'], 'text/csv; charset=utf-8')
+        self.assertTrue(response['Content-Disposition'].startswith(f'attachment; filename="{studio.url_extension}-bookings-'))
+        self.assertEqual(rows[0][0], 'Booking ID')
+        self.assertEqual(len(rows) - 1, BookingManagement.objects.filter(studio=studio).count())
+        self.assertGreater(len(chunks), 1)
+        self.assertTrue(all(len(chunk) < STREAM_BUFFER_SIZE * 2 for chunk in chunks))
+
+    def test_timeslots_and_members_exports(self):
+        studio = self.scales['small']['studio']
+        expected_counts = {
+            'timeslots': TimeslotManagement.objects.filter(studio=studio).count(),
+            'members': MemberStudioRelationship.objects.filter(studio=studio).count(),
+        }
+
+        for export_name, expected_count in expected_counts.items():
+            with self.subTest(export_name=export_name):
+                _, rows = self.read_rows(self.get_export(export_name, scale='small'))
+                self.assertEqual(len(rows) - 1, expected_count)
+
+    def test_escapes_formulas(self):
+        seeded = self.scales['small']
+        MemberStudioRelationship.objects.filter(member=seeded['member']).update(member_role='RM')
+        seeded['member'].username = '=HYPERLINK("http://example.com")'
+        seeded['member'].save()
+
+        _, rows = self.read_rows(self.get_export('members', scale='small'))
+
+        self.assertIn(['\'=HYPERLINK("http://example.com")', seeded['member'].email, 'Regular Member'], [row[:3] for row in rows])
+
+    def test_unknown_export_and_non_owner(self):
+        self.assertEqual(self.get_export('payments').status_code, 404)
+        self.assertEqual(self.get_export('bookings', user=self.scales['large']['member']).status_code, 404)
+
+
+
+@override_settings(CACHES=TEST_CACHES)
+class TimeslotImportTests(TestCase):
+    """
+    Description:
+        Tests the bulk timeslot import rejects invalid rows and rows colliding with saved
+        timeslots or earlier rows of the batch, and saves the rest.
+    """
+
+    def setUp(self):
+        self.owner = User.objects.create_user(username='owner', email='owner@example.com')
+        self.studio = StudioInfo.objects.create(
+            linked_account=self.owner, url_extension='test-studio', name='Test Studio', bio='', new_member_role='RM',
+        )
+        self.kiln = KilnManagement.objects.create(
+            studio=self.studio, kiln_name='Big Kiln', kiln_make='Make', kiln_model='Model', kiln_size='Large', kiln_max_temp='Cone 10',
+        )
+
+        # A monday at least a week out.
+        today = timezone.localdate()
+        self.monday = today + timedelta(days=7 - today.weekday() + 7)
+
+        self.saved_timeslot = TimeslotManagement.objects.create(
+            studio=self.studio, kiln=self.kiln, min_role_required='RM', is_recurring=0,
+            start_date=self.monday, load_after_time=time(hour=10),
+        )
+        generate_occurrences(self.saved_timeslot)
+
+    def get_row(self, start_date, load_after_time='18:00', kiln='Big Kiln', **kwargs):
+        return {
+            'kiln': kiln,
+            'min_role_required': 'RM',
+            'is_recurring': 0,
+            'start_date': start_date.isoformat(),
+            'load_after_time': load_after_time,
+            **kwargs,
+        }
+
+    def test_check_and_save(self):
+        rows = [
+            self.get_row(self.monday + timedelta(days=3)),  # 1: Free.
+            self.get_row(self.monday, load_after_time='20:00'),  # 2: 10 hours after the saved timeslot.
+            self.get_row(self.monday + timedelta(days=3), kiln='Missing Kiln'),  # 3: Unknown kiln.
+            self.get_row(self.monday + timedelta(days=4), load_after_time='09:00'),  # 4: 15 hours after row 1.
+            self.get_row(  # 5: Every Wednesday for four weeks.
+                self.monday + timedelta(days=2),
+                is_recurring=1,
+                recurrence_frequency='weekly',
+                recurring_weekdays=['Wednesday'],
+                end_date=(self.monday + timedelta(days=23)).isoformat(),
+            ),
+        ]
+
+        timeslot_import = TimeslotImport(self.studio, rows)
+        timeslot_import.check()
+
+        self.assertEqual([row_number for row_number, _ in timeslot_import.accepted], [1, 5])
+        rejected = dict(timeslot_import.rejected)
+        self.assertEqual(list(rejected), [2, 3, 4])
+        self.assertIn(f'timeslot {self.saved_timeslot.id} (Big Kiln)', rejected[2][0])
+        self.assertTrue(rejected[3][0].startswith('kiln: '))
+        self.assertIn('row 1', rejected[4][0])
+
+        created = timeslot_import.save()
+
+        self.assertEqual(TimeslotManagement.objects.filter(studio=self.studio).count(), 3)
+        self.assertEqual(created[1].get_recurring_weekdays(), ['Wednesday'])
+        self.assertEqual(TimeslotOccurrence.objects.filter(timeslot=created[0]).count(), 1)
+        self.assertEqual(TimeslotOccurrence.objects.filter(timeslot=created[1]).count(), 4)
+
+    def test_validate_rows_loads_kilns_once(self):
+        def count_queries(row_count):
+            rows = [self.get_row(self.monday + timedelta(days=day)) for day in range(row_count)]
+            rows.append(self.get_row(self.monday, kiln='Missing Kiln'))
+            with CaptureQueriesContext(connection) as queries:
+                valid_rows = TimeslotImport(self.studio, rows).validate_rows()
+
+            self.assertEqual(len(valid_rows), row_count)
+            self.assertEqual({timeslot.kiln for _, timeslot in valid_rows}, {self.kiln})
+            return len(queries)
+
+        self.assertEqual(count_queries(1), count_queries(20))
+
+    def test_json_upload(self):
+        self.client.force_login(self.owner)
+        url = reverse('timeslot_management', kwargs={'studio_url_extension': self.studio.url_extension})
+        rows = [self.get_row(self.monday + timedelta(days=3)), self.get_row(self.monday)]
+
+        def upload(**data):
+            import_file = SimpleUploadedFile('timeslots.json', json.dumps(rows).encode())
+            return self.client.post(url, {'import_timeslots': '', 'import_file': import_file, **data})
+
+        response = upload(check_only='on')
+        self.assertEqual([row_number for row_number, _ in response.context['import_rejected']], [2])
+        self.assertEqual(TimeslotManagement.objects.filter(studio=self.studio).count(), 1)
+
+        upload()
+        self.assertEqual(TimeslotManagement.objects.filter(studio=self.studio).count(), 2)
+
+    def test_csv_upload(self):
+        self.client.force_login(self.owner)
+        url = reverse('timeslot_management', kwargs={'studio_url_extension': self.studio.url_extension})
+        content = (
+            'kiln,min_role_required,is_recurring,recurrence_frequency,recurring_weekdays,start_date,end_date,load_after_time,notes\n'
+            f'Big Kiln,RM,2,weekly,Tuesday;Thursday,{(self.monday + timedelta(days=1)).isoformat()},,12:00,Glaze firing\n'
+        )
+
+        response = self.client.post(url, {
+            'import_timeslots': '',
+            'import_file': SimpleUploadedFile('timeslots.csv', content.encode()),
+        })
+
+        self.assertEqual(response.status_code, 302)
+        timeslot = TimeslotManagement.objects.get(studio=self.studio, is_recurring=2)
+        self.assertEqual(timeslot.get_recurring_weekdays(), ['Tuesday', 'Thursday'])
+        self.assertTrue(TimeslotOccurrence.objects.filter(timeslot=timeslot).exists())
+
+
+
+@override_settings(CACHES=TEST_CACHES)
+class ConflictReportTests(TestCase):
+    """
+    Description:
+        Tests the studio-wide conflict report and its per-version caching.
+    """
+
+    def setUp(self):
+        self.owner = User.objects.create_user(username='owner', email='owner@example.com')
+        self.studio = StudioInfo.objects.create(
+            linked_account=self.owner, url_extension='test-studio', name='Test Studio', bio='', new_member_role='RM',
+        )
+        self.kiln, self.other_kiln = [
+            KilnManagement.objects.create(
+                studio=self.studio, kiln_name=name, kiln_make='Make', kiln_model='Model', kiln_size='Large', kiln_max_temp='Cone 10',
+            )
+            for name in ['Big Kiln', 'Small Kiln']
+        ]
+
+        today = timezone.localdate()
+        self.monday = today + timedelta(days=7 - today.weekday() + 7)
+
+        # Saved without the submission-time detector, as after a kiln reassignment.
+        self.single = self.create_timeslot(self.kiln, self.monday, time(hour=10))
+        self.close_single = self.create_timeslot(self.kiln, self.monday, time(hour=20))
+        self.other_kiln_single = self.create_timeslot(self.other_kiln, self.monday, time(hour=10))
+        self.recurring = self.create_timeslot(
+            self.kiln, self.monday, time(hour=23), is_recurring=1, end_date=self.monday + timedelta(days=14),
+            recurring_weekday_mask=TimeslotManagement.get_weekday_mask(['Monday']),
+        )
+
+    def create_timeslot(self, kiln, start_date, load_after_time, **kwargs):
+        return TimeslotManagement.objects.create(
+            studio=self.studio, kiln=kiln, min_role_required='RM', start_date=start_date, load_after_time=load_after_time, **kwargs,
+        )
+
+    def test_build_conflict_report(self):
+        report = build_conflict_report(self.studio.pk)
+        pairs = {tuple(timeslot['id'] for timeslot in conflict['timeslots']): conflict for conflict in report}
+
+        self.assertEqual(set(pairs), {
+            (self.close_single.id, self.single.id),
+            (self.recurring.id, self.single.id),
+            (self.recurring.id, self.close_single.id),
+        })
+        self.assertEqual(pairs[(self.recurring.id, self.single.id)]['first_date'], self.monday)
+        self.assertEqual(pairs[(self.recurring.id, self.single.id)]['load_count'], 1)
+        self.assertIn(COLLISION_MESSAGES[2], pairs[(self.recurring.id, self.single.id)]['messages'])
+
+    def test_report_is_computed_once_per_version(self):
+        self.client.force_login(self.owner)
+        url = reverse('conflict_report', kwargs={'studio_url_extension': self.studio.url_extension})
+
+        with mock.patch('studio_suite.jobs.compute_conflict_report.delay') as delay:
+            self.assertIsNone(self.client.get(url).context['conflict_report'])
+            self.assertIsNone(self.client.get(url).context['conflict_report'])
+
+        version, _ = get_studio_version(self.studio.pk)
+        delay.assert_called_once_with(self.studio.pk, version)
+
+        compute_conflict_report(self.studio.pk, version)
+        self.assertEqual(len(self.client.get(url).context['conflict_report']), 3)
+
+        # A schedule change bumps the studio version, the previous report is shown while it is computed again.
+        with self.captureOnCommitCallbacks(execute=True):
+            self.close_single.delete()
+        with mock.patch('studio_suite.jobs.compute_conflict_report.delay') as delay:
+            response = self.client.get(url)
+            self.assertEqual(len(response.context['conflict_report']), 3)
+            self.assertTrue(response.context['conflict_report_is_outdated'])
+            self.client.get(url)
+
+        version, _ = get_studio_version(self.studio.pk)
+        delay.assert_called_once_with(self.studio.pk, version)
+
+        compute_conflict_report(self.studio.pk, version)
+        response = self.client.get(url)
+        self.assertEqual(len(response.context['conflict_report']), 1)
+        self.assertFalse(response.context['conflict_report_is_outdated'])
+
+
+
+@override_settings(CACHES=TEST_CACHES)
+class OccurrenceTests(TestCase):
+    """
+    Description:
+        Tests timeslot rules are materialized into occurrences and rolled forward to the horizon.
+    """
+
+    def setUp(self):
+        self.owner = User.objects.create_user(username='owner', email='owner@example.com')
+        self.studio = StudioInfo.objects.create(
+            linked_account=self.owner, url_extension='test-studio', name='Test Studio', bio='', new_member_role='RM',
+        )
+        self.kiln = KilnManagement.objects.create(
+            studio=self.studio, kiln_name='Big Kiln', kiln_make='Make', kiln_model='Model', kiln_size='Large', kiln_max_temp='Cone 10',
+        )
+
+        today = timezone.localdate()
+        self.monday = today + timedelta(days=7 - today.weekday())
+        self.recurring = TimeslotManagement.objects.create(
+            studio=self.studio, kiln=self.kiln, min_role_required='RM', is_recurring=2, start_date=self.monday,
+            load_after_time=time(hour=10), recurrence_frequency='weekly',
+            recurring_weekday_mask=TimeslotManagement.get_weekday_mask(['Monday', 'Thursday']),
+        )
+
+    def get_occurrence_dates(self, timeslot):
+        return list(TimeslotOccurrence.objects.filter(timeslot=timeslot).order_by('occurrence_date').values_list('occurrence_date', flat=True))
+
+    def test_generate_occurrences(self):
+        until = self.monday + timedelta(days=13)
+
+        self.assertEqual(generate_occurrences(self.recurring, until), 4)
+        self.assertEqual(self.get_occurrence_dates(self.recurring), [
+            self.monday, self.monday + timedelta(days=3), self.monday + timedelta(days=7), self.monday + timedelta(days=10),
+        ])
+        self.recurring.refresh_from_db()
+        self.assertEqual(self.recurring.occurrences_generated_until, until)
+
+        # Already generated days are skipped.
+        self.assertEqual(generate_occurrences(self.recurring, until), 0)
+        self.assertEqual(generate_occurrences(self.recurring, until + timedelta(days=7)), 2)
+
+    def test_single_day_past_the_horizon_is_generated(self):
+        start_date = get_horizon_date() + timedelta(days=30)
+        single = TimeslotManagement.objects.create(
+            studio=self.studio, kiln=self.kiln, min_role_required='RM', start_date=start_date, load_after_time=time(hour=10),
+        )
+
+        self.assertEqual(generate_occurrences(single), 1)
+        self.assertEqual(self.get_occurrence_dates(single), [start_date])
+
+    def test_regenerate_occurrences(self):
+        until = self.monday + timedelta(days=13)
+        generate_occurrences(self.recurring, until)
+
+        self.recurring.recurring_weekday_mask = TimeslotManagement.get_weekday_mask(['Tuesday'])
+        self.recurring.save()
+
+        self.assertEqual(regenerate_occurrences(self.recurring, until), 2)
+        self.assertEqual(self.get_occurrence_dates(self.recurring), [self.monday + timedelta(days=1), self.monday + timedelta(days=8)])
+
+    def test_roll_forward_occurrences(self):
+        generate_occurrences(self.recurring, self.monday + timedelta(days=6))
+        ended = TimeslotManagement.objects.create(
+            studio=self.studio, kiln=self.kiln, min_role_required='RM', is_recurring=1, start_date=self.monday,
+            end_date=self.monday + timedelta(days=6), load_after_time=time(hour=20), recurrence_frequency='weekly',
+            recurring_weekday_mask=TimeslotManagement.get_weekday_mask(['Monday']),
+        )
+        generate_occurrences(ended, self.monday + timedelta(days=6))
+        version, _ = get_studio_version(self.studio.pk)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            created = roll_forward_occurrences(self.monday + timedelta(days=20))
+
+        # The ended rule is skipped, the recurring rule gains its next two weeks.
+        self.assertEqual(created, 4)
+        self.assertEqual(len(self.get_occurrence_dates(self.recurring)), 6)
+        self.assertEqual(len(self.get_occurrence_dates(ended)), 1)
+        self.assertGreater(get_studio_version(self.studio.pk)[0], version)
+
+        version, _ = get_studio_version(self.studio.pk)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(roll_forward_occurrences(self.monday + timedelta(days=20)), 0)
+        self.assertEqual(get_studio_version(self.studio.pk)[0], version)
+
+    def test_availability_build_rolls_forward(self):
+        # The daily job has not materialized the rule yet.
+        date_list = [self.monday + timedelta(days=day) for day in range(7)]
+        availability = AvailabilityBuilder(self.studio, date_list).build()
+
+        self.assertEqual([slot.timeslot.id for slot in availability[self.monday + timedelta(days=3)]], [self.recurring.id])
+        self.recurring.refresh_from_db()
+        self.assertEqual(self.recurring.occurrences_generated_until, date_list[-1])
+
+    def test_roll_timeslot_occurrences_command(self):
+        with mock.patch('studio_suite.jobs.prune_changes', return_value=0) as prune_changes:
+            call_command('roll_timeslot_occurrences', stdout=io.StringIO())
+
+        prune_changes.assert_called_once_with()
+        self.recurring.refresh_from_db()
+        self.assertEqual(self.recurring.occurrences_generated_until, get_horizon_date())
+
+
+
+@override_settings(CACHES=TEST_CACHES)
+class CollisionDetectionTests(TestCase):
+    """
+    Description:
+        Tests the submission-time collision detector reports the same categories and messages
+        the rule-by-rule comparison it replaced did, for each pair of recurrence types.
+    """
+
+    def setUp(self):
+        self.owner = User.objects.create_user(username='owner', email='owner@example.com')
+        self.studio = StudioInfo.objects.create(
+            linked_account=self.owner, url_extension='test-studio', name='Test Studio', bio='', new_member_role='RM',
+        )
+        self.kiln = KilnManagement.objects.create(
+            studio=self.studio, kiln_name='Big Kiln', kiln_make='Make', kiln_model='Model', kiln_size='Large', kiln_max_temp='Cone 10',
+        )
+
+        today = timezone.localdate()
+        self.monday = today + timedelta(days=7 - today.weekday() + 7)
+
+    def build_timeslot(self, start_days, load_after_time, weekdays=None, **kwargs):
+        timeslot = TimeslotManagement(
+            studio=self.studio, kiln=self.kiln, min_role_required='RM',
+            start_date=self.monday + timedelta(days=start_days), load_after_time=load_after_time, **kwargs,
+        )
+        if weekdays:
+            timeslot.recurrence_frequency = 'weekly'
+            timeslot.recurring_weekday_mask = TimeslotManagement.get_weekday_mask(weekdays)
+        return timeslot
+
+    def save_timeslot(self, *args, **kwargs):
+        timeslot = self.build_timeslot(*args, **kwargs)
+        timeslot.save()
+        generate_occurrences(timeslot)
+        return timeslot
+
+    def assertCollision(self, new_timeslot, saved_timeslot, categories):
+        self.assertEqual(detect_collisions(new_timeslot), [
+            [[COLLISION_MESSAGES[category] for category in categories], saved_timeslot],
+        ])
+
+    def test_single_single_same_day(self):
+        saved = self.save_timeslot(0, time(hour=10))
+        self.assertCollision(self.build_timeslot(0, time(hour=12)), saved, [0])
+
+    def test_single_single_crossing_midnight(self):
+        saved = self.save_timeslot(0, time(hour=22))
+
+        # The window is inclusive, 23:59 apart still collides and a full day apart does not.
+        self.assertCollision(self.build_timeslot(1, time(hour=21, minute=59)), saved, [0])
+        self.assertEqual(detect_collisions(self.build_timeslot(1, time(hour=22))), [])
+        self.assertEqual(detect_collisions(self.build_timeslot(3, time(hour=10))), [])
+
+    def test_single_weekly(self):
+        saved = self.save_timeslot(0, time(hour=10), weekdays=['Monday'], is_recurring=2)
+
+        self.assertCollision(self.build_timeslot(7, time(hour=12)), saved, [5])
+        self.assertCollision(self.build_timeslot(8, time(hour=9)), saved, [7])
+
+    def test_weekly_single(self):
+        saved = self.save_timeslot(14, time(hour=12))
+        new_timeslot = self.build_timeslot(0, time(hour=10), weekdays=['Monday'], is_recurring=2)
+
+        self.assertCollision(new_timeslot, saved, [2])
+
+    def test_single_on_temporary_end_date(self):
+        saved = self.save_timeslot(0, time(hour=10), weekdays=['Monday'], is_recurring=1, end_date=self.monday + timedelta(days=28))
+
+        self.assertCollision(self.build_timeslot(14, time(hour=12)), saved, [5])
+        self.assertCollision(self.build_timeslot(28, time(hour=12)), saved, [4])
+
+    def test_temporary_ending_on_single(self):
+        saved = self.save_timeslot(14, time(hour=12))
+        new_timeslot = self.build_timeslot(0, time(hour=10), weekdays=['Monday'], is_recurring=1, end_date=self.monday + timedelta(days=14))
+
+        self.assertCollision(new_timeslot, saved, [1, 2])
+
+    def test_weekly_weekly(self):
+        saved = self.save_timeslot(0, time(hour=10), weekdays=['Monday'], is_recurring=2)
+
+        self.assertCollision(self.build_timeslot(7, time(hour=12), weekdays=['Monday'], is_recurring=2), saved, [3])
+        self.assertEqual(detect_collisions(self.build_timeslot(3, time(hour=10), weekdays=['Thursday'], is_recurring=2)), [])
+
+    def test_weekly_twice_weekly(self):
+        saved = self.save_timeslot(0, time(hour=10), weekdays=['Monday', 'Wednesday'], is_recurring=2)
+        new_timeslot = self.build_timeslot(1, time(hour=12), weekdays=['Tuesday'], is_recurring=2)
+
+        self.assertCollision(new_timeslot, saved, [7])
+
+    def test_same_timeslot_is_excluded(self):
+        saved = self.save_timeslot(0, time(hour=10), weekdays=['Monday'], is_recurring=2)
+        other = self.save_timeslot(21, time(hour=12))
+
+        # Editing a saved timeslot only reports the other timeslots.
+        saved.load_after_time = time(hour=11)
+        self.assertCollision(saved, other, [2])
+
+
+
+@override_settings(CACHES=TEST_CACHES)
+class WeekdayMaskFormTests(TestCase):
+    """
+    Description:
+        Tests the recurring weekday checkboxes round-trip through TimeslotManagement.recurring_weekday_mask.
+    """
+
+    def setUp(self):
+        owner = User.objects.create_user(username='owner', email='owner@example.com')
+        self.studio = StudioInfo.objects.create(
+            linked_account=owner, url_extension='test-studio', name='Test Studio', bio='', new_member_role='RM',
+        )
+        self.kiln = KilnManagement.objects.create(
+            studio=self.studio, kiln_name='Big Kiln', kiln_make='Make', kiln_model='Model', kiln_size='Large', kiln_max_temp='Cone 10',
+        )
+
+        today = timezone.localdate()
+        self.monday = today + timedelta(days=7 - today.weekday())
+
+    def save_form(self, form):
+        self.assertTrue(form.is_valid(), form.errors)
+        timeslot = form.save(commit=False)
+        timeslot.studio = self.studio  # Set by the view.
+        timeslot.save()
+        return timeslot
+
+    def test_weekdays_round_trip(self):
+        selections = [['Monday'], ['Monday', 'Wednesday', 'Friday'], ['Monday', 'Saturday', 'Sunday'], [day for day, _ in TimeslotManagement.DAYS_OF_WEEK_CHOICES]]
+
+        for weekdays in selections:
+            with self.subTest(weekdays=weekdays):
+                form = TimeslotManagementForm({
+                    'kiln': self.kiln.pk, 'min_role_required': 'RM', 'is_recurring': 2, 'recurrence_frequency': 'weekly',
+                    'recurring_weekdays': weekdays, 'start_date': self.monday, 'load_after_time': '10:00',
+                }, studio=self.studio)
+                timeslot = self.save_form(form)
+
+                timeslot.refresh_from_db()
+                self.assertEqual(timeslot.recurring_weekday_mask, TimeslotManagement.get_weekday_mask(weekdays))
+
+                edit_form = TimeslotManagementForm(instance=timeslot, studio=self.studio)
+                self.assertEqual(edit_form.initial['recurring_weekdays'], weekdays)
+                checked = re.findall(r'value="(\w+)"[^>]*checked', str(edit_form['recurring_weekdays']))
+                self.assertEqual(checked, weekdays)
+
+    def test_single_day_clears_weekdays(self):
+        form = TimeslotManagementForm({
+            'kiln': self.kiln.pk, 'min_role_required': 'RM', 'is_recurring': 0,
+            'recurring_weekdays': ['Tuesday'], 'start_date': self.monday, 'load_after_time': '10:00',
+        }, studio=self.studio)
+
+        timeslot = self.save_form(form)
+        self.assertEqual(timeslot.recurring_weekday_mask, 0)
+        self.assertEqual(TimeslotManagementForm(instance=timeslot, studio=self.studio).initial['recurring_weekdays'], [])
+
+
+
+class WeekdayMaskMigrationTests(TransactionTestCase):
+    """
+    Description:
+        Tests migration 0031 copies the Weekday relations of every timeslot into its recurring weekday mask.
+    """
+
+    migrate_from = [('studio_suite', '0030_backfill_timeslotoccurrence')]
+    migrate_to = [('studio_suite', '0031_timeslotmanagement_recurring_weekday_mask')]
+
+    def setUp(self):
+        self.addCleanup(self.migrate_to_latest)
+        executor = MigrationExecutor(connection)
+        executor.migrate(self.migrate_from)
+        self.apps = executor.loader.project_state(self.migrate_from).apps
+
+    def migrate_to_latest(self):
+        executor = MigrationExecutor(connection)
+        executor.migrate(executor.loader.graph.leaf_nodes())
+
+    def test_weekdays_to_mask(self):
+        User = self.apps.get_model('auth', 'User')
+        StudioInfo = self.apps.get_model('studio_suite', 'StudioInfo')
+        KilnManagement = self.apps.get_model('studio_suite', 'KilnManagement')
+        TimeslotManagement = self.apps.get_model('studio_suite', 'TimeslotManagement')
+        Weekday = self.apps.get_model('studio_suite', 'Weekday')
+
+        owner = User.objects.create(username='owner', email='owner@example.com')
+        studio = StudioInfo.objects.create(uuid=uuid.uuid4(), linked_account=owner, name='Test Studio', bio='', new_member_role='RM')
+        kiln = KilnManagement.objects.create(
+            studio=studio, kiln_name='Big Kiln', kiln_make='Make', kiln_model='Model', kiln_size='Large', kiln_max_temp='Cone 10',
+        )
+        weekdays = {day: Weekday.objects.get_or_create(day=day)[0] for day in ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']}
+
+        selections = [[], ['Monday'], ['Tuesday', 'Thursday'], ['Monday', 'Sunday'], list(weekdays)]
+        timeslot_ids = []
+        for selection in selections:
+            timeslot = TimeslotManagement.objects.create(
+                studio=studio, kiln=kiln, min_role_required='RM', is_recurring=2 if selection else 0,
+                start_date='2030-01-07', load_after_time='10:00',
+            )
+            timeslot.recurring_weekdays.set([weekdays[day] for day in selection])
+            timeslot_ids.append(timeslot.pk)
+
+        executor = MigrationExecutor(connection)
+        executor.migrate(self.migrate_to)
+        TimeslotManagement = executor.loader.project_state(self.migrate_to).apps.get_model('studio_suite', 'TimeslotManagement')
+
+        masks = dict(TimeslotManagement.objects.values_list('pk', 'recurring_weekday_mask'))
+        self.assertEqual([masks[timeslot_id] for timeslot_id in timeslot_ids], [0, 0b1, 0b1010, 0b1000001, 0b1111111])
+
+
+
+@override_settings(CACHES=TEST_CACHES)
+class StudioSeederTests(TestCase):
+    """
+    Description:
+        Tests the seeder books each occurrence once and counts the bookings that did not fit.
+    """
+
+    def test_counts_unplaced_bookings(self):
+        seeder = StudioSeeder(studios=1, kilns=1, timeslots=2, members=5, bookings=1000, prefix='tiny')
+        seeder.seed()
+
+        booked = BookingManagement.objects.count()
+        self.assertLess(booked, 1000)
+        self.assertEqual(seeder.unplaced_bookings, 1000 - booked)
+        self.assertEqual(booked, BookingManagement.objects.values('timeslot', 'booking_date').distinct().count())
+
+
+
+class ExplainQueriesTests(TestCase):
+    """
+    Description:
+        Tests explain_queries prints a plan for every view query and rolls its seeded studios back.
+    """
+
+    def test_explains_view_queries(self):
+        out = io.StringIO()
+        call_command(
+            'explain_queries', studios=1, kilns=2, timeslots=5, members=3, bookings=10, stdout=out,
+        )
+
+        output = out.getvalue()
+        for label in ('bookings within the window', 'users bookings', 'bookable timeslot', 'kiln occurrences', 'member role'):
+            self.assertIn(label, output)
+        self.assertFalse(StudioInfo.objects.exists())
@@ -6,6 +6,8 @@ from django.urls import path
 
 from .views import (
     StudioHomeView,
+    StudioExportView,
+    ConflictReportView,
     GetStudioInfoView,
     KilnManagementView,
     MemberManagementView,
@@ -19,5 +21,7 @@ urlpatterns = [
     path('home/<str:studio_url_extension>', StudioHomeView.as_view(), name='studio_home'),
     path('kiln-management/<str:studio_url_extension>', KilnManagementView.as_view(), name='kiln_management'),
     path('member-management/<str:studio_url_extension>', MemberManagementView.as_view(), name='member_management'),
-    path('timeslot-management/<str:studio_url_extension>', TimeslotManagementView.as_view(), name='timeslot_management')
+    path('timeslot-management/<str:studio_url_extension>', TimeslotManagementView.as_view(), name='timeslot_management'),
+    path('conflict-report/<str:studio_url_extension>', ConflictReportView.as_view(), name='conflict_report'),
+    path('export/<str:export_name>/<str:studio_url_extension>', StudioExportView.as_view(), name='studio_export'),
 ]
@@ -0,0 +1,80 @@
+"""
+Per-studio change counters.
+
+Every change to a studio, its schedule (timeslots, kilns, kiln ranges and bookings) or its
+members bumps its version, see the receivers in studio_suite.signals and member_suite.signals.
+Cached renders of studio data are keyed or validated by the version, so they are never served
+stale and can be checked without touching the database (see app.decorators.studio_version_etag).
+
+Changes bump the version once their transaction has committed (see bump_studio_version_on_commit),
+so a reader that sees a version also sees every change up to it. Bumping before the commit would
+let a reader build from the old rows and cache them under the new version.
+
+The counter lives in the cache. When it has been evicted it restarts from the current time in
+milliseconds, which is above any version handed out before the eviction.
+"""
+
+import time
+from django.core.cache import cache
+from django.db import transaction
+
+
+def get_version_cache_keys(studio_id):
+    """
+    Description:
+        Cache keys of a studios version counter and its last modified timestamp.
+    """
+    return f'studio:{studio_id}:version', f'studio:{studio_id}:modified'
+
+
+def get_studio_version(studio_id):
+    """
+    Description:
+        Returns the current version of a studio, starting a new one if the counter is not cached.
+
+    Returns:
+        tuple: (version, modified), modified is the unix timestamp (seconds) of the last bump.
+    """
+
+    version_key, modified_key = get_version_cache_keys(studio_id)
+    cached = cache.get_many([version_key, modified_key])
+
+    if version_key not in cached or modified_key not in cached:
+        # Changes since the counter was evicted are unknown, so anything validated by it is stale.
+        return bump_studio_version(studio_id)
+
+    return cached[version_key], cached[modified_key]
+
+
+def bump_studio_version(studio_id):
+    """
+    Description:
+        Increments the version of a studio, call whenever its schedule changes.
+
+    Returns:
+        tuple: (version, modified) after the bump, see get_studio_version.
+    """
+
+    version_key, modified_key = get_version_cache_keys(studio_id)
+
+    try:
+        version = cache.incr(version_key)
+    except ValueError:
+        version = time.time_ns() // 1_000_000
+        cache.set(version_key, version, None)
+
+    modified = int(time.time())
+    cache.set(modified_key, modified, None)
+
+    return version, modified
+
+
+def bump_studio_version_on_commit(studio_id):
+    """
+    Description:
+        Bumps the version of a studio once the current transaction commits (right away outside
+        of one), nothing is bumped when it rolls back. Changes logged for clients bump it with
+        their log row instead, see member_suite.changes.log_change.
+        A failing bump is logged rather than failing the request, its change is already committed.
+    """
+    transaction.on_commit(lambda: bump_studio_version(studio_id), robust=True)
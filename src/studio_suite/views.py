@@ -10,11 +10,13 @@ offering a centralized platform for effective studio management.
 """
 
 from django.forms import ValidationError
+from django.http import Http404, StreamingHttpResponse
 from django.shortcuts import get_object_or_404, render, redirect
 from django.views import View
 from django.utils.decorators import method_decorator
 from django.contrib.auth.decorators import login_required
-from app.decorators import studio_ownership_required
+from app.decorators import studio_ownership_required, studio_version_etag
+from app.studio_access import resolve_studio_access
 from django.urls import reverse
 from django.contrib import messages
 from .models import (
@@ -36,12 +38,16 @@ from .forms import (
     KilnRangeDeleteForm,
     KilnDeleteForm,
     DeleteTimeslotForm,
+    TimeslotImportForm,
 )
-from datetime import (
-    datetime,
-    timedelta,
-    date,
-)
+from .occurrences import generate_occurrences
+from .collisions import detect_collisions
+from .exports import EXPORTS
+from .imports import TimeslotImport
+from .conflicts import get_conflict_report_computation
+from .jobs import enqueue_conflict_report
+from .versioning import get_studio_version
+from member_suite.calendar import STUDIO_FEED, get_feed_url
 
 @method_decorator(login_required, name="dispatch")
 class GetStudioInfoView(View):
@@ -126,6 +132,9 @@ class StudioView(View):
         dispatch requires studio ownership and to be logged in.
     """
 
+    studio_etag = True  # Answer unchanged pages with 304, see studio_version_etag.
+
+    @studio_version_etag
     @studio_ownership_required
     @method_decorator(login_required, name="dispatch")
     def dispatch(self, request, *args, **kwargs):
@@ -147,7 +156,7 @@ class StudioView(View):
         self.request = request  # Get requesting client data.
         self.user = request.user  # Get the user data from the request.
         self.studio_url_extension = kwargs.get('studio_url_extension')  # Get requested studio identifier.
-        self.studio = get_object_or_404(StudioInfo, url_extension=self.studio_url_extension)
+        self.studio = resolve_studio_access(request, self.studio_url_extension).studio  # Resolved once per request.
 
         # The following is data we want to be passed to every page.
         self.context = {
@@ -178,13 +187,87 @@ class StudioHomeView(StudioView):
             Respond when a studio owner attempts access to their home page.
 
         Returns:
-            Common context data and studio home page template.
+            Common context data, the url of the studios booking calendar feed and studio home page template.
+        """
+
+        self.context['calendar_feed_url'] = get_feed_url(self.request, self.studio, self.user.pk, STUDIO_FEED)
+
+        return render(self.request, self.template_name, self.context)
+
+
+
+class ConflictReportView(StudioView):
+    """
+    Description:
+        Lists every conflict between the studios timeslots, see studio_suite.conflicts.
+        The report is computed by a background job and reused until the studios schedule changes.
+
+    Security:
+        Dispatch security controls inherited from StudioView.
+    """
+
+    template_name = 'studio_suite/conflict-report.html'
+    studio_etag = False  # The report changes when its job finishes, not with the studio version.
+
+    def get(self, *args, **kwargs):
+        """
+        Description:
+            Respond with the conflict report of the current studio version, or start computing it.
+
+        Returns:
+            Common context data and the report, which is None while the first report is being computed
+            and the previous report (conflict_report_is_outdated) while the schedule has changed since.
         """
 
+        version, _ = get_studio_version(self.studio.pk)
+        computation = get_conflict_report_computation(self.studio.pk, version)
+        entry = computation.get_entry()
+
+        if not computation.is_fresh(entry):
+            enqueue_conflict_report(self.studio.pk, version)
+
+        self.context.update({
+            'conflict_report': None if entry is None else entry['value'],
+            'conflict_report_is_outdated': entry is not None and entry['version'] != version,
+        })
+
         return render(self.request, self.template_name, self.context)
 
 
 
+class StudioExportView(StudioView):
+    """
+    Description:
+        Streams a CSV export of the studios bookings, timeslots or members (see studio_suite.exports),
+        used by studio owners for accounting.
+
+    Security:
+        Dispatch security controls inherited from StudioView.
+    """
+
+    studio_etag = False  # Member usernames and emails are exported, user changes do not bump the studio version.
+
+    def get(self, *args, **kwargs):
+        """
+        Description:
+            Respond with the requested export as a CSV attachment.
+
+        Returns:
+            StreamingHttpResponse written while the rows are read, 404 for an unknown export.
+        """
+
+        export_class = EXPORTS.get(kwargs.get('export_name'))
+        if export_class is None:
+            raise Http404()
+
+        export = export_class(self.studio)
+        response = StreamingHttpResponse(export.stream(), content_type='text/csv; charset=utf-8')
+        response.headers['Content-Disposition'] = f'attachment; filename="{export.get_filename()}"'
+
+        return response
+
+
+
 class UpdateStudioInfoView(StudioView):
     """
     Description:
@@ -236,6 +319,8 @@ class UpdateStudioInfoView(StudioView):
                 self.fields['name'].required = False
                 self.fields['bio'].required = False
                 self.fields['new_member_role'].required = False
+                self.fields['availability_window'].required = False
+                self.fields['booking_horizon'].required = False
 
             def clean_name(self):
                 name = self.cleaned_data.get('name')
@@ -295,7 +380,9 @@ class UpdateStudioInfoView(StudioView):
                     'business_main_address', #added main address
                     'website_link', #added website link
                     'timezone', #added timezone
-                    'currency' #added currency
+                    'currency', #added currency
+                    'availability_window',
+                    'booking_horizon',
                 ]
 
         # Dynamically remove the 'url_extension' field from the form
@@ -349,6 +436,10 @@ class UpdateStudioInfoView(StudioView):
                 studio_info.timezone = cleaned_data['timezone']
             if cleaned_data['currency'] != "":
                 studio_info.currency = cleaned_data['currency']
+            if cleaned_data['availability_window'] is not None:
+                studio_info.availability_window = cleaned_data['availability_window']
+            if cleaned_data['booking_horizon'] is not None:
+                studio_info.booking_horizon = cleaned_data['booking_horizon']
             
             # Save the updated studio object
             studio_info.save()
@@ -375,6 +466,22 @@ class KilnManagementView(StudioView):
 
     template_name = 'studio_suite/kiln-management.html'
 
+    @staticmethod
+    def get_named_ranges(studio, range_name: str):
+        """
+        Description:
+            Ranges of the studio with the submitted name, a studio can't have two.
+        """
+        return KilnRange.objects.filter(studio=studio, range_name=range_name)
+
+    @staticmethod
+    def get_named_kilns(studio, kiln_name: str):
+        """
+        Description:
+            Kilns of the studio with the submitted name, a studio can't have two.
+        """
+        return KilnManagement.objects.filter(studio=studio, kiln_name=kiln_name)
+
     def update_context(self, fresh_CreateKilnForm: bool = None, fresh_CreateKilnRangeForm: bool = None):
         """
         Description:
@@ -400,7 +507,7 @@ class KilnManagementView(StudioView):
         CreateKilnRangeForm = KilnRangeForm()
         CreateKilnForm = KilnManagementForm(studio=self.studio)
         ranges = KilnRange.objects.filter(studio=self.studio)
-        kilns = KilnManagement.objects.filter(studio=self.studio)
+        kilns = KilnManagement.objects.filter(studio=self.studio).select_related('kiln_range')
 
         self.context.update({
             'CreateKilnRangeForm': CreateKilnRangeForm,
@@ -484,7 +591,7 @@ class KilnManagementView(StudioView):
         if CreateKilnRangeForm.is_valid():
 
             submitted_range_name = CreateKilnRangeForm.cleaned_data['range_name']
-            existing_ranges = KilnRange.objects.filter(studio=self.studio, range_name=submitted_range_name).exists()
+            existing_ranges = self.get_named_ranges(self.studio, submitted_range_name).exists()
 
             if not existing_ranges:
                 kiln_range = CreateKilnRangeForm.save(commit=False)
@@ -498,7 +605,7 @@ class KilnManagementView(StudioView):
         elif CreateKilnForm.is_valid():
             # Save the form data to the KilnManagement model
             submitted_kiln_name = CreateKilnForm.cleaned_data['kiln_name']
-            existing_kilns = KilnManagement.objects.filter(studio=self.studio, kiln_name=submitted_kiln_name).exists()
+            existing_kilns = self.get_named_kilns(self.studio, submitted_kiln_name).exists()
 
             if not existing_kilns:
                 kiln_management = CreateKilnForm.save(commit=False)
@@ -547,7 +654,7 @@ class MemberManagementView(StudioView):
             Encrypt member ID in delete_member_forms
         """
 
-        members = MemberStudioRelationship.objects.filter(studio=self.studio)
+        members = MemberStudioRelationship.objects.filter(studio=self.studio).select_related('member')
 
         formed_members = []  # List to store tuples of member and associated forms
 
@@ -623,24 +730,12 @@ class TimeslotManagementView(StudioView):
         View class for managing timeslots within a studio. Extends StudioView to ensure proper
         authentication and studio ownership.
 
-    Unique Attributes:
-        weekday_mapping (dict): A mapping of weekday integers to their corresponding names.
-    
     Security:
         Inherits StudioView dispatch security mechanisms
     """
 
     template_name = 'studio_suite/timeslot-management.html'
-    weekday_mapping = {
-            0: 'Monday',
-            1: 'Tuesday',
-            2: 'Wednesday',
-            3: 'Thursday',
-            4: 'Friday',
-            5: 'Saturday',
-            6: 'Sunday',
-        }
-    
+
     def update_context(self):
         """
         Description:
@@ -653,7 +748,7 @@ class TimeslotManagementView(StudioView):
             Remove Timeslot ID's from Timeslots.
         """
         is_kilns = KilnManagement.objects.filter(studio=self.studio).exists()
-        timeslots = TimeslotManagement.objects.filter(studio=self.studio)
+        timeslots = TimeslotManagement.objects.filter(studio=self.studio).select_related('kiln')
         #blackouts = TimeslotBlackout.objects.filter(studio=self.studio)
         form = TimeslotManagementForm(studio=self.studio)
         #blackout_form = TimeslotBlackoutForm()
@@ -661,6 +756,7 @@ class TimeslotManagementView(StudioView):
         self.context.update({
             'is_kilns': is_kilns,
             'form': form,
+            'import_form': TimeslotImportForm(),
             'timeslots': timeslots,
             #'blackout_form': blackout_form,
             #'blackouts': blackouts,
@@ -737,8 +833,8 @@ class TimeslotManagementView(StudioView):
                     timeslot_management = timeslot_form.save(commit=False)
                     timeslot_management.studio = self.studio # Set the studio in the form before saving.
                     timeslot_management.save()
-                    # Now that the timeslot exists, relate the M2M recurring_weekdays to the timeslot.
-                    timeslot_management.recurring_weekdays.set(timeslot_form.cleaned_data['recurring_weekdays'])
+                    # Materialize the concrete kiln loads of the new rule for the booking page.
+                    generate_occurrences(timeslot_management)
 
                     # Do a complete redirect to the page (Also clears the form).
                     return redirect('timeslot_management', studio_url_extension=self.studio_url_extension)
@@ -748,6 +844,9 @@ class TimeslotManagementView(StudioView):
                     for error in errors:
                         messages.error(self.request, f"{field}: {error}")
 
+        if "import_timeslots" in self.request.POST:
+            return self.import_timeslots()
+
         if "delete_timeslot" in self.request.POST:
             print("here")
 
@@ -762,7 +861,7 @@ class TimeslotManagementView(StudioView):
                     # Get the corresponding timeslot object
                     timeslot = TimeslotManagement.objects.get(id=timeslot_id)
                     
-                    # Delete the timeslot
+                    # Delete the timeslot (its materialized occurrences cascade with it)
                     timeslot.delete()
                     return redirect(self.request.path_info)
                 except TimeslotManagement.DoesNotExist:
@@ -806,322 +905,67 @@ class TimeslotManagementView(StudioView):
 
 
 
-    def weekday_formatting(self, recurring_weekday_input: list, date: date):
-        """
-        Description:
-            Format weekdays for collision checking.
-
-        Returns:
-            list: Formatted list of weekdays.
-        """
-
-        # Empty weekday list or query set: use the date to calculate the weekday and make a list.
-        if (not recurring_weekday_input) or (not recurring_weekday_input.exists()):
-            date = datetime.strptime(str(date), '%Y-%m-%d').date()
-            weekday_integers = [date.weekday()]
-            weekdays_list = [self.weekday_mapping[integer] for integer in weekday_integers]
-        # Else, convert the query set of weekday objects to a weekdays list.
-        else:
-            weekdays_list = [weekday.day for weekday in recurring_weekday_input]
-
-        return weekdays_list
-
-
-    def comparing_date_collisions(self, form_datetime: datetime, saved_datetime: datetime,):
-        """
-        Description:
-            Check for collisions between date and start/end datetime.
-
-        Returns:
-            int: 1 if collision is detected.
-        """
-
-        if form_datetime >= saved_datetime:
-            if (form_datetime - saved_datetime) <= timedelta(hours=23,minutes=59):
-                return 1
-        elif form_datetime < saved_datetime:
-            if (saved_datetime - form_datetime) <= timedelta(hours=23, minutes=59):
-                return 1
-
-    def recurring_weekday_collisions(self, form_weekdays_list: list, saved_weekdays_list: list):
+    def import_timeslots(self):
         """
         Description:
-            Check for collisions between recurring weekdays.
+            Imports the timeslots of an uploaded .csv or .json file, see studio_suite.imports.
+            Valid rows without collisions are saved together, every rejected row is reported with its errors.
 
         Returns:
-            int: 1 if collision is detected.
+            The timeslot management page with the import results, or a redirect once rows were saved
+            without any rejections.
         """
 
-        for weekday in form_weekdays_list:
-            if weekday in saved_weekdays_list:
-                return 1
+        import_form = TimeslotImportForm(self.request.POST, self.request.FILES)
+        if not import_form.is_valid():
+            self.context['import_form'] = import_form
+            return render(self.request, self.template_name, self.context)
 
-    def comparing_load_time_collisions(
-            self,
-            form_weekdays_list,
-            form_load_after_time,
-            saved_weekdays_list,
-            saved_load_after_time
-        ):
+        timeslot_import = TimeslotImport(self.studio, import_form.cleaned_data['import_file'])
+        timeslot_import.check()
 
-        """
-        Description:
-            Check for collisions between load_after_times.
+        if import_form.cleaned_data['check_only']:
+            messages.info(self.request, f"{len(timeslot_import.accepted)} timeslot(s) can be imported.")
+        elif timeslot_import.accepted:
+            timeslot_import.save()
+            messages.success(self.request, f"Imported {len(timeslot_import.accepted)} timeslot(s).")
 
-        Returns:
-            int: 1 if collision is detected.
-        """
-
-        # Create a dictionary to map weekdays to their respective indices
-        weekday_index_mapping = {v: k for k, v in self.weekday_mapping.items()}
-
-        # Iterate through each saved weekday
-        for saved_weekday in saved_weekdays_list:
-            saved_index = weekday_index_mapping.get(saved_weekday)
-
-            if saved_index is not None:
-                # Check if the form weekday is the day before
-                form_index_before = (saved_index - 1) % 7
-                if self.weekday_mapping[form_index_before] in form_weekdays_list:
-                    if form_load_after_time > saved_load_after_time:
-                        return 1
+        if timeslot_import.rejected or import_form.cleaned_data['check_only']:
+            self.update_context()
+            self.context['import_rejected'] = timeslot_import.rejected
+            return render(self.request, self.template_name, self.context)
 
-                # Check if the form weekday is the day after
-                form_index_after = (saved_index + 1) % 7
-                if self.weekday_mapping[form_index_after] in form_weekdays_list:
-                    if form_load_after_time < saved_load_after_time:
-                        return 1
+        return redirect('timeslot_management', studio_url_extension=self.studio_url_extension)
 
 
     def timeslot_collision_detection(self, form: TimeslotManagementForm, studio):
         """
         Description:
             Detect collisions between a submitted timeslot and existing timeslots in a kiln.
-            This function checks for collisions between a timeslot submitted via a form and
-            existing timeslots in a specific kiln for each specific studio.
-            It considers various collision scenarios, including date overlaps, recurring weekdays,
-            and load_after_time conflicts (Load times within 24 hours of each other).
-        
+            Load times of the same kiln must be more than 24 hours apart, so the submitted
+            rule is expanded into its concrete load datetimes, and each one is looked up in
+            the kilns occurrence index (see studio_suite.collisions) for saved loads within
+            24 hours of it.
+
         High Level Explanation:
-            For all saved Timeslots with the same Kiln as the New Submitted Timeslot:
-                Check for all possible collision scenarioes where necessary:
-                    Some Examples:
-                        Start Dates Cant Collide
-                        End Dates Cant Collide
-                        Start and End Dates Cant Collide
-                        Recurring Weekdays Cant Collide
-                        If single date timeslots happens during a recurring timeslot,
-                            the weekday cant collide and load time must be greater than
-                            24 hours.
-                        Load times must be more than 24 hours apart.
+            For every saved load within 24 hours of a submitted load, the pair is mapped to
+            the collision scenario it breaks:
+                Start Dates Cant Collide
+                End Dates Cant Collide
+                Start and End Dates Cant Collide
+                Recurring Weekdays Cant Collide
+                If single date timeslots happens during a recurring timeslot,
+                    the weekday cant collide.
+                Load times must be more than 24 hours apart.
             All generated warnings are then passed back to the frontend.
 
-            This is all done using conditional statements to reduce operations and checks down
-            only to the possible collision scenarios based on the recurrence type.
-
         Returns:
             collisions_detected (list): A list of collisions detected, where each collision is
-            represented as a tuple containing collision warnings and the associated timeslot.
+            represented as a list containing collision warnings and the associated timeslot.
             The collision warnings are strings describing the type of collision detected.
         """
 
-        # Get all the new timeslot information from the submitted form.
-        form_studio = studio
-        form_kiln = form.cleaned_data['kiln']
-        form_is_recurring = form.cleaned_data['is_recurring']
-        form_recurring_weekdays = form.cleaned_data['recurring_weekdays']
-        form_end_date = form.cleaned_data['end_date']
-        form_start_date = form.cleaned_data['start_date']
-        form_load_after_time = form.cleaned_data['load_after_time']
-        form_weekdays_list = self.weekday_formatting(form_recurring_weekdays, form_start_date)
-        collisions_detected = []
-        collision_message = {
-            # Do not re-number the keys, if you create a new collision rule, add a new key for it.
-            # I plan to redo these messages to make them much more specific.
-            0:'Submitted Timeslots Date (or Start Date) is less than 24 hours from the following Timeslots Date (or Start Date).',
-            1:'Submitted Timeslots End Date is less than 24 hours from the following Timeslots Date.',
-            2:'Submitted Timeslots Recurring Weekdays will overlap the following Timeslots Date.',
-            3:'Submitted Timeslots Recurring Weekdays will overlap (some of) the following Timeslots Recurring Weekdays.',
-            4:'Submitted Timeslots Date (or Start Date) is less than 24 hours from the following Timeslots End Date.',
-            5:'Submitted Timeslots Date overlaps the following Timeslots Recurring Weekdays.',
-            6:'Submitted Timeslots End Date is less than 24 hours from the following Timeslots Start Date.',
-            7:'Submitted Timeslots Load After Time is less than 24 hours from the following Timeslots Load After Time (Is within 24 hours of another timeslots load after time).'
-        }
+        new_timeslot = form.save(commit=False)
+        new_timeslot.studio = studio
 
-        # Format Forms Start and End Time
-        form_start_datetime = datetime.combine(form_start_date, form_load_after_time)
-        if form_end_date:
-            form_end_datetime = datetime.combine(form_end_date, form_load_after_time)
-
-
-        # Collision detection
-        kiln_timeslots = TimeslotManagement.objects.filter(studio=form_studio, kiln=form_kiln)
-        for saved_timeslot in kiln_timeslots:
-
-            collision_warnings = []
-
-            # Turn Stored Query Set To List
-            saved_recurring_weekdays = saved_timeslot.recurring_weekdays.all()
-            saved_weekdays_list = self.weekday_formatting(saved_recurring_weekdays, saved_timeslot.start_date)
-            saved_load_after_time = saved_timeslot.load_after_time
-
-            # Format saved_timeslots start and end_times for collision checking
-            saved_start_datetime = datetime.combine(saved_timeslot.start_date, saved_timeslot.load_after_time)
-            if saved_timeslot.end_date:
-                saved_end_datetime = datetime.combine(saved_timeslot.end_date, saved_timeslot.load_after_time)
-
-
-            # General Rule: Start dates can't collide with one another.
-            if self.comparing_date_collisions(form_start_datetime, saved_start_datetime):
-                collision_warnings.append(collision_message[0])
-
-
-            if saved_timeslot.is_recurring == 0: # Saved Never Recurres
-
-                if form_is_recurring == 1: # Form Recurring Temporarily
-                    # Forms end date must not collide with saved start date.
-                    if self.comparing_date_collisions(form_end_datetime, saved_start_datetime):
-                        collision_warnings.append(collision_message[1])
-
-                    # If saved never recurring date is during the forms temporary date range
-                        # weekdays can't collide.
-                        # 24hrs loads can't collide
-                    if saved_start_datetime > form_start_datetime or saved_start_datetime < form_end_datetime:
-                        if self.recurring_weekday_collisions(form_weekdays_list, saved_weekdays_list):
-                            collision_warnings.append(collision_message[2])
-                        if self.comparing_load_time_collisions(
-                                form_weekdays_list,
-                                form_load_after_time,
-                                saved_weekdays_list,
-                                saved_load_after_time
-                            ):
-                            collision_warnings.append(collision_message[7])
-
-                elif form_is_recurring == 2: # Form Recurring Forever
-
-                    # If saved never recurring date is after forms start date.
-                        # weekdays can't collide.
-                        # 24hrs loads can't collide.
-                    if saved_start_datetime > form_start_datetime:
-                        if self.recurring_weekday_collisions(form_weekdays_list, saved_weekdays_list):
-                            collision_warnings.append(collision_message[2])
-                        if self.comparing_load_time_collisions(
-                                form_weekdays_list,
-                                form_load_after_time,
-                                saved_weekdays_list,
-                                saved_load_after_time
-                            ):
-                            collision_warnings.append(collision_message[7])
-
-            elif saved_timeslot.is_recurring == 1:
-
-                if form_is_recurring == 0:
-                    # Forms start_date can't collide with saved end_date
-                    if self.comparing_date_collisions(form_start_datetime, saved_end_datetime):
-                        collision_warnings.append(collision_message[4])
-                        
-                    # If forms never recurring start date is in saved temp recurring date range, weekdays can't collide.
-                    if form_start_datetime > saved_start_datetime and form_start_datetime < saved_end_datetime:
-                        if self.recurring_weekday_collisions(form_weekdays_list, saved_weekdays_list):
-                            collision_warnings.append(collision_message[5])
-                        if self.comparing_load_time_collisions(
-                                form_weekdays_list,
-                                form_load_after_time,
-                                saved_weekdays_list,
-                                saved_load_after_time
-                            ):
-                            collision_warnings.append(collision_message[7])
-
-
-                elif form_is_recurring == 1:
-                    # Forms start can't collide with saved end date
-                    if self.comparing_date_collisions(form_start_datetime, saved_end_datetime):
-                        collision_warnings.append(collision_message[4])
-                    # Forms end date can't collide with saved start date
-                    if self.comparing_date_collisions(form_end_datetime, saved_end_datetime):
-                        collision_warnings.append(collision_message[6])
-                    # If form start date is after saved start date or forms end date is before saved end date
-                        # weekdays cant collide
-                        # load_after_times can't collide
-                    if form_start_datetime > saved_start_datetime or form_end_datetime > saved_end_datetime:
-                        if self.recurring_weekday_collisions(form_weekdays_list, saved_weekdays_list):
-                            collision_warnings.append(collision_message[3])
-                        if self.comparing_load_time_collisions(
-                                form_weekdays_list,
-                                form_load_after_time,
-                                saved_weekdays_list,
-                                saved_load_after_time
-                            ):
-                            collision_warnings.append(collision_message[7])
-
-                elif form_is_recurring == 2:
-                    # Forms start date cant collide with saved end date
-                    if self.comparing_date_collisions(form_start_datetime, saved_end_datetime):
-                        collision_warnings.append(collision_message[4])
-                    # If forms start date is after saved start date but before saved end date
-                        # weekdays can't collide.
-                        # 24hrs loads can't collide.
-                    if form_start_datetime > saved_start_datetime and form_start_datetime < saved_end_datetime:
-                        if self.recurring_weekday_collisions(form_weekdays_list, saved_weekdays_list):
-                            collision_warnings.append(collision_message[3])
-                        if self.comparing_load_time_collisions(
-                                form_weekdays_list,
-                                form_load_after_time,
-                                saved_weekdays_list,
-                                saved_load_after_time
-                            ):
-                            collision_warnings.append(collision_message[7])
-
-            elif saved_timeslot.is_recurring == 2:
-                if form_is_recurring == 0:
-                    # If forms start date is after saved start date
-                        # weekdays can't collide.
-                        # 24hrs loads can't collide.
-                    if form_start_datetime > saved_start_datetime:
-                        if self.recurring_weekday_collisions(form_weekdays_list, saved_weekdays_list):
-                            collision_warnings.append(collision_message[5])
-                        if self.comparing_load_time_collisions(
-                                form_weekdays_list,
-                                form_load_after_time,
-                                saved_weekdays_list,
-                                saved_load_after_time
-                            ):
-                            collision_warnings.append(collision_message[7])
-
-                elif form_is_recurring == 1:
-                    # Form end date can't collide with saved start date
-                    if self.comparing_date_collisions(form_end_datetime, saved_start_datetime):
-                        collision_warnings.append(collision_message[6])
-                    # If form start date or end date is after saved start date
-                        # weekday's can't collide
-                        # 24hrs loads can't collide.
-                    if form_start_datetime > saved_start_datetime or form_end_datetime > saved_start_datetime:
-                        if self.recurring_weekday_collisions(form_weekdays_list, saved_weekdays_list):
-                            collision_warnings.append(collision_message[3])
-
-                        if self.comparing_load_time_collisions(
-                                form_weekdays_list,
-                                form_load_after_time,
-                                saved_weekdays_list,
-                                saved_load_after_time
-                            ):
-                            collision_warnings.append(collision_message[7])
-                    
-                elif form_is_recurring == 2:
-                    # Form weekdays can't collide
-                    # 24hrs loads can't collide.
-                    if self.recurring_weekday_collisions(form_weekdays_list, saved_weekdays_list):
-                        collision_warnings.append(collision_message[3])
-                    if self.comparing_load_time_collisions(
-                            form_weekdays_list,
-                            form_load_after_time,
-                            saved_weekdays_list,
-                            saved_load_after_time
-                        ):
-                        collision_warnings.append(collision_message[7])
-
-            # If there are collisions, associate them all to the timeslot.
-            if collision_warnings:
-                collisions_detected.append([collision_warnings, saved_timeslot])
-        
-        return collisions_detected  
+        return detect_collisions(new_timeslot)